@@ -1,17 +1,34 @@
-import cProfile
 import os
-import pstats
 import pygame
 import pygame_gui
 from src.board.board import HexBoard
 from src.camera.camera import Camera
 from src.game_core.game_core import Player, GameManager
+from src.game_core.render_scheduler import RenderScheduler
 from src.ui.hud.ui import HUDManager
 from src.ui.windows.main_menu import MainMenu
+from src.utils.atlas import SPRITE_VARIANTS
+from src.utils.autosave import Autosaver
+from src.utils import event_log
 from src.utils.deserialization import load_game_from_file
+from src.utils.event_log import log
+from src.utils.journal import ActionJournal, session_journal_path
+from src.utils.profiling import Profiler
+from src.utils.utils import preload_images
 
 game_manager = None
 hud_manager = None
+autosaver = None
+
+
+def attach_journal(game_manager):
+    """
+    Journals the game's actions in a journal of this session next to its save, unless it was
+    loaded from a journal and goes on with that one.
+    """
+    if game_manager.journal is None:
+        save_path = os.path.join('data', 'saves', game_manager.save_name)
+        game_manager.journal = ActionJournal.start(session_journal_path(save_path), game_manager)
 
 
 def restart_game():
@@ -22,15 +39,23 @@ def restart_game():
 
     board = HexBoard(20, 20, 50)
     players = [Player(1), Player(2)]
+    if game_manager is not None and game_manager.journal is not None:
+        game_manager.journal.close()
     game_manager = GameManager(players, board, camera, hud_manager)
+    game_manager.autosaver = autosaver
+    attach_journal(game_manager)
     board.game_manager = game_manager
     hud_manager.set_game_manager(game_manager)
 
-    print("Game restarted!")
+    log.info('game_restarted', "Game restarted!")
+
 
+def main_gamer(screen, width, height, new_game=False, new_game_options=None, load_game=False, load_game_file=None,
+               profiler=None):
+    global game_manager, hud_manager, camera, autosaver
 
-def main_gamer(screen, width, height, new_game=False, new_game_options=None, load_game=False, load_game_file=None):
-    global game_manager, hud_manager, camera
+    if profiler is None:
+        profiler = Profiler()
 
     FPS = 60
     pygame.display.set_caption("Hex Game")
@@ -44,12 +69,13 @@ def main_gamer(screen, width, height, new_game=False, new_game_options=None, loa
         loaded_game = load_game_from_file(filepath=os.path.join('data', 'saves', load_game_file),
                                           hud_manager=hud_manager, camera=camera)
         game_manager = loaded_game
+        game_manager.save_name = load_game_file
         board = game_manager.board
         camera = game_manager.camera
         hud_manager = game_manager.hud_manager
         hud_manager.set_game_manager(game_manager)
 
-        print(f"Game loaded from {load_game_file}!")
+        log.info('game_loaded', "Game loaded from {file}!", file=load_game_file)
 
     elif new_game:
         board = HexBoard(20, 20, 50)
@@ -64,7 +90,7 @@ def main_gamer(screen, width, height, new_game=False, new_game_options=None, loa
         board.camera = camera
         hud_manager.set_game_manager(game_manager)
 
-        print("Starting a new game with options:", new_game_options)
+        log.info('game_started', "Starting a new game with options: {options}", options=new_game_options)
 
     else:
         board = HexBoard(20, 20, 50)
@@ -74,71 +100,112 @@ def main_gamer(screen, width, height, new_game=False, new_game_options=None, loa
         board.camera = camera
         hud_manager.set_game_manager(game_manager)
 
-        print("Starting a new default game.")
+        log.info('game_started', "Starting a new default game.")
 
-    profiler = cProfile.Profile()
-    profiler.enable()
+    autosaver = Autosaver()
+    game_manager.autosaver = autosaver
+    attach_journal(game_manager)
 
     running = True
-    print(f"It's {game_manager.get_current_player()}'s turn.")
+    log.info('turn_started', "It's {player}'s turn.", player=game_manager.get_current_player())
+    scheduler = RenderScheduler(fps=FPS)
+    game_over_shown = False
 
     while running:
-        time_delta = clock.tick(FPS) / 1000.0
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-
-            hud_manager.process_event(event)
-            if hud_manager.is_paused or hud_manager.splash_screen.is_visible:
-                continue
-
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_SPACE:
-                    game_manager.next_player()
-                if event.key == pygame.K_ESCAPE:
-                    game_manager.deselect_unit()
-                    game_manager.deselect_building()
-                else:
-                    game_manager.process_key_press(event)
-
-            if event.type == pygame.MOUSEBUTTONDOWN:
-                if event.button == 1:
-                    game_manager.process_mouse_click(event.pos)
-
-        keys = pygame.key.get_pressed()
-
-        if keys[pygame.K_a]:
-            camera.x -= camera.speed
-        if keys[pygame.K_d]:
-            camera.x += camera.speed
-        if keys[pygame.K_w]:
-            camera.y -= camera.speed
-        if keys[pygame.K_s]:
-            camera.y += camera.speed
-
-        if not hud_manager.is_paused:
-            for sprite in game_manager.all_sprites:
-                sprite.update()
-            hud_manager.update(time_delta)
-        else:
-            hud_manager.update(time_delta)
-
-        screen.fill(board.colors['background'])
-        board.render(screen, camera)
+        time_delta = scheduler.tick(clock)
+        frame_stats = hud_manager.debug_overlay.frame_stats
+        frame_stats.begin_frame()
+
+        with profiler.section('input'), frame_stats.phase('input'):
+            for event in pygame.event.get():
+                scheduler.mark_dirty('input')
+                if event.type == pygame.QUIT:
+                    running = False
+
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_F9:
+                    profiler.start(profiler.window_frames)
+
+                hud_manager.process_event(event)
+                if hud_manager.is_paused or hud_manager.splash_screen.is_visible:
+                    continue
+
+                if event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_SPACE:
+                        game_manager.next_player()
+                    if event.key == pygame.K_ESCAPE:
+                        game_manager.deselect_unit()
+                        game_manager.deselect_building()
+                    else:
+                        game_manager.process_key_press(event)
+
+                if event.type == pygame.MOUSEBUTTONDOWN:
+                    if event.button == 1:
+                        game_manager.process_mouse_click(event.pos)
+
+                if event.type == pygame.MOUSEMOTION:
+                    game_manager.process_mouse_motion(event.pos)
+
+            keys = pygame.key.get_pressed()
+            camera_position = (camera.x, camera.y)
+
+            if keys[pygame.K_a]:
+                camera.x -= camera.speed
+            if keys[pygame.K_d]:
+                camera.x += camera.speed
+            if keys[pygame.K_w]:
+                camera.y -= camera.speed
+            if keys[pygame.K_s]:
+                camera.y += camera.speed
+
+            if (camera.x, camera.y) != camera_position:
+                scheduler.mark_dirty('camera')
 
-        for sprite in game_manager.all_sprites:
-            sprite.render(screen, camera)
-
-        hud_manager.draw(screen)
-
-        if game_manager.game_over:
-            hud_manager.show_game_over_menu(game_manager.game_over_message, game_manager.player_scores)
-
-        pygame.display.flip()
+        board = game_manager.board
 
-    profiler.disable()
-    stats = pstats.Stats(profiler)
-    stats.sort_stats('tottime').print_stats(20)
+        with profiler.section('update'), frame_stats.phase('update'):
+            if not hud_manager.is_paused:
+                if game_manager.update_animations(time_delta):
+                    scheduler.mark_dirty('animation')
+                hud_manager.update(time_delta)
+            else:
+                hud_manager.update(time_delta)
+
+            if hud_manager.has_animations():
+                scheduler.mark_dirty('hud')
+
+        if not scheduler.should_render():
+            scheduler.skipped(time_delta)
+            frame_stats.discard_frame()
+            profiler.end_frame()
+            continue
+
+        with profiler.section('board_render'), frame_stats.phase('board_render'):
+            screen.fill(board.colors['background'])
+            board.render(screen, camera)
+
+        with profiler.section('sprite_render'), frame_stats.phase('sprite_render'):
+            visible_sprites = board.get_visible_entities(screen, camera)
+            for sprite in visible_sprites:
+                sprite.render(screen, camera)
+            frame_stats.counts['visible_sprites'] = len(visible_sprites)
+
+        with profiler.section('hud_draw'), frame_stats.phase('hud_draw'):
+            hud_manager.draw(screen)
+
+            if game_manager.game_over:
+                hud_manager.show_game_over_menu(game_manager.game_over_message, game_manager.player_scores)
+
+            pygame.display.flip()
+        scheduler.rendered()
+        frame_stats.end_frame()
+        profiler.end_frame()
+
+        if game_manager.game_over and not game_over_shown:
+            game_over_shown = True
+            scheduler.mark_dirty('game_over')  # the menu is only drawn on the next frame
+
+    autosaver.close()
+    game_manager.journal.close()
     return False
 
 
@@ -147,6 +214,9 @@ def main():
     width, height = 1000, 800
     screen = pygame.display.set_mode((width, height))
     pygame.display.set_caption("Hex Game")
+    preload_images(variants=SPRITE_VARIANTS)
+    event_log.configure()
+    profiler = Profiler.from_settings()
 
     manager = pygame_gui.UIManager((width, height), os.path.join('data', 'theme', 'game_theme.json'))
     main_menu = MainMenu(screen, manager)
@@ -157,20 +227,22 @@ def main():
         if menu_action == "new_game":
             manager.clear_and_reset()
             new_game_options = menu_data
-            print("New Game Options:", new_game_options)
+            log.debug('menu_new_game', options=new_game_options)
             running = main_gamer(screen, width, height, new_game=True,
-                                 new_game_options=new_game_options)
+                                 new_game_options=new_game_options, profiler=profiler)
         elif menu_action == "load_game":
             manager.clear_and_reset()
             load_game_data = menu_data
-            print("Load Game Data:", load_game_data)
+            log.debug('menu_load_game', data=load_game_data)
             running = main_gamer(screen, width, height, load_game=True,
-                                 load_game_file=load_game_data.get('save_file'))
+                                 load_game_file=load_game_data.get('save_file'), profiler=profiler)
         elif menu_action == "quit":
             running = False
         else:
             running = False
 
+    profiler.stop()
+    log.close()
     pygame.quit()
 
 
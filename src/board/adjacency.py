@@ -0,0 +1,58 @@
+import numpy as np
+
+from src.utils import hex_utils
+
+
+class Adjacency:
+    """
+    CSR neighbor table of the board, built once when the board is created or loaded.
+
+    Tiles are addressed by their flat index (see src.board.storage.offset_index).
+    The neighbors of tile i are indices[indptr[i]:indptr[i + 1]] in the order of
+    hex_utils.DIRECTION_OFFSETS, and entry_cost holds, per edge, the movement cost of
+    entering the neighbor. Missing cells of the layout simply have no edges.
+    """
+
+    def __init__(self, rows, width, valid, movement_cost):
+        self.rows = rows
+        self.width = width
+        self.valid = np.asarray(valid, dtype=bool)
+        size = rows * width
+
+        index = np.arange(size)
+        r = index // width
+        q = index % width - (r + 1) // 2
+
+        neighbors = np.full((size, len(hex_utils.DIRECTION_OFFSETS)), -1, dtype=np.int32)
+        for direction, (dq, dr, _) in enumerate(hex_utils.DIRECTION_OFFSETS):
+            neighbor_r = r + dr
+            neighbor_column = q + dq + (neighbor_r + 1) // 2
+            inside = self.valid & (neighbor_r >= 0) & (neighbor_r < rows) & (neighbor_column >= 0) & (
+                    neighbor_column < width)
+            neighbor_index = np.where(inside, neighbor_r * width + neighbor_column, 0)
+            exists = inside & self.valid[neighbor_index]
+            neighbors[exists, direction] = neighbor_index[exists]
+
+        has_edge = neighbors >= 0
+        self.indptr = np.zeros(size + 1, dtype=np.int32)
+        np.cumsum(has_edge.sum(axis=1), out=self.indptr[1:])
+        self.indices = neighbors[has_edge]
+        self.entry_cost = np.asarray(movement_cost, dtype=np.int32)[self.indices]
+
+        # Plain memoryviews index several times faster than NumPy scalars in the search loops
+        self.indptr_view = memoryview(self.indptr)
+        self.indices_view = memoryview(self.indices)
+        self.entry_cost_view = memoryview(self.entry_cost)
+
+    def neighbors_of(self, index):
+        return self.indices[self.indptr[index]:self.indptr[index + 1]]
+
+    def update_cost(self, index, cost):
+        """
+        Updates the cost of entering tile index after its terrain changed,
+        touching only the edges of its neighbors.
+        """
+        for neighbor in self.neighbors_of(index).tolist():
+            start, end = self.indptr[neighbor], self.indptr[neighbor + 1]
+            edges = start + np.flatnonzero(self.indices[start:end] == index)
+            self.entry_cost[edges] = cost
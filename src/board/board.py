@@ -1,5 +1,17 @@
+import collections
+import contextlib
+import math
+
+import numpy as np
 import pygame
 
+from src.board import pathfinding
+from src.board.adjacency import Adjacency
+from src.board.chunks import ChunkCache
+from src.board.queries import HexQueries
+from src.board.spatial import CityProximityIndex, EntitySpatialIndex
+from src.board.storage import ArrayTileStorage, offset_index, offset_coords, TERRAIN_TYPES, NO_TILE
+from src.board.tile import Tile
 from src.entities.game.registry import TERRAIN_NAME_REVERSE_MAPPING
 from src.utils import hex_utils
 import random
@@ -7,6 +19,22 @@ import random
 from src.terrains.game.terrains import (GrassTerrain, SandTerrain, MountainTerrain)
 
 
+def _overlay_property(name):
+    """
+    Board attribute that marks the cached overlay layer for redraw whenever it is reassigned.
+    """
+    attribute = '_' + name
+
+    def getter(self):
+        return getattr(self, attribute)
+
+    def setter(self, value):
+        setattr(self, attribute, value)
+        self._overlay_dirty = True
+
+    return property(getter, setter)
+
+
 class HexBoard:
     layout = hex_utils.Layout(
         hex_utils.layout_pointy,
@@ -14,16 +42,56 @@ class HexBoard:
         hex_utils.Point(0, 0)
     )
 
-    def __init__(self, rows, cols, size, game_manager=None, initial_grid_data=None):
+    # Boards of at least this many tiles are stored in NumPy layers instead of a dict of Hex objects
+    ARRAY_STORAGE_MIN_TILES = 250_000
+    # Ids of the terrain layer, see src/board/storage.py
+    TERRAIN_IDS = {terrain_class: terrain_id for terrain_id, terrain_class in enumerate(TERRAIN_TYPES)}
+    # New cities can't be built within this distance of an existing one
+    CITY_EXCLUSION_RADIUS = 5
+    # The overlay layer is anchored to a grid of this many pixels and redrawn when the camera leaves its chunk
+    CHUNK_SIZE = 256
+    # Terrain chunks beyond this many bytes are evicted once they leave the screen
+    MAP_CHUNK_BUDGET = 64 * 1024 * 1024
+    # find_path keeps this many most recently used results
+    PATH_CACHE_SIZE = 256
+
+    highlighted_hexes = _overlay_property('highlighted_hexes')
+    reachable_enemy_hexes = _overlay_property('reachable_enemy_hexes')
+    attackable_enemy_hexes = _overlay_property('attackable_enemy_hexes')
+    path_to_target = _overlay_property('path_to_target')
+    selected_tile = _overlay_property('selected_tile')
+    show_city_sites = _overlay_property('show_city_sites')
+
+    def __init__(self, rows, cols, size, game_manager=None, initial_grid_data=None, storage=None,
+                 map_chunk_budget=None, terrain_layer=None):
         self.rows = rows
         self.cols = cols
         self.size = size
         self.game_manager = game_manager
-
-        if initial_grid_data:
+        if storage is None:
+            storage = 'array' if rows * cols >= self.ARRAY_STORAGE_MIN_TILES else 'dict'
+        self.storage = storage
+        self.width = cols + 1  # odd rows hold one tile more than even ones
+        self.tiles = None
+
+        if storage == 'array':
+            if terrain_layer is not None:
+                self.grid = ArrayTileStorage.from_terrain_layer(rows, cols, terrain_layer)
+            elif initial_grid_data:
+                self.grid = ArrayTileStorage.from_tile_data(rows, cols, initial_grid_data)
+            else:
+                self.grid = ArrayTileStorage.generate(rows, cols, (GrassTerrain, SandTerrain, MountainTerrain))
+        elif terrain_layer is not None:
+            self.grid = self._create_grid_from_terrain_layer(terrain_layer)
+        elif initial_grid_data:
             self.grid = self._create_grid_from_data(initial_grid_data)
         else:
             self.grid = self._create_grid()
+        self.adjacency = self._build_adjacency()
+        self.queries = HexQueries(rows, self.width, self.adjacency.valid)
+        self.city_zones = CityProximityIndex(self.queries, self.CITY_EXCLUSION_RADIUS)
+        self.entities = EntitySpatialIndex(rows, self.width)
+        self._occupied = None
 
         self.colors = {
             'white': (255, 255, 255),
@@ -38,79 +106,224 @@ class HexBoard:
         }
         self.font = pygame.font.Font(None, 18)
 
-        self.map_surface = self._create_map_surface()
-        self._render_to_surface(self.map_surface)
+        self._compute_map_bounds()
+        self.map_chunks = ChunkCache(self.CHUNK_SIZE, map_chunk_budget or self.MAP_CHUNK_BUDGET, self._render_chunk)
+        self._build_overlay_stamps()
+        self._overlay_layer = None
+        self._overlay_origin = None
+        self._overlay_dirty = True
+        self._overlay_empty = True
         self.selected_tile = None
         self.highlighted_hexes = []
         self.reachable_enemy_hexes = []
         self.attackable_enemy_hexes = []
         self.path_to_target = []
+        self.show_city_sites = False
+
+        self.movement_field = None
+        self._movement_field_key = None
+        self._path_cache = collections.OrderedDict()
+        self._entity_batch = None
+        self._city_batch = None
 
     def _create_grid(self):
         grid = {}
+        terrains = [terrain_class() for terrain_class in (GrassTerrain, SandTerrain, MountainTerrain)]
         for r in range(self.rows):
             min_q = -r // 2
             max_q = self.cols - r // 2
             for q in range(min_q, max_q):
-                terrain = random.choice((GrassTerrain, SandTerrain, MountainTerrain))()
-                hex_tile = hex_utils.Hex(q, r, -q - r, terrain)
+                hex_tile = Tile(hex_utils.Hex(q, r, -q - r), random.choice(terrains),
+                                index=offset_index(q, r, self.rows, self.width))
                 grid[(hex_tile.q, hex_tile.r, hex_tile.s)] = hex_tile
         return grid
 
     def _create_grid_from_data(self, initial_grid_data):
         grid = {}
+        terrains = {}
         for tile_data in initial_grid_data:
             q = tile_data["q"]
             r = tile_data["r"]
             s = tile_data["s"]
+            index = offset_index(q, r, self.rows, self.width)
+            if index < 0:
+                raise ValueError(f"Tile {q}, {r} is outside of a {self.rows}x{self.cols} board")
             terrain_name = tile_data["terrain"]
-            terrain_class = TERRAIN_NAME_REVERSE_MAPPING.get(
-                terrain_name, GrassTerrain)
-            terrain = terrain_class()
-            hex_tile = hex_utils.Hex(q, r, s, terrain)
+            if terrain_name not in terrains:
+                terrains[terrain_name] = TERRAIN_NAME_REVERSE_MAPPING.get(terrain_name, GrassTerrain)()
+            hex_tile = Tile(hex_utils.Hex(q, r, s), terrains[terrain_name], index=index)
             grid[(hex_tile.q, hex_tile.r, hex_tile.s)] = hex_tile
         return grid
 
-    def _create_map_surface(self):
-        min_x = float('inf')
-        min_y = float('inf')
-        max_x = float('-inf')
-        max_y = float('-inf')
+    def _create_grid_from_terrain_layer(self, terrain_layer):
+        """
+        Builds the dict grid from a flat layer of TERRAIN_TYPES ids, NO_TILE where there is no tile.
+        """
+        grid = {}
+        terrains = [terrain_class() for terrain_class in TERRAIN_TYPES]
+        for index in np.flatnonzero(terrain_layer != NO_TILE).tolist():
+            q, r, s = offset_coords(index, self.width)
+            grid[(q, r, s)] = Tile(hex_utils.Hex(q, r, s), terrains[terrain_layer[index]], index=index)
+        return grid
 
-        for tile in self.grid.values():
-            corners = hex_utils.polygon_corners(self.layout, tile)
-            for corner in corners:
-                min_x = min(min_x, corner.x)
-                min_y = min(min_y, corner.y)
-                max_x = max(max_x, corner.x)
-                max_y = max(max_y, corner.y)
+    def terrain_layer(self):
+        """
+        The board's terrain as a flat layer of TERRAIN_TYPES ids, NO_TILE where there is no tile.
+        Returns a copy, cheap enough to take once per save.
+        """
+        if self.storage == 'array':
+            return self.grid.terrain_layer()
+        return self._terrain_layer.copy()
 
-        total_width = max_x - min_x + 1
-        total_height = max_y - min_y
+    def _build_adjacency(self):
+        """
+        Builds the CSR neighbor table with per-edge terrain entry costs.
+        The dict backend also gets its tiles listed by index.
+        """
+        if self.storage == 'array':
+            return Adjacency(self.rows, self.width, self.grid.valid, self.grid.movement_cost)
+
+        self.tiles = [None] * (self.rows * self.width)
+        valid = np.zeros(len(self.tiles), dtype=bool)
+        movement_cost = np.zeros(len(self.tiles), dtype=np.int32)
+        # kept in sync by set_terrain, so saves copy it instead of walking the tiles
+        self._terrain_layer = np.full(len(self.tiles), NO_TILE, dtype=np.uint8)
+        for tile in self.grid.values():
+            self.tiles[tile.index] = tile
+            valid[tile.index] = True
+            movement_cost[tile.index] = tile.terrain.cost
+            self._terrain_layer[tile.index] = self.TERRAIN_IDS[type(tile.terrain)]
+        return Adjacency(self.rows, self.width, valid, movement_cost)
+
+    def tile_at(self, index):
+        if self.storage == 'array':
+            return self.grid.view(index) if self.grid.valid[index] else None
+        return self.tiles[index]
+
+    def index_of(self, hex):
+        """
+        Returns the flat index of the tile at the coordinates of hex or -1 if the board has none.
+        """
+        index = offset_index(hex.q, hex.r, self.rows, self.width)
+        if index < 0 or self.tile_at(index) is None:
+            return -1
+        return index
+
+    def _occupied_indices(self):
+        if self._occupied is None:
+            if self.storage == 'array':
+                self._occupied = set(np.flatnonzero(self.grid.occupant_id).tolist())
+            else:
+                self._occupied = {tile.index for tile in self.grid.values() if tile.unit is not None}
+        return self._occupied
+
+    def set_terrain(self, tile, terrain):
+        """
+        Changes the terrain of a tile, keeping the adjacency costs and the map surface in sync.
+        """
+        tile.terrain = terrain
+        if self.storage != 'array':
+            self._terrain_layer[tile.index] = self.TERRAIN_IDS[type(terrain)]
+        self.adjacency.update_cost(tile.index, terrain.cost)
+        self.invalidate_movement_cache()
+
+        center = tile.to_pixel(self.layout)
+        margin = max(self.layout.size.x, self.layout.size.y) + 2
+        chunk = self.CHUNK_SIZE
+        self.map_chunks.invalidate(
+            (chunk_x, chunk_y)
+            for chunk_x in range(math.floor((center.x - margin) / chunk), math.floor((center.x + margin) / chunk) + 1)
+            for chunk_y in range(math.floor((center.y - margin) / chunk), math.floor((center.y + margin) / chunk) + 1)
+        )
 
+    def _compute_map_bounds(self):
+        """
+        Computes the pixel size of the map from the tile centers and shifts the layout origin
+        so that the map starts at (0, 0).
+        """
+        orientation = self.layout.orientation
+        size = self.layout.size
+        indices = np.flatnonzero(self.adjacency.valid)
+        r = indices // self.width
+        q = indices % self.width - (r + 1) // 2
+        x = (orientation.f0 * q + orientation.f1 * r) * size.x
+        y = (orientation.f2 * q + orientation.f3 * r) * size.y
+
+        self._corner_offsets = [hex_utils.hex_corner_offset(self.layout, i).get_coords() for i in range(6)]
+        min_x = float(x.min()) + min(dx for dx, _ in self._corner_offsets)
+        max_x = float(x.max()) + max(dx for dx, _ in self._corner_offsets)
+        min_y = float(y.min()) + min(dy for _, dy in self._corner_offsets)
+        max_y = float(y.max()) + max(dy for _, dy in self._corner_offsets)
+
+        self.map_width = int(max_x - min_x + 1)
+        self.map_height = int(max_y - min_y)
         self.layout = hex_utils.Layout(
             hex_utils.layout_pointy,
             self.layout.size,
             hex_utils.Point(-min_x, -min_y)
         )
 
-        surface = pygame.Surface((total_width, total_height), pygame.SRCALPHA)
-
-        return surface
-
-    def _render_to_surface(self, surface):
-        for tile in self.grid.values():
-            if tile is None:
-                continue
-
-            corners = hex_utils.polygon_corners(self.layout, tile)
-            pygame.draw.polygon(surface, tile.terrain.color, [(c.x, c.y) for c in corners], 0)
-            pygame.draw.polygon(surface, self.colors['black'], [(c.x, c.y) for c in corners], 2)
-
-            # text_coords = f"{tile.q}, {tile.r}, {tile.s}"
-            # text_surface = self.font.render(text_coords, True, self.colors['white'])
-            # text_rect = text_surface.get_rect(center=tile.to_pixel(self.layout).get_coords())
-            # surface.blit(text_surface, text_rect)
+    def _render_chunk(self, surface, left, top):
+        """
+        Draws every tile touching the chunk whose top-left map pixel is (left, top).
+        Tiles are drawn row by row like the whole map would be, so chunk borders line up.
+        Rows map straight to pixel rows since the layout is pointy-topped.
+        """
+        orientation = self.layout.orientation
+        size = self.layout.size
+        origin = self.layout.origin
+        margin = max(size.x, size.y) + 2
+        right = left + surface.get_width()
+        bottom = top + surface.get_height()
+        black = self.colors['black']
+
+        row_height = orientation.f3 * size.y
+        first_row = max(0, math.floor((top - margin - origin.y) / row_height))
+        last_row = min(self.rows - 1, math.ceil((bottom + margin - origin.y) / row_height))
+        for r in range(first_row, last_row + 1):
+            first_q = math.floor(((left - margin - origin.x) / size.x - orientation.f1 * r) / orientation.f0)
+            last_q = math.ceil(((right + margin - origin.x) / size.x - orientation.f1 * r) / orientation.f0)
+            center_y = origin.y + row_height * r
+            for q in range(first_q, last_q + 1):
+                index = offset_index(q, r, self.rows, self.width)
+                tile = self.tile_at(index) if index >= 0 else None
+                if tile is None:
+                    continue
+
+                # Snap in map coordinates, so a hex rasterizes the same in every chunk it touches
+                center_x = origin.x + (orientation.f0 * q + orientation.f1 * r) * size.x
+                corners = [(int(center_x + dx) - left, int(center_y + dy) - top) for dx, dy in self._corner_offsets]
+                pygame.draw.polygon(surface, tile.terrain.color, corners, 0)
+                pygame.draw.polygon(surface, black, corners, 2)
+
+    def _build_overlay_stamps(self):
+        """
+        Pre-renders a hex outline per overlay color for the current layout size.
+        Tiles are then overlaid by blitting a stamp at a cached top-left position.
+        """
+        corners = [hex_utils.hex_corner_offset(self.layout, i) for i in range(6)]
+        pad = 2  # outlines are 3px wide and spill over the corners
+        left = math.floor(min(c.x for c in corners)) - pad
+        top = math.floor(min(c.y for c in corners)) - pad
+        width = math.ceil(max(c.x for c in corners)) - left + pad + 1
+        height = math.ceil(max(c.y for c in corners)) - top + pad + 1
+        points = [(c.x - left, c.y - top) for c in corners]
+
+        self._overlay_stamps = {}
+        for name in ('highlight', 'enemy_attackable', 'enemy_reachable', 'path', 'selection'):
+            stamp = pygame.Surface((width, height), pygame.SRCALPHA)
+            pygame.draw.polygon(stamp, self.colors[name], points, 3)
+            self._overlay_stamps[name] = stamp
+        self._stamp_anchor = (left, top)
+        self._stamp_positions = {}
+
+    def _stamp_position(self, tile):
+        position = self._stamp_positions.get(tile.index)
+        if position is None:
+            center = tile.to_pixel(self.layout)
+            position = (round(center.x) + self._stamp_anchor[0], round(center.y) + self._stamp_anchor[1])
+            self._stamp_positions[tile.index] = position
+        return position
 
     def _get_tile_from_pos(self, pos, camera):
         screen_x, screen_y = pos
@@ -133,134 +346,227 @@ class HexBoard:
     def heuristic(self, a, b):
         return hex_utils.cube_distance(a, b)
 
-    def find_path(self, start_tile, goal_tile):
+    def find_path(self, start_tile, goal_tile, max_cost=None):
+        """
+        Finds the cheapest path between two tiles.
+        With max_cost the search gives up as soon as the goal can't be reached within it.
+        The last PATH_CACHE_SIZE results are remembered until a unit moves or dies.
+        """
         if not start_tile or not goal_tile:
             return None, None
 
-        open_set = {start_tile}
-        came_from = {}
-        g_score = {start_tile: 0}
-        f_score = {start_tile: self.heuristic(start_tile, goal_tile)}
+        key = (start_tile.index, goal_tile.index, max_cost)
+        result = self._path_cache.get(key)
+        if result is not None:
+            self._path_cache.move_to_end(key)
+            return result
 
-        while open_set:
-            current = min(open_set, key=lambda tile: f_score.get(tile, float('inf')))
+        path, cost = pathfinding.find_path(self.adjacency, self._occupied_indices(), *key)
+        if path:
+            path = [self.tile_at(index) for index in path]
+        self._path_cache[key] = result = path, cost
+        if len(self._path_cache) > self.PATH_CACHE_SIZE:
+            self._path_cache.popitem(last=False)
+        return result
 
-            if current == goal_tile:
-                path = self._reconstruct_path(came_from, current)
-                return path, g_score[goal_tile]
+    def render(self, screen, camera):
+        chunk = self.CHUNK_SIZE
+        camera_x, camera_y = int(camera.x), int(camera.y)
+        visible = [
+            (chunk_x, chunk_y)
+            for chunk_y in range(max(0, camera_y // chunk),
+                                 min(self.map_height - 1, camera_y + screen.get_height() - 1) // chunk + 1)
+            for chunk_x in range(max(0, camera_x // chunk),
+                                 min(self.map_width - 1, camera_x + screen.get_width() - 1) // chunk + 1)
+        ]
+        screen.blits([(self.map_chunks.get(key), (key[0] * chunk - camera.x, key[1] * chunk - camera.y))
+                      for key in visible], doreturn=False)
+        self.map_chunks.evict(keep=set(visible))
+
+        origin = (camera.x // chunk * chunk, camera.y // chunk * chunk)
+        size = ((screen.get_width() // chunk + 2) * chunk, (screen.get_height() // chunk + 2) * chunk)
+        if (self._overlay_dirty or origin != self._overlay_origin
+                or self._overlay_layer is None or self._overlay_layer.get_size() != size):
+            self._redraw_overlay_layer(origin, size)
+
+        if not self._overlay_empty:
+            screen.blit(self._overlay_layer, (origin[0] - camera.x, origin[1] - camera.y))
+
+    def mark_overlays_dirty(self):
+        """
+        Forces the overlay layer to be redrawn, for when an overlay collection was changed in place.
+        """
+        self._overlay_dirty = True
 
-            open_set.remove(current)
+    def _redraw_overlay_layer(self, origin, size):
+        """
+        Redraws the selection, highlight, path and enemy overlays into a layer covering the
+        screen plus a chunk of margin, anchored at the camera's chunk. While show_city_sites is set,
+        the free city sites are looked up for the covered rows only and highlighted too.
+        """
+        if self._overlay_layer is None or self._overlay_layer.get_size() != size:
+            self._overlay_layer = pygame.Surface(size, pygame.SRCALPHA)
+        self._overlay_layer.fill((0, 0, 0, 0))
+
+        origin_x, origin_y = origin
+        rows = self.get_visible_rows(pygame.Rect(origin, size))
+        visible_rows = {r: (first_q, last_q) for r, first_q, last_q in rows}
+        attackable = set(self.attackable_enemy_hexes)
+        overlays = (
+            ('highlight', self.highlighted_hexes),
+            ('highlight', self.get_city_sites(rows) if self.show_city_sites else []),
+            ('enemy_attackable', self.attackable_enemy_hexes),
+            ('enemy_reachable', [tile for tile in self.reachable_enemy_hexes if tile not in attackable]),
+            ('path', self.path_to_target),
+            ('selection', [self.selected_tile] if self.selected_tile else []),
+        )
 
-            for neighbor_coords in current.get_neighbors():
-                neighbor = self.get_tile_by_hex(neighbor_coords)
-                if neighbor:
-                    temp_g_score = g_score[current] + neighbor.terrain.cost
+        blits = []
+        for name, tiles in overlays:
+            stamp = self._overlay_stamps[name]
+            for tile in tiles or ():
+                span = visible_rows.get(tile.r)
+                if span is None or not span[0] <= tile.q <= span[1]:
+                    continue
+                x, y = self._stamp_position(tile)
+                blits.append((stamp, (x - origin_x, y - origin_y)))
+        self._overlay_layer.blits(blits, doreturn=False)
+
+        self._overlay_origin = origin
+        self._overlay_dirty = False
+        self._overlay_empty = not blits
+
+    def get_visible_rows(self, rect, margin=1):
+        """
+        Converts a map pixel rect to the hexes it shows, as (r, first_q, last_q) spans clipped to the board.
+        margin widens the spans by that many hexes for sprites and outlines spilling over their tile.
+        """
+        top = hex_utils.pixel_to_hex(self.layout, hex_utils.Point(rect.left, rect.top))
+        bottom = hex_utils.pixel_to_hex(self.layout, hex_utils.Point(rect.right, rect.bottom))
+        first_row = max(0, math.floor(top.r) - margin)
+        last_row = min(self.rows - 1, math.ceil(bottom.r) + margin)
+
+        rows = []
+        for r in range(first_row, last_row + 1):
+            y = hex_utils.Hex(0, r, -r).to_pixel(self.layout).y
+            left = hex_utils.pixel_to_hex(self.layout, hex_utils.Point(rect.left, y))
+            right = hex_utils.pixel_to_hex(self.layout, hex_utils.Point(rect.right, y))
+            row_start = -((r + 1) // 2)
+            first_q = max(row_start, math.floor(left.q) - margin)
+            last_q = min(row_start + self.width - 1, math.ceil(right.q) + margin)
+            if first_q <= last_q:
+                rows.append((r, first_q, last_q))
+        return rows
+
+    def get_visible_tiles(self, rect, margin=1):
+        tiles = []
+        for r, first_q, last_q in self.get_visible_rows(rect, margin):
+            row_index = offset_index(first_q, r, self.rows, self.width)
+            for index in range(row_index, row_index + last_q - first_q + 1):
+                tile = self.tile_at(index)
+                if tile is not None:
+                    tiles.append(tile)
+        return tiles
+
+    def get_city_sites(self, spans=None):
+        """
+        Free tiles a new city can be built on, only within (r, first_q, last_q) spans if they are given.
+        """
+        return [tile for tile in map(self.tile_at, self.city_zones.free_indices(spans).tolist())
+                if not tile.building and not tile.unit]
 
-                    if neighbor.unit is None or neighbor == goal_tile:
-                        if temp_g_score < g_score.get(neighbor, float('inf')):
-                            came_from[neighbor] = current
-                            g_score[neighbor] = temp_g_score
-                            f_score[neighbor] = temp_g_score + self.heuristic(neighbor, goal_tile)
-                            if neighbor not in open_set:
-                                open_set.add(neighbor)
+    def get_visible_entities(self, screen, camera):
+        """
+        Returns the buildings and units standing on the hexes under the camera, top rows first,
+        so their cost follows what is on screen rather than everything on the map.
+        """
+        camera_rect = pygame.Rect(camera.x, camera.y, screen.get_width(), screen.get_height())
+        return self.entities.in_spans(self.get_visible_rows(camera_rect))
 
-        return None, None
+    def place_entity(self, entity, tile):
+        """
+        Records entity on tile in the spatial index, or queues it while batch_entities() is active.
+        """
+        if self._entity_batch is not None:
+            self._entity_batch.append((entity, tile.index))
+        else:
+            self.entities.move(entity, tile)
 
-    def _reconstruct_path(self, came_from, current):
-        path = [current]
-        while current in came_from:
-            current = came_from[current]
-            path.append(current)
-        return path[::-1]
+    def add_city(self, city):
+        if self._city_batch is not None:
+            self._city_batch.append(city)
+        else:
+            self.city_zones.add(city)
 
-    def render(self, screen, camera):
-        screen.blit(self.map_surface, (-camera.x, -camera.y))
-
-        if self.highlighted_hexes:
-            for hex in self.highlighted_hexes:
-                corners = hex_utils.polygon_corners(self.layout, hex)
-                pygame.draw.polygon(screen, self.colors['highlight'],
-                                    [(c.x - camera.x, c.y - camera.y) for c in corners], 3)
-
-        for hex_tile in self.attackable_enemy_hexes:
-            corners = hex_utils.polygon_corners(self.layout, hex_tile)
-            pygame.draw.polygon(screen, self.colors['enemy_attackable'],
-                                [(c.x - camera.x, c.y - camera.y) for c in corners], 3)
-
-        for hex_tile in self.reachable_enemy_hexes:
-            if hex_tile not in self.attackable_enemy_hexes:
-                corners = hex_utils.polygon_corners(self.layout, hex_tile)
-                pygame.draw.polygon(screen, self.colors['enemy_reachable'],
-                                    [(c.x - camera.x, c.y - camera.y) for c in corners], 3)
-
-        if self.path_to_target:
-            for hex_tile in self.path_to_target:
-                corners = hex_utils.polygon_corners(self.layout, hex_tile)
-                pygame.draw.polygon(screen, self.colors['path'],
-                                    [(c.x - camera.x, c.y - camera.y) for c in corners], 3)
-
-        if self.selected_tile:
-            corners = hex_utils.polygon_corners(self.layout, self.selected_tile)
-            pygame.draw.polygon(screen, self.colors['selection'],
-                                [(c.x - camera.x, c.y - camera.y) for c in corners], 3)
+    @contextlib.contextmanager
+    def batch_entities(self):
+        """
+        Defers the spatial index and city zone updates of the entities created inside the block
+        to one bulk update at its end, e.g. while a save is loaded.
+        """
+        self._entity_batch, self._city_batch = [], []
+        try:
+            yield
+        finally:
+            placements, cities = self._entity_batch, self._city_batch
+            self._entity_batch = self._city_batch = None
+            self.entities.add_many(placements)
+            self.city_zones.add_many(cities)
+            self.invalidate_movement_cache()
+
+    def get_entities_in_rect(self, rect):
+        return self.entities.in_spans(self.get_visible_rows(rect, margin=0))
+
+    def get_entities_in_radius(self, center_hex, radius):
+        return self.entities.in_radius(center_hex, radius)
+
+    def get_nearest_enemy(self, tile, player, max_radius=None):
+        """
+        Returns the closest unit or building that doesn't belong to player, or None.
+        """
+        return self.entities.nearest(tile, lambda entity: entity.player is not player, max_radius)
 
-    def get_visible_entities(self, screen, camera):
-        visible_entities = []
-        screen_width = screen.get_width()
-        screen_height = screen.get_height()
+    def get_movement_field(self, unit, movement_range=None, extra_steps=0):
+        """
+        Floods the unit's movement once and returns the reachable tiles together with the predecessor map.
+        The field is cached until a unit moves or dies, so paths to any tile can be extracted from it.
+        """
+        budget = movement_range if movement_range is not None else unit.current_movement_range
+        key = (unit, unit.hex_tile, budget)
+        if self._movement_field_key != key or self.movement_field.extra_steps < extra_steps:
+            self.movement_field = pathfinding.flood_movement(self.adjacency, self._occupied_indices(), self.tile_at,
+                                                             unit.hex_tile.index, budget, int(extra_steps))
+            self._movement_field_key = key
+        return self.movement_field
+
+    def invalidate_movement_cache(self):
+        self.movement_field = None
+        self._movement_field_key = None
+        self._path_cache.clear()
+        self._occupied = None
 
-        camera_rect = pygame.Rect(camera.x, camera.y, screen_width, screen_height)
+    def get_reachable_tiles(self, unit, movement_range=None, include_occupied=False, allowed_extra_steps=0):
+        """
+        Tiles the unit can reach. Tiles with other units block movement, unless include_occupied is set:
+        then they are passable and reachable like free ones, with a separate flood that isn't cached.
+        """
+        if include_occupied:
+            budget = movement_range if movement_range is not None else unit.current_movement_range
+            field = pathfinding.flood_movement(self.adjacency, frozenset(), self.tile_at, unit.hex_tile.index,
+                                               budget, int(allowed_extra_steps))
+        else:
+            field = self.get_movement_field(unit, movement_range, allowed_extra_steps)
+        return {self.tile_at(index) for index, extra_used in field.extra_used.items()
+                if extra_used <= allowed_extra_steps and index not in field.occupied_indices}
 
-        for entity in self.game_manager.all_sprites:
-            entity_rect = entity.rect
-            if camera_rect.colliderect(entity_rect):
-                visible_entities.append(entity)
+    def get_hexes_in_radius(self, center_hex: hex_utils.Hex, radius: int) -> list[Tile]:
+        return [self.tile_at(index) for index in self.queries.disk(center_hex.q, center_hex.r, radius).tolist()]
 
-        return visible_entities
+    def get_hexes_in_ring(self, center_hex: hex_utils.Hex, radius: int) -> list[Tile]:
+        return [self.tile_at(index) for index in self.queries.ring(center_hex.q, center_hex.r, radius).tolist()]
 
-    def get_reachable_tiles(self, unit, movement_range=None, include_occupied=False, allowed_extra_steps=0):
-        reachable = set()
-        initial_movement = movement_range if movement_range is not None else unit.current_movement_range
-        queue = [(unit.hex_tile, initial_movement, allowed_extra_steps)]
-        visited = {(unit.hex_tile, initial_movement, allowed_extra_steps)}
-
-        while queue:
-            current_tile, remaining_movement, remaining_extra_steps = queue.pop(0)
-            reachable.add(current_tile)
-
-            for neighbor_coords in current_tile.get_neighbors():
-                neighbor_tile = self.get_tile_by_hex(neighbor_coords)
-                can_move_to_neighbor = True
-                if not include_occupied and neighbor_tile and neighbor_tile.unit is not None:
-                    can_move_to_neighbor = False
-
-                if neighbor_tile and can_move_to_neighbor:
-                    move_cost = neighbor_tile.terrain.cost
-
-                    if remaining_movement > 0:
-                        new_remaining_movement = remaining_movement - move_cost
-                        if new_remaining_movement >= 0 and (
-                                neighbor_tile, new_remaining_movement, remaining_extra_steps) not in visited:
-                            visited.add((neighbor_tile, new_remaining_movement, remaining_extra_steps))
-                            queue.append((neighbor_tile, new_remaining_movement, remaining_extra_steps))
-
-                    if remaining_extra_steps > 0:
-                        if (neighbor_tile, 0, remaining_extra_steps - 1) not in visited:
-                            visited.add((neighbor_tile, 0, remaining_extra_steps - 1))
-                            queue.append((neighbor_tile, 0, remaining_extra_steps - 1))
-
-        return reachable
-
-    def get_hexes_in_radius(self, center_hex: hex_utils.Hex, radius: int) -> list[hex_utils.Hex]:
-        results = []
-        for dq in range(-radius, radius + 1):
-            for dr in range(max(-radius, -dq - radius), min(radius, -dq + radius) + 1):
-                ds = -dq - dr
-                neighbor_coords = hex_utils.Hex(center_hex.q + dq, center_hex.r + dr, center_hex.s + ds)
-                tile = self.get_tile_by_hex(neighbor_coords)
-                if tile:
-                    results.append(tile)
-        return results
+    def get_hexes_in_spiral(self, center_hex: hex_utils.Hex, radius: int) -> list[Tile]:
+        return [self.tile_at(index) for index in self.queries.spiral(center_hex.q, center_hex.r, radius).tolist()]
 
     def clear_selected_tiles(self):
         self.highlighted_hexes = []
@@ -268,3 +574,4 @@ class HexBoard:
         self.attackable_enemy_hexes = []
         self.path_to_target = []
         self.selected_tile = None
+        self.show_city_sites = False
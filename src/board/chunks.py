@@ -0,0 +1,59 @@
+import collections
+
+import pygame
+
+
+class ChunkCache:
+    """
+    LRU cache of fixed-size map surface chunks keyed by (chunk x, chunk y).
+
+    Chunks are rendered on demand by render_chunk(surface, x, y), where x and y are the map
+    pixel coordinates of the chunk's top-left corner. When the cached surfaces exceed
+    budget_bytes, the least recently used chunks that aren't currently visible are dropped.
+    """
+
+    def __init__(self, chunk_size, budget_bytes, render_chunk):
+        self.chunk_size = chunk_size
+        self.budget_bytes = budget_bytes
+        self.render_chunk = render_chunk
+        self.chunks = collections.OrderedDict()
+        self.used_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        surface = self.chunks.get(key)
+        if surface is not None:
+            self.chunks.move_to_end(key)
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        surface = pygame.Surface((self.chunk_size, self.chunk_size), pygame.SRCALPHA)
+        self.render_chunk(surface, key[0] * self.chunk_size, key[1] * self.chunk_size)
+        self.chunks[key] = surface
+        self.used_bytes += self._surface_bytes(surface)
+        return surface
+
+    def evict(self, keep=()):
+        """
+        Drops least recently used chunks until the cache fits its budget, never touching keep.
+        """
+        for key in list(self.chunks):
+            if self.used_bytes <= self.budget_bytes:
+                break
+            if key not in keep:
+                self.used_bytes -= self._surface_bytes(self.chunks.pop(key))
+
+    def invalidate(self, keys=None):
+        """
+        Drops the given chunks, or all of them, so they are rendered again on next use.
+        """
+        for key in list(self.chunks) if keys is None else keys:
+            surface = self.chunks.pop(key, None)
+            if surface is not None:
+                self.used_bytes -= self._surface_bytes(surface)
+
+    @staticmethod
+    def _surface_bytes(surface):
+        return surface.get_width() * surface.get_height() * surface.get_bytesize()
@@ -0,0 +1,161 @@
+import heapq
+import itertools
+
+
+def find_path(adjacency, occupied, start, goal, max_cost=None):
+    """
+    A* search over the board's CSR adjacency, working on flat tile indices.
+
+    Open list is a binary heap ordered by (f, h, insertion order), so ties are
+    resolved deterministically. Indices in occupied are impassable unless they
+    are the goal. When max_cost is given, nodes whose lower bound exceeds it are
+    pruned and the search stops as soon as the budget can't be met.
+
+    Returns (path of indices, cost) or (None, None) when the goal is unreachable.
+    """
+    indptr, indices, entry_cost = adjacency.indptr_view, adjacency.indices_view, adjacency.entry_cost_view
+    width = adjacency.width
+
+    goal_r, goal_column = divmod(goal, width)
+    goal_q = goal_column - (goal_r + 1) // 2
+
+    def heuristic(index):
+        r, column = divmod(index, width)
+        q = column - (r + 1) // 2
+        return max(abs(q - goal_q), abs(r - goal_r), abs(q + r - goal_q - goal_r))
+
+    counter = itertools.count()
+    start_h = heuristic(start)
+    open_heap = [(start_h, start_h, next(counter), 0, start)]
+    came_from = {}
+    g_score = {start: 0}
+
+    while open_heap:
+        f, _, _, current_g, current = heapq.heappop(open_heap)
+        if current_g > g_score[current]:
+            continue  # stale heap entry, a cheaper route was found later
+
+        if max_cost is not None and f > max_cost:
+            break
+
+        if current == goal:
+            return reconstruct_path(came_from, current), current_g
+
+        for edge in range(indptr[current], indptr[current + 1]):
+            neighbor = indices[edge]
+            if neighbor in occupied and neighbor != goal:
+                continue
+
+            tentative_g = current_g + entry_cost[edge]
+            if tentative_g >= g_score.get(neighbor, float('inf')):
+                continue
+
+            h = heuristic(neighbor)
+            if max_cost is not None and tentative_g + h > max_cost:
+                continue
+
+            came_from[neighbor] = current
+            g_score[neighbor] = tentative_g
+            heapq.heappush(open_heap, (tentative_g + h, h, next(counter), tentative_g, neighbor))
+
+    return None, None
+
+
+def reconstruct_path(came_from, current):
+    path = [current]
+    while current in came_from:
+        current = came_from[current]
+        path.append(current)
+    return path[::-1]
+
+
+class MovementField:
+    """
+    Result of a single best-cost flood fill of a unit's movement.
+
+    cost maps the index of every reached tile to the movement points spent on its cheapest route,
+    extra_used to the number of steps taken beyond the budget and came_from to the predecessor.
+    reachable holds the free tiles the unit can move to within its budget,
+    occupied the tiles with other units that were reached but not entered.
+    """
+
+    def __init__(self, tile_at, origin, budget, extra_steps):
+        self.tile_at = tile_at
+        self.origin = origin
+        self.budget = budget
+        self.extra_steps = extra_steps
+        self.cost = {}
+        self.extra_used = {}
+        self.came_from = {}
+        self.reachable_indices = set()
+        self.occupied_indices = set()
+        self._reachable = None
+
+    @property
+    def reachable(self):
+        if self._reachable is None:
+            self._reachable = {self.tile_at(index) for index in self.reachable_indices}
+        return self._reachable
+
+    @property
+    def occupied(self):
+        return {self.tile_at(index) for index in self.occupied_indices}
+
+    def reached(self):
+        return [self.tile_at(index) for index in self.cost]
+
+    def path_to(self, tile):
+        """
+        Extracts the cheapest path to a reachable tile in O(path length).
+        Returns (path, cost) or (None, None) when the tile can't be moved to.
+        """
+        if tile.index not in self.reachable_indices:
+            return None, None
+        path = reconstruct_path(self.came_from, tile.index)
+        return [self.tile_at(index) for index in path], self.cost[tile.index]
+
+
+def flood_movement(adjacency, occupied, tile_at, origin, budget, extra_steps=0):
+    """
+    Dijkstra flood fill from the origin index with the given movement budget.
+
+    Every tile keeps a single best entry ordered by (extra steps used, movement spent):
+    a tile reached within the budget always dominates one reached with extra steps.
+    Extra steps ignore terrain cost and leave no movement for further regular steps.
+    Indices in occupied are reached, but never expanded.
+    """
+    indptr, indices, entry_cost = adjacency.indptr_view, adjacency.indices_view, adjacency.entry_cost_view
+    field = MovementField(tile_at, tile_at(origin), budget, extra_steps)
+    best = {origin: (0, 0)}
+    counter = itertools.count()
+    open_heap = [(0, 0, next(counter), origin)]
+
+    while open_heap:
+        extra_used, cost, _, current = heapq.heappop(open_heap)
+        if best[current] != (extra_used, cost):
+            continue
+
+        field.cost[current] = cost
+        field.extra_used[current] = extra_used
+
+        if current in occupied and current != origin:
+            field.occupied_indices.add(current)
+            continue
+        if extra_used == 0:
+            field.reachable_indices.add(current)
+
+        for edge in range(indptr[current], indptr[current + 1]):
+            neighbor = indices[edge]
+            if extra_used == 0 and cost + entry_cost[edge] <= budget:
+                key = (0, cost + entry_cost[edge])
+            elif extra_used < extra_steps:
+                key = (extra_used + 1, budget)
+            else:
+                continue
+
+            if key < best.get(neighbor, (extra_steps + 1, 0)):
+                best[neighbor] = key
+                field.came_from[neighbor] = current
+                heapq.heappush(open_heap, (key[0], key[1], next(counter), neighbor))
+
+    return field
@@ -0,0 +1,91 @@
+import functools
+
+import numpy as np
+
+from src.utils import hex_utils
+
+
+@functools.lru_cache(maxsize=None)
+def ring_offsets(radius):
+    """
+    (dq, dr) offsets of the hexes at exactly radius from the center, walked counterclockwise
+    from the south-west corner. The table is cached and read-only.
+    """
+    if radius == 0:
+        offsets = [(0, 0)]
+    else:
+        dq, dr, _ = hex_utils.DIRECTION_OFFSETS[4]
+        q, r = dq * radius, dr * radius
+        offsets = []
+        for dq, dr, _ in hex_utils.DIRECTION_OFFSETS:
+            for _ in range(radius):
+                offsets.append((q, r))
+                q, r = q + dq, r + dr
+    return _freeze(np.array(offsets, dtype=np.int32).reshape(-1, 2))
+
+
+@functools.lru_cache(maxsize=None)
+def spiral_offsets(radius):
+    """
+    Offsets of all hexes within radius, ring by ring starting with the center.
+    """
+    return _freeze(np.concatenate([ring_offsets(k) for k in range(radius + 1)]))
+
+
+@functools.lru_cache(maxsize=None)
+def disk_offsets(radius):
+    """
+    Offsets of all hexes within radius in row order, which keeps the resulting indices sorted.
+    """
+    offsets = spiral_offsets(radius)
+    return _freeze(offsets[np.lexsort((offsets[:, 0], offsets[:, 1]))])
+
+
+def _freeze(array):
+    array.setflags(write=False)
+    return array
+
+
+class HexQueries:
+    """
+    Radius, ring and spiral queries over the flat tile indices of a board.
+
+    Each query adds a cached offset table to the center and clips the result to the board,
+    so its cost depends only on the radius. Batched variants take arrays of centers and
+    return one row per center, with -1 where the offset falls outside of the board.
+    """
+
+    def __init__(self, rows, width, valid):
+        self.rows = rows
+        self.width = width
+        self.valid = valid
+
+    def disk(self, q, r, radius):
+        return self._single(q, r, disk_offsets(radius))
+
+    def ring(self, q, r, radius):
+        return self._single(q, r, ring_offsets(radius))
+
+    def spiral(self, q, r, radius):
+        return self._single(q, r, spiral_offsets(radius))
+
+    def disk_many(self, q, r, radius):
+        return self._batched(q, r, disk_offsets(radius))
+
+    def ring_many(self, q, r, radius):
+        return self._batched(q, r, ring_offsets(radius))
+
+    def _single(self, q, r, offsets):
+        indices = self._batched(np.array([q]), np.array([r]), offsets)[0]
+        return indices[indices >= 0]
+
+    def _batched(self, q, r, offsets):
+        q = np.asarray(q, dtype=np.int64).reshape(-1, 1) + offsets[:, 0]
+        r = np.asarray(r, dtype=np.int64).reshape(-1, 1) + offsets[:, 1]
+        column = q + (r + 1) // 2
+        inside = (r >= 0) & (r < self.rows) & (column >= 0) & (column < self.width)
+
+        indices = np.where(inside, r * self.width + column, -1)
+        inside[inside] = self.valid[indices[inside]]
+        indices[~inside] = -1
+        return indices
@@ -0,0 +1,234 @@
+import numpy as np
+
+
+class CityProximityIndex:
+    """
+    Forbidden-zone mask for new cities.
+
+    Every tile keeps the number of cities within radius of it, updated when a city is
+    added or removed, so checking whether a tile is too close to a city is a single lookup.
+    """
+
+    def __init__(self, queries, radius):
+        self.queries = queries
+        self.radius = radius
+        self.city_count = np.zeros(queries.rows * queries.width, dtype=np.int16)
+        self._zones = {}
+
+    def add(self, city):
+        if city in self._zones:
+            return
+        zone = self.queries.disk(city.hex_tile.q, city.hex_tile.r, self.radius)
+        self.city_count[zone] += 1
+        self._zones[city] = zone
+
+    def remove(self, city):
+        zone = self._zones.pop(city, None)
+        if zone is not None:
+            self.city_count[zone] -= 1
+
+    def add_many(self, cities):
+        """
+        Adds the zones of several cities with a single update of the count mask.
+        """
+        new_cities = [city for city in dict.fromkeys(cities) if city not in self._zones]
+        if not new_cities:
+            return
+        zones = [self.queries.disk(city.hex_tile.q, city.hex_tile.r, self.radius) for city in new_cities]
+        self._zones.update(zip(new_cities, zones))
+        np.add.at(self.city_count, np.concatenate(zones), 1)
+
+    def is_forbidden(self, tile):
+        return self.city_count[tile.index] > 0
+
+    def free_indices(self, spans=None):
+        """
+        Indices of the board tiles with no city within radius, or only of those on the hexes
+        of (r, first_q, last_q) spans, as produced by HexBoard.get_visible_rows.
+        """
+        if spans is None:
+            return np.flatnonzero(self.queries.valid & (self.city_count == 0))
+        if not spans:
+            return np.zeros(0, dtype=np.int64)
+        indices = np.concatenate([np.arange(r * self.queries.width + first_q + (r + 1) // 2,
+                                            r * self.queries.width + last_q + (r + 1) // 2 + 1)
+                                  for r, first_q, last_q in spans])
+        return indices[self.queries.valid[indices] & (self.city_count[indices] == 0)]
+
+
+class EntitySpatialIndex:
+    """
+    Units and buildings bucketed by chunk and keyed by the flat index of their tile.
+
+    Tiles are grouped into chunk_tiles x chunk_tiles blocks of offset rows and columns, so area
+    queries only visit the buckets overlapping the area. Entities report their moves through
+    move() and leave with remove(); see GameObject.update_position and the die/destroy methods.
+    """
+
+    def __init__(self, rows, width, chunk_tiles=16):
+        self.rows = rows
+        self.width = width
+        self.chunk_tiles = chunk_tiles
+        self.tiles = {}
+        self.chunks = {}
+        self._positions = {}
+
+    def __len__(self):
+        return len(self._positions)
+
+    def __contains__(self, entity):
+        return entity in self._positions
+
+    def _chunk_of(self, index):
+        r, column = divmod(index, self.width)
+        return r // self.chunk_tiles, column // self.chunk_tiles
+
+    def move(self, entity, tile):
+        """
+        Puts entity on tile, taking it off its previous tile if it had one.
+        """
+        index = tile.index
+        previous = self._positions.get(entity)
+        if previous == index:
+            return
+        if previous is not None:
+            self.remove(entity)
+
+        self._positions[entity] = index
+        self.tiles.setdefault(index, []).append(entity)
+        self.chunks.setdefault(self._chunk_of(index), set()).add(entity)
+
+    def add_many(self, placements):
+        """
+        Bulk move() for (entity, tile index) pairs, the last pair of an entity winning.
+        The chunks of all new positions are computed in one go.
+        """
+        positions = dict(placements)
+        for entity in [entity for entity in positions if entity in self._positions]:
+            self.remove(entity)
+        if not positions:
+            return
+
+        indices = np.fromiter(positions.values(), dtype=np.int64, count=len(positions))
+        r, column = np.divmod(indices, self.width)
+        chunk_rows, chunk_columns = (r // self.chunk_tiles).tolist(), (column // self.chunk_tiles).tolist()
+        self._positions.update(positions)
+        tiles, chunks = self.tiles, self.chunks
+        for (entity, index), chunk_row, chunk_column in zip(positions.items(), chunk_rows, chunk_columns):
+            tiles.setdefault(index, []).append(entity)
+            chunks.setdefault((chunk_row, chunk_column), set()).add(entity)
+
+    def remove(self, entity):
+        index = self._positions.pop(entity, None)
+        if index is None:
+            return
+
+        on_tile = self.tiles[index]
+        on_tile.remove(entity)
+        if not on_tile:
+            del self.tiles[index]
+
+        chunk = self._chunk_of(index)
+        self.chunks[chunk].discard(entity)
+        if not self.chunks[chunk]:
+            del self.chunks[chunk]
+
+    def position_of(self, entity):
+        return self._positions.get(entity)
+
+    def at(self, index):
+        return list(self.tiles.get(index, ()))
+
+    def in_box(self, first_row, last_row, first_column, last_column):
+        """
+        Entities on tiles within the given offset rows and columns, ordered by tile index.
+        """
+        chunk_tiles = self.chunk_tiles
+        found = []
+        for chunk_row in range(first_row // chunk_tiles, last_row // chunk_tiles + 1):
+            for chunk_column in range(first_column // chunk_tiles, last_column // chunk_tiles + 1):
+                for entity in self.chunks.get((chunk_row, chunk_column), ()):
+                    r, column = divmod(self._positions[entity], self.width)
+                    if first_row <= r <= last_row and first_column <= column <= last_column:
+                        found.append(entity)
+        return self._sorted(found)
+
+    def in_spans(self, spans):
+        """
+        Entities on the hexes of (r, first_q, last_q) spans, as produced by HexBoard.get_visible_rows.
+        """
+        if not spans:
+            return []
+        columns = {r: (first_q + (r + 1) // 2, last_q + (r + 1) // 2) for r, first_q, last_q in spans}
+        candidates = self.in_box(spans[0][0], spans[-1][0],
+                                 min(first for first, _ in columns.values()),
+                                 max(last for _, last in columns.values()))
+        found = []
+        for entity in candidates:
+            r, column = divmod(self._positions[entity], self.width)
+            first, last = columns.get(r, (0, -1))
+            if first <= column <= last:
+                found.append(entity)
+        return found
+
+    def in_radius(self, center, radius):
+        """
+        Entities within radius hexes of the center tile, ordered by tile index.
+        """
+        r = center.r
+        column = center.q + (r + 1) // 2
+        candidates = self.in_box(r - radius, r + radius, column - radius - 1, column + radius + 1)
+        return [entity for entity in candidates if self._distance(center, self._positions[entity]) <= radius]
+
+    def nearest(self, center, predicate, max_radius=None):
+        """
+        Returns the closest entity to the center tile that satisfies predicate, or None.
+        Chunks are visited in growing square rings and the search stops once no closer entity can exist.
+        """
+        chunk_tiles = self.chunk_tiles
+        center_chunk = self._chunk_of(center.index)
+        max_ring = max(self.rows, self.width) // chunk_tiles + 1
+        best, best_distance = None, None
+
+        for ring in range(max_ring + 1):
+            # Tiles in this ring are more than (ring - 1) chunks of rows or columns away; half of that is a safe hex bound
+            closest_possible = max(0, (ring - 1) * chunk_tiles + 1) // 2
+            if best is not None and best_distance <= closest_possible:
+                break
+            if max_radius is not None and closest_possible > max_radius:
+                break
+
+            for chunk in self._chunk_ring(center_chunk, ring):
+                for entity in self.chunks.get(chunk, ()):
+                    distance = self._distance(center, self._positions[entity])
+                    if max_radius is not None and distance > max_radius:
+                        continue
+                    if (best is None or (distance, self._positions[entity]) < (best_distance, self._positions[best])) \
+                            and predicate(entity):
+                        best, best_distance = entity, distance
+        return best
+
+    @staticmethod
+    def _chunk_ring(center, ring):
+        chunk_row, chunk_column = center
+        if ring == 0:
+            yield center
+            return
+        for offset in range(-ring, ring + 1):
+            yield chunk_row - ring, chunk_column + offset
+            yield chunk_row + ring, chunk_column + offset
+        for offset in range(-ring + 1, ring):
+            yield chunk_row + offset, chunk_column - ring
+            yield chunk_row + offset, chunk_column + ring
+
+    def _distance(self, center, index):
+        r, column = divmod(index, self.width)
+        q = column - (r + 1) // 2
+        return max(abs(q - center.q), abs(r - center.r), abs(q + r - center.q - center.r))
+
+    def _sorted(self, entities):
+        def key(entity):
+            index = self._positions[entity]
+            return index, self.tiles[index].index(entity)
+
+        return sorted(entities, key=key)
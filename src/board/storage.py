@@ -0,0 +1,274 @@
+import collections.abc
+import weakref
+
+import numpy as np
+
+from src.entities.game.registry import TERRAIN_NAME_MAPPING
+from src.terrains.game.terrains import GrassTerrain
+from src.utils import hex_utils
+
+# Terrain layers index TERRAIN_TYPES; NO_TILE marks cells of the flat layout that hold no tile
+TERRAIN_TYPES = list(TERRAIN_NAME_MAPPING)
+NO_TILE = 255
+
+
+def offset_index(q, r, rows, width):
+    """
+    Flat index of the tile at (q, r) in a board of the given rows and layer width, or -1 outside of it.
+    """
+    column = q + (r + 1) // 2
+    if not (0 <= r < rows and 0 <= column < width):
+        return -1
+    return r * width + column
+
+
+def offset_coords(index, width):
+    r, column = divmod(index, width)
+    q = column - (r + 1) // 2
+    return q, r, -q - r
+
+
+class ArrayTileStorage(collections.abc.Mapping):
+    """
+    Dense tile storage backed by NumPy layers.
+
+    A tile is addressed by its axial offset: row r and column q + (r + 1) // 2, flattened to
+    r * (cols + 1) + column. Odd rows of the board are one tile wider, so the layers are cols + 1
+    columns wide and `valid` marks the cells that actually hold a tile.
+    Units, buildings and owners are stored as integer ids, 0 meaning empty.
+
+    The mapping interface mirrors the dict grid: keys are (q, r, s), values are TileView objects.
+    """
+
+    def __init__(self, rows, cols):
+        self.rows = rows
+        self.cols = cols
+        self.width = cols + 1
+        size = rows * self.width
+
+        self.valid = np.zeros(size, dtype=bool)
+        self.terrain_id = np.zeros(size, dtype=np.uint8)
+        self.movement_cost = np.zeros(size, dtype=np.uint8)
+        self.occupant_id = np.zeros(size, dtype=np.int32)
+        self.building_id = np.zeros(size, dtype=np.int32)
+        self.owner_id = np.zeros(size, dtype=np.int32)
+        self.resources = {}
+
+        self.terrain_types = TERRAIN_TYPES
+        self.terrains = [terrain_class() for terrain_class in self.terrain_types]
+        self.terrain_costs = np.array([terrain.cost for terrain in self.terrains], dtype=np.uint8)
+
+        self._objects = weakref.WeakValueDictionary()
+        self._object_ids = weakref.WeakKeyDictionary()
+        self._next_object_id = 1
+
+    @classmethod
+    def generate(cls, rows, cols, terrain_classes, rng=None):
+        """
+        Creates a board of the standard shape with terrain picked at random from terrain_classes.
+        """
+        storage = cls(rows, cols)
+        rng = rng or np.random.default_rng()
+        choices = np.array([storage.terrain_types.index(terrain_class) for terrain_class in terrain_classes],
+                           dtype=np.uint8)
+
+        columns = np.arange(storage.width)
+        row_of = np.repeat(np.arange(rows), storage.width)
+        valid = (np.tile(columns, rows) < cols) | (row_of % 2 == 1)
+        storage.fill(np.flatnonzero(valid), rng.choice(choices, size=int(valid.sum())))
+        return storage
+
+    @classmethod
+    def from_tile_data(cls, rows, cols, tiles_data):
+        """
+        Creates a board from serialized tile dicts with q, r, s and terrain keys.
+        """
+        storage = cls(rows, cols)
+        terrain_ids = {name: storage.terrain_types.index(terrain_class)
+                       for terrain_class, name in TERRAIN_NAME_MAPPING.items()}
+        grass_id = storage.terrain_types.index(GrassTerrain)
+
+        indices = np.empty(len(tiles_data), dtype=np.int64)
+        ids = np.empty(len(tiles_data), dtype=np.uint8)
+        for i, tile_data in enumerate(tiles_data):
+            index = storage.index_of(tile_data["q"], tile_data["r"], check_valid=False)
+            if index < 0:
+                raise ValueError(f"Tile {tile_data['q']}, {tile_data['r']} is outside of a {rows}x{cols} board")
+            indices[i] = index
+            ids[i] = terrain_ids.get(tile_data["terrain"], grass_id)
+        storage.fill(indices, ids)
+        return storage
+
+    @classmethod
+    def from_terrain_layer(cls, rows, cols, layer):
+        """
+        Creates a board from a flat layer of TERRAIN_TYPES ids with NO_TILE where there is no tile.
+        """
+        storage = cls(rows, cols)
+        indices = np.flatnonzero(layer != NO_TILE)
+        storage.fill(indices, layer[indices])
+        return storage
+
+    def terrain_layer(self):
+        """
+        The terrain ids of the board as a flat layer, NO_TILE where there is no tile.
+        """
+        return np.where(self.valid, self.terrain_id, NO_TILE).astype(np.uint8)
+
+    def fill(self, indices, terrain_ids):
+        """
+        Marks the tiles at indices as present and sets their terrain in one vectorized step.
+        """
+        self.valid[indices] = True
+        self.terrain_id[indices] = terrain_ids
+        self.movement_cost[indices] = self.terrain_costs[terrain_ids]
+
+    def index_of(self, q, r, check_valid=True):
+        """
+        Returns the flat index of the tile at (q, r) or -1 if there is none.
+        """
+        index = offset_index(q, r, self.rows, self.width)
+        if index < 0 or (check_valid and not self.valid[index]):
+            return -1
+        return index
+
+    def coords_of(self, index):
+        return offset_coords(index, self.width)
+
+    def view(self, index):
+        q, r, s = self.coords_of(index)
+        return TileView(self, index, q, r, s)
+
+    def get(self, key, default=None):
+        q, r, _ = key
+        index = self.index_of(q, r)
+        if index < 0:
+            return default
+        return self.view(index)
+
+    def __getitem__(self, key):
+        tile = self.get(key)
+        if tile is None:
+            raise KeyError(key)
+        return tile
+
+    def __contains__(self, key):
+        return self.index_of(key[0], key[1]) >= 0
+
+    def __iter__(self):
+        for index in np.flatnonzero(self.valid).tolist():
+            yield self.coords_of(index)
+
+    def __len__(self):
+        return int(np.count_nonzero(self.valid))
+
+    def values(self):
+        for index in np.flatnonzero(self.valid).tolist():
+            yield self.view(index)
+
+    def terrain_for(self, index):
+        return self.terrains[self.terrain_id[index]]
+
+    def set_terrain(self, index, terrain):
+        terrain_id = self.terrain_types.index(type(terrain))
+        self.terrain_id[index] = terrain_id
+        self.movement_cost[index] = self.terrain_costs[terrain_id]
+
+    def object_id(self, obj):
+        """
+        Returns the integer id under which obj is kept in the layers, registering it if needed.
+        """
+        if obj is None:
+            return 0
+        object_id = self._object_ids.get(obj)
+        if object_id is None:
+            object_id = self._next_object_id
+            self._next_object_id += 1
+            self._object_ids[obj] = object_id
+            self._objects[object_id] = obj
+        return object_id
+
+    def get_object(self, object_id):
+        if not object_id:
+            return None
+        return self._objects.get(int(object_id))
+
+
+class TileView:
+    """
+    Lightweight view of a single tile in ArrayTileStorage.
+
+    Views quack like Hex tiles: they read and write the storage layers and compare
+    equal to any tile with the same coordinates.
+    """
+    __slots__ = ('storage', 'index', 'q', 'r', 's')
+
+    def __init__(self, storage, index, q, r, s):
+        self.storage = storage
+        self.index = index
+        self.q = q
+        self.r = r
+        self.s = s
+
+    to_pixel = hex_utils.Hex.to_pixel  # only needs q and r, no Hex has to be built
+
+    def get_neighbors(self):
+        return self.hex.get_neighbors()
+
+    def __eq__(self, other):
+        if not isinstance(other, (TileView, hex_utils.Hex)):
+            return NotImplemented
+        return self.q == other.q and self.r == other.r and self.s == other.s
+
+    def __hash__(self):
+        return hash((self.q, self.r, self.s))
+
+    def __repr__(self):
+        return f"TileView({self.q}, {self.r}, {self.s})"
+
+    @property
+    def hex(self):
+        return hex_utils.Hex(self.q, self.r, self.s)
+
+    @property
+    def terrain(self):
+        return self.storage.terrain_for(self.index)
+
+    @terrain.setter
+    def terrain(self, terrain):
+        self.storage.set_terrain(self.index, terrain)
+
+    @property
+    def unit(self):
+        return self.storage.get_object(self.storage.occupant_id[self.index])
+
+    @unit.setter
+    def unit(self, unit):
+        self.storage.occupant_id[self.index] = self.storage.object_id(unit)
+
+    @property
+    def building(self):
+        return self.storage.get_object(self.storage.building_id[self.index])
+
+    @building.setter
+    def building(self, building):
+        self.storage.building_id[self.index] = self.storage.object_id(building)
+
+    @property
+    def owner(self):
+        return self.storage.get_object(self.storage.owner_id[self.index])
+
+    @owner.setter
+    def owner(self, owner):
+        self.storage.owner_id[self.index] = self.storage.object_id(owner)
+
+    @property
+    def resource(self):
+        return self.storage.resources.get(self.index)
+
+    @resource.setter
+    def resource(self, resource):
+        if resource is None:
+            self.storage.resources.pop(self.index, None)
+        else:
+            self.storage.resources[self.index] = resource
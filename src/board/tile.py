@@ -0,0 +1,42 @@
+from src.utils import hex_utils
+
+
+class Tile:
+    """
+    Mutable game state of a single board tile: terrain, resource, unit, owner and building.
+    The position is kept as an immutable Hex in `hex`, q, r and s are copied for fast access,
+    index is the flat index of the tile on its board.
+    Tiles compare equal to any tile or Hex with the same coordinates.
+    """
+    __slots__ = ('hex', 'q', 'r', 's', 'index', 'terrain', 'resource', 'unit', 'owner', 'building')
+
+    def __init__(self, hex, terrain, resource=None, unit=None, index=None):
+        self.hex = hex
+        self.index = index
+        self.q = hex.q
+        self.r = hex.r
+        self.s = hex.s
+        self.terrain = terrain
+        self.resource = resource
+        self.unit = unit
+        self.owner = None
+        self.building = None
+
+    def __eq__(self, other):
+        if other is self:
+            return True
+        if not isinstance(other, (Tile, hex_utils.Hex)):
+            return NotImplemented
+        return self.q == other.q and self.r == other.r and self.s == other.s
+
+    def __hash__(self):
+        return hash(self.hex)
+
+    def __repr__(self):
+        return f"Tile({self.q}, {self.r}, {self.s})"
+
+    def to_pixel(self, layout):
+        return self.hex.to_pixel(layout)
+
+    def get_neighbors(self):
+        return self.hex.get_neighbors()
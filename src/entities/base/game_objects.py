@@ -3,9 +3,13 @@ import random
 import pygame
 
 from src.utils import hex_utils
+from src.utils.event_log import log
 from src.utils.utils import load_image
 from src.entities.base.blueprints import UnitBlueprint, TileBuildingBlueprint
 
+UNIT_IMAGE_SIZE = (70, 70)
+BUILDING_IMAGE_SIZE = (90, 90)
+
 
 class GameObject(pygame.sprite.Sprite):
     def __init__(self, hex_tile, image_name, size, game_manager, player,
@@ -14,9 +18,9 @@ class GameObject(pygame.sprite.Sprite):
         self.game_manager = game_manager
         self.hex_tile = hex_tile
         self.hex_tile.unit = self
-        self.image = pygame.transform.scale(load_image(image_name, subdir=image_subdir), size)
+        self.image = load_image(image_name, subdir=image_subdir, size=size)
         self.rect = self.image.get_rect()
-        self.base_y = 0
+        self.pixel_center = (0, 0)
         self.update_position(hex_tile)
         self.player = player
         self.player.all_objects.add(self)
@@ -25,9 +29,10 @@ class GameObject(pygame.sprite.Sprite):
         self.hex_tile.unit = None
         self.hex_tile = hex_tile
         self.hex_tile.unit = self
-        pixel_coords = self.hex_tile.to_pixel(self.game_manager.board.layout).get_coords()
-        self.rect.center = pixel_coords
-        self.base_y = self.rect.centery
+        self.game_manager.board.place_entity(self, hex_tile)
+        self.game_manager.board.invalidate_movement_cache()
+        self.pixel_center = self.hex_tile.to_pixel(self.game_manager.board.layout).get_coords()
+        self.rect.center = self.pixel_center
 
     def render(self, surface, camera):
         surface.blit(self.image, camera.apply(self.rect))
@@ -36,7 +41,7 @@ class GameObject(pygame.sprite.Sprite):
 class Building(GameObject):
     def __init__(self, hex_tile, city_id: str, blueprint: TileBuildingBlueprint, game_manager, player,
                  image_subdir='level_objects'):
-        super().__init__(hex_tile, city_id + ".png", (90, 90), game_manager, player,
+        super().__init__(hex_tile, city_id + ".png", BUILDING_IMAGE_SIZE, game_manager, player,
                          image_subdir)
         self.blueprint = blueprint
         self.hex_tile.unit = None
@@ -55,18 +60,22 @@ class Building(GameObject):
         self.hex_tile.building = None
         self.hex_tile = hex_tile
         self.hex_tile.building = self
-        pixel_coords = self.hex_tile.to_pixel(self.game_manager.board.layout).get_coords()
-        self.rect.center = pixel_coords
-        self.base_y = self.rect.centery
+        self.game_manager.board.place_entity(self, hex_tile)
+        self.pixel_center = self.hex_tile.to_pixel(self.game_manager.board.layout).get_coords()
+        self.rect.center = self.pixel_center
 
     def take_damage(self, amount):
         self.hp -= amount
-        print(f"{self} (Building) took {amount} damage. Current HP: {self.hp}")
+        self.game_manager.animations.play_flash(self)
+        log.info('building_damaged', "{building} (Building) took {amount} damage. Current HP: {hp}",
+                 building=self, amount=amount, hp=self.hp)
         if self.hp <= 0:
-            print(f"{self} (Building) has been destroyed.")
+            log.info('building_destroyed', "{building} (Building) has been destroyed.", building=self)
             self.die()
 
     def die(self):
+        self.game_manager.board.entities.remove(self)
+        self.game_manager.animations.stop(self)
         self.player.buildings.remove(self)
         if self.hex_tile:
             self.hex_tile.building = None
@@ -75,23 +84,25 @@ class Building(GameObject):
 
     def attack_target(self, target_unit):
         if not self.can_attack:
-            print(f"{self} (Building) cannot attack yet or has already attacked.")
+            log.debug('attack_rejected', "{attacker} (Building) cannot attack yet or has already attacked.",
+                      attacker=self)
             return False
 
         distance = hex_utils.cube_distance(self.hex_tile, target_unit.hex_tile)
         if distance > self.attack_range:
-            print(f"{self} (Building) target out of attack range.")
+            log.debug('attack_rejected', "{attacker} (Building) target out of attack range.", attacker=self)
             return False
 
         damage_dealt = random.randint(self.min_damage, self.max_damage)
         target_unit.take_damage(damage_dealt)
-        print(f"{self} (Building) attacked {target_unit} for {damage_dealt} damage.")
+        log.info('building_attacked', "{attacker} (Building) attacked {target} for {damage} damage.",
+                 attacker=self, target=target_unit, damage=damage_dealt)
         self.can_attack = False
 
 
 class Unit(GameObject):
     def __init__(self, hex_tile, unit_id: str, blueprint: UnitBlueprint, player, game_manager):
-        super().__init__(hex_tile, unit_id + '.png', (70, 70), game_manager, player,
+        super().__init__(hex_tile, unit_id + '.png', UNIT_IMAGE_SIZE, game_manager, player,
                          image_subdir='units')
         self.blueprint = blueprint
         self.player = player
@@ -103,14 +114,9 @@ class Unit(GameObject):
             game_manager.player_2_units.add(self)
         self.player.units.add(self)
         self.player.military.add(self)
+        game_manager.invalidate_unit_animations()
 
-        self.jump_offset = 0
-        self.is_jumping = False
         self.selected = False
-        self.frame_count = 0
-        self.JUMP_HEIGHT = 10
-        self.JUMP_INTERVAL = 60
-        self.JUMP_SPEED = 1
 
         self.HEALTH_BAR_WIDTH = 40
         self.HEALTH_BAR_HEIGHT = 8
@@ -133,48 +139,12 @@ class Unit(GameObject):
     def player_id(self):
         return self.player.player_id
 
-    def update(self):
-        self.frame_count += 1
-
-        if self.selected:
-            self._handle_jump()
-            return
-
-        if self.game_manager.is_current_player(self.player) and (
-                self.current_movement_range > 0 or self.can_attack):
-            self._handle_jump()
-        elif not self.is_jumping:
-            pixel_coords = self.hex_tile.to_pixel(self.game_manager.board.layout).get_coords()
-            self.rect.centery = pixel_coords[1]
-
-    def _handle_jump(self):
-        if not self.is_jumping and self.frame_count % self.JUMP_INTERVAL == 0:
-            self.is_jumping = True
-            self.jump_offset = 0
-            self.jump_direction = -1
-
-        if self.is_jumping:
-            if self.jump_direction == -1:
-                self.rect.centery -= self.JUMP_SPEED
-                self.jump_offset += self.JUMP_SPEED
-
-                if self.jump_offset >= self.JUMP_HEIGHT:
-                    self.jump_direction = 1
-
-            elif self.jump_direction == 1:
-                self.rect.centery += self.JUMP_SPEED
-                self.jump_offset -= self.JUMP_SPEED
-
-                if self.jump_offset <= 0:
-                    self.is_jumping = False
-                    pixel_coords = self.hex_tile.to_pixel(self.game_manager.board.layout).get_coords()
-                    self.rect.centery = pixel_coords[1]
-
     def take_damage(self, amount):
         self.hp -= amount
-        print(f"{self} took {amount} damage. Current HP: {self.hp}")
+        self.game_manager.animations.play_flash(self)
+        log.info('unit_damaged', "{unit} took {amount} damage. Current HP: {hp}", unit=self, amount=amount, hp=self.hp)
         if self.hp <= 0:
-            print(f"{self} has been killed.")
+            log.info('unit_killed', "{unit} has been killed.", unit=self)
             self.die()
 
     def die(self):
@@ -190,6 +160,9 @@ class Unit(GameObject):
         if self.hex_tile:
             self.hex_tile.unit = None
             self.hex_tile = None
+        self.game_manager.board.entities.remove(self)
+        self.game_manager.board.invalidate_movement_cache()
+        self.game_manager.animations.stop(self)
 
         super().kill()
 
@@ -197,62 +170,72 @@ class Unit(GameObject):
         if not self.can_attack:
             text = 'Юнит уже атаковал в этом раунде'
             self.game_manager.hud_manager.dynamic_message_manager.create_message(text, mouse_pos)
-            print(f"{self} has already attacked this round.")
+            log.debug('attack_rejected', "{attacker} has already attacked this round.", attacker=self)
             return False
 
         distance = hex_utils.cube_distance(self.hex_tile, target_unit.hex_tile)
         if distance > self.attack_range:
             text = f"Вне радиуса атаки"
             self.game_manager.hud_manager.dynamic_message_manager.create_message(text, mouse_pos)
-            print(text)
+            log.debug('attack_rejected', text, attacker=self, distance=distance)
             return False
 
         damage_dealt = max(0, self.damage + random.randint(-self.damage_spread,
                                                            self.damage_spread))
+        self.game_manager.record_action('attack', actor=self, target=target_unit, damage=damage_dealt)
+        self.apply_attack(target_unit, damage_dealt)
+        return True
+
+    def apply_attack(self, target_unit, damage_dealt):
         target_unit.take_damage(damage_dealt)
-        print(f"{self} attacked {target_unit} for {damage_dealt} damage.")
+        log.info('unit_attacked', "{attacker} attacked {target} for {damage} damage.",
+                 attacker=self, target=target_unit, damage=damage_dealt)
         self.can_attack = False
         self.current_movement_range = 0
         self.is_dug_in = False
-        return True
+
+    def dig_in(self):
+        self.is_dug_in = True
+        self.can_attack = False
+        self.current_movement_range = 0
 
     def move_to(self, target_tile, board, mouse_pos):
         if target_tile == self.hex_tile:
             text = "Уже в этом тайле"
             self.game_manager.hud_manager.dynamic_message_manager.create_message(text, mouse_pos)
-            print(text)
+            log.debug('move_rejected', text, unit=self)
             return False
 
         if target_tile.unit is not None:
             text = "Тайл занят"
             self.game_manager.hud_manager.dynamic_message_manager.create_message(text, mouse_pos)
-            print(text)
+            log.debug('move_rejected', text, unit=self)
             return False
 
-        path, movement_cost = board.find_path(self.hex_tile, target_tile)
-        print(path, movement_cost)
-        if path:
-            if movement_cost <= self.current_movement_range:
-                old_tile = self.hex_tile
-                old_tile.unit = None
-                self.update_position(target_tile)
-                self.current_movement_range -= movement_cost
-                print(
-                    f"Unit moved to: q={self.hex_tile.q}, r={self.hex_tile.r}, s={self.hex_tile.s}. Remaining movement: {self.current_movement_range}")
-                self.is_dug_in = False
-                return True
-            else:
-                text = (f"Для достижения цели не хватает ОД.\n"
-                        f"Осталось: {self.current_movement_range}, нужно: {movement_cost}")
-                self.game_manager.hud_manager.dynamic_message_manager.create_message(text, mouse_pos)
-                print(text)
-                return False
-        else:
-            text = "Целевой тайл недостижим"
+        path, movement_cost = board.get_movement_field(self).path_to(target_tile)
+        if not path:
+            # The search gives up as soon as the remaining movement can't cover the way to the target
+            path, movement_cost = board.find_path(self.hex_tile, target_tile, max_cost=self.current_movement_range)
+        if not path:
+            text = f"Целевой тайл недостижим.\nОсталось ОД: {self.current_movement_range}"
             self.game_manager.hud_manager.dynamic_message_manager.create_message(text, mouse_pos)
-            print(text)
+            log.debug('move_rejected', "Target out of reach with {remaining} movement left",
+                      unit=self, remaining=self.current_movement_range)
             return False
 
+        log.debug('path_found', unit=self, length=len(path), cost=movement_cost)
+        old_tile = self.hex_tile
+        self.game_manager.record_action('move', actor=self, to=target_tile)
+        old_tile.unit = None
+        self.update_position(target_tile)
+        self.game_manager.animations.play_move(
+            self, [tile.to_pixel(board.layout).get_coords() for tile in path])
+        self.current_movement_range -= movement_cost
+        log.info('unit_moved', "Unit moved to: q={q}, r={r}. Remaining movement: {remaining}",
+                 unit=self, q=self.hex_tile.q, r=self.hex_tile.r, remaining=self.current_movement_range)
+        self.is_dug_in = False
+        return True
+
     def on_round_end(self):
         self.current_movement_range = self.max_movement_range
         self.can_attack = True
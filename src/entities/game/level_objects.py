@@ -3,7 +3,7 @@ import pygame
 
 from src.entities.base.game_objects import Building
 from src.utils import hex_utils
-from src.utils.utils import load_image
+from src.utils.event_log import log
 from src.entities.game.registry import CITY_IMPROVEMENT_BLUEPRINTS, UNIT_BLUEPRINTS
 
 
@@ -16,8 +16,6 @@ class City(Building):
 
     def __init__(self, hex_tile, city_id: str, blueprint, game_manager, player):
         super().__init__(hex_tile, city_id, blueprint, game_manager, player)
-        self.image = pygame.transform.scale(
-            load_image(city_id + '.png', subdir="level_objects"), (90, 90))
         self.player = player
 
         self.max_hp = blueprint.base_health
@@ -43,6 +41,7 @@ class City(Building):
         self.stone_income = 0
         self.available_unit_types = []
         self._initialize_city_improvements_blueprints()
+        self.game_manager.board.add_city(self)
 
     def _initialize_city_improvements_blueprints(self):
         self.city_improvement_blueprints = CITY_IMPROVEMENT_BLUEPRINTS
@@ -51,7 +50,9 @@ class City(Building):
     def take_damage(self, damage):
         effective_damage = max(0, damage - self.defense)
         self.hp -= effective_damage
-        print(f"City at {self.hex_tile.q}, {self.hex_tile.r} took {effective_damage} damage. Current HP: {self.hp}")
+        self.game_manager.animations.play_flash(self)
+        log.info('city_damaged', "City at {q}, {r} took {amount} damage. Current HP: {hp}",
+                 q=self.hex_tile.q, r=self.hex_tile.r, amount=effective_damage, hp=self.hp)
         if self.hp <= 0:
             self.destroy()
 
@@ -61,23 +62,31 @@ class City(Building):
         if not self.can_attack:
             text = 'Город уже атаковал в этом раунде'
             self.game_manager.hud_manager.dynamic_message_manager.create_message(text)
-            print(f"{self} has already attacked this round.")
+            log.debug('attack_rejected', "{attacker} has already attacked this round.", attacker=self)
             return False
         distance = hex_utils.cube_distance(self.hex_tile, target_unit.hex_tile)
         if distance > self.attack_range:
             text = f"Вне радиуса атаки"
             self.game_manager.hud_manager.dynamic_message_manager.create_message(text)
-            print(text)
+            log.debug('attack_rejected', text, attacker=self, distance=distance)
             return False
         damage = random.randint(self.min_damage, self.max_damage)
-        print(
-            f"City at {self.hex_tile.q}, {self.hex_tile.r} attacks unit at {target_unit.hex_tile.q}, {target_unit.hex_tile.r} for {damage} damage.")
+        self.game_manager.record_action('attack', actor=self, target=target_unit, damage=damage)
+        self.apply_attack(target_unit, damage)
+        return True
+
+    def apply_attack(self, target_unit, damage):
+        log.info('city_attacked', "City at {q}, {r} attacks unit at {target_q}, {target_r} for {damage} damage.",
+                 q=self.hex_tile.q, r=self.hex_tile.r, target_q=target_unit.hex_tile.q, target_r=target_unit.hex_tile.r,
+                 damage=damage)
         target_unit.take_damage(damage)
         self.can_attack = False
-        return True
 
     def destroy(self):
-        print(f"City at {self.hex_tile.q}, {self.hex_tile.r} has been destroyed!")
+        log.info('city_destroyed', "City at {q}, {r} has been destroyed!", q=self.hex_tile.q, r=self.hex_tile.r)
+        self.game_manager.board.city_zones.remove(self)
+        self.game_manager.board.entities.remove(self)
+        self.game_manager.animations.stop(self)
         self.hex_tile.building = None
         self.player.all_objects.remove(self)
         self.game_manager.military.remove(self)
@@ -85,6 +94,10 @@ class City(Building):
         self.player.buildings.remove(self)
         self.game_manager.all_sprites.remove(self)
 
+    def die(self):
+        self.game_manager.board.city_zones.remove(self)
+        super().die()
+
     def render_health_bar(self, surface, camera):
         if self.hp < self.max_hp:
             bar_x = self.rect.centerx - self.HEALTH_BAR_WIDTH // 2 - camera.x
@@ -177,8 +190,6 @@ class City(Building):
     @property
     def max_food_storage(self):
         base_storage = 20
-        for imp_id in self.city_improvements:
-            print(self.city_improvements[imp_id].provides)
         storage_bonus = sum(int(effect.split(':')[1]) for imp_id in self.city_improvements
                             for effect in self.city_improvements[imp_id].provides if
                             effect.startswith('food_storage:'))
@@ -217,6 +228,7 @@ class City(Building):
         return self.unit_recruitment_blueprints_ui
 
     def start_city_improvement_construction(self, improvement_id):
+        self.game_manager.record_action('construct', actor=self, improvement=improvement_id)
         blueprint = self.city_improvement_blueprints[improvement_id]
         player_resources = self.player.resources
         message_text_parts = []
@@ -255,9 +267,10 @@ class City(Building):
 
         message_text = "\n".join(message_text_parts)
         self.game_manager.hud_manager.dynamic_message_manager.create_message(message_text)
-        print(message_text.replace('\n', ' '))
+        log.info('city_construction', "{text}", text=message_text.replace('\n', ' '), improvement=improvement_id)
 
     def start_unit_recruitment(self, unit_type):
+        self.game_manager.record_action('recruit', actor=self, unit_type=unit_type)
         blueprint = self.unit_recruitment_blueprints_ui[unit_type]
         player_resources = self.player.resources
         message_text_parts = []
@@ -291,14 +304,15 @@ class City(Building):
 
         message_text = "\n".join(message_text_parts)
         self.game_manager.hud_manager.dynamic_message_manager.create_message(message_text)
-        print(message_text.replace('\n', ' '))
+        log.info('unit_recruitment', "{text}", text=message_text.replace('\n', ' '), unit_type=unit_type)
 
     def complete_city_improvement_construction(self):
         if self.city_improvements_in_progress_id:
             improvement_id = self.city_improvements_in_progress_id
             self.city_improvements[improvement_id] = self.city_improvement_blueprints[
                 improvement_id]
-            print(f"Строительство улучшения города {improvement_id} завершено.")
+            log.info('city_improvement_completed', "Строительство улучшения города {improvement} завершено.",
+                     improvement=improvement_id)
             self.city_improvements_in_progress_id = None
             self.apply_city_improvement_effects()
 
@@ -306,6 +320,6 @@ class City(Building):
         if self.unit_recruitment_in_progress_id:
             from src.utils.factories import GameEntityFactory
             unit_id = self.unit_recruitment_in_progress_id
-            print(f"Наем юнита {unit_id} завершен.")
+            log.info('unit_recruited', "Наем юнита {unit_type} завершен.", unit_type=unit_id)
             GameEntityFactory.create_unit(unit_id, self.hex_tile, self.player, self.game_manager)
             self.unit_recruitment_in_progress_id = None
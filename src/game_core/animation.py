@@ -0,0 +1,111 @@
+import pygame
+
+
+class AnimationScheduler:
+    """
+    Time-based sprite animations: idle bob, move tween along a path and damage flash.
+
+    Only entities with an active animation are kept here, so idle sprites cost nothing per frame.
+    Animated entities get rect.center recomputed from their cached pixel_center, the tween position
+    and the bob offset; once an entity has no animations left it is put back on its tile center.
+    """
+    BOB_HEIGHT = 10
+    BOB_INTERVAL = 1.0  # seconds between the starts of two jumps
+    BOB_DURATION = 1 / 3  # seconds a jump lasts
+    MOVE_STEP_DURATION = 0.1  # seconds per tile of a move
+    FLASH_DURATION = 0.25
+    FLASH_TINT = (140, 0, 0)
+
+    def __init__(self):
+        self.time = 0.0
+        self.bobbing = set()
+        self.moves = {}
+        self.flashes = {}
+        self._flash_images = {}
+
+    def is_active(self):
+        return bool(self.bobbing or self.moves or self.flashes)
+
+    def set_bobbing(self, entity, active):
+        if active:
+            self.bobbing.add(entity)
+        elif entity in self.bobbing:
+            self.bobbing.discard(entity)
+            self._place(entity)
+
+    def play_move(self, entity, points):
+        """
+        Slides entity through the given pixel points, ending on its current pixel_center.
+        """
+        if len(points) > 1:
+            self.moves[entity] = [list(points), 0.0]
+            self._place(entity)
+
+    def play_flash(self, entity):
+        original = self.flashes[entity][1] if entity in self.flashes else entity.image
+        tinted = self._flash_images.get(original)
+        if tinted is None:
+            tinted = original.copy()
+            tinted.fill(self.FLASH_TINT, special_flags=pygame.BLEND_RGB_ADD)
+            self._flash_images[original] = tinted
+        entity.image = tinted
+        self.flashes[entity] = [self.FLASH_DURATION, original]
+
+    def stop(self, entity):
+        self.bobbing.discard(entity)
+        self.moves.pop(entity, None)
+        flash = self.flashes.pop(entity, None)
+        if flash is not None:
+            entity.image = flash[1]
+
+    def update(self, time_delta):
+        """
+        Advances all active animations. Returns True if any sprite changed on screen.
+        """
+        self.time += time_delta
+        changed = False
+
+        for entity, flash in list(self.flashes.items()):
+            flash[0] -= time_delta
+            if flash[0] <= 0:
+                entity.image = flash[1]
+                del self.flashes[entity]
+                changed = True
+
+        for entity, move in list(self.moves.items()):
+            move[1] += time_delta
+            if move[1] >= self.MOVE_STEP_DURATION * (len(move[0]) - 1):
+                del self.moves[entity]
+            changed |= self._place(entity)
+
+        for entity in self.bobbing:
+            if entity not in self.moves:
+                changed |= self._place(entity)
+
+        return changed
+
+    def _place(self, entity):
+        x, y = entity.pixel_center
+        move = self.moves.get(entity)
+        if move is not None:
+            x, y = self._tween_position(*move)
+        if entity in self.bobbing:
+            y -= self._bob_offset()
+
+        previous = entity.rect.center
+        entity.rect.center = (x, y)
+        return entity.rect.center != previous
+
+    def _tween_position(self, points, elapsed):
+        step, fraction = divmod(elapsed / self.MOVE_STEP_DURATION, 1)
+        step = int(step)
+        if step >= len(points) - 1:
+            return points[-1]
+        (x0, y0), (x1, y1) = points[step], points[step + 1]
+        return x0 + (x1 - x0) * fraction, y0 + (y1 - y0) * fraction
+
+    def _bob_offset(self):
+        phase = self.time % self.BOB_INTERVAL
+        if phase >= self.BOB_DURATION:
+            return 0
+        return self.BOB_HEIGHT * (1 - abs(2 * phase / self.BOB_DURATION - 1))
@@ -0,0 +1,73 @@
+import collections
+import time
+
+import numpy as np
+
+
+class _Phase:
+    def __init__(self, stats, name):
+        self.stats = stats
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        current = self.stats.current
+        current[self.name] = current.get(self.name, 0.0) + time.perf_counter() - self.start
+
+
+class FrameStats:
+    """
+    Rolling frame timings for the debug overlay.
+
+    The main loop wraps each part of a frame in phase(name) and calls end_frame() after a drawn
+    frame, or discard_frame() when the frame is skipped. The last `window` drawn frames are kept
+    per phase, with the whole frame stored as 'frame'. Times are in seconds.
+    """
+
+    def __init__(self, window=240):
+        self.window = window
+        self.current = {}
+        self.samples = {}
+        self.counts = {}
+        self._phases = {}
+        self._frame_start = time.perf_counter()
+
+    def begin_frame(self):
+        self.current = {}
+        self._frame_start = time.perf_counter()
+
+    def phase(self, name):
+        phase = self._phases.get(name)
+        if phase is None:
+            phase = self._phases[name] = _Phase(self, name)
+        return phase
+
+    def end_frame(self):
+        self.current['frame'] = time.perf_counter() - self._frame_start
+        for name, seconds in self.current.items():
+            samples = self.samples.get(name)
+            if samples is None:
+                samples = self.samples[name] = collections.deque(maxlen=self.window)
+            samples.append(seconds)
+        self.current = {}
+
+    def discard_frame(self):
+        self.current = {}
+
+    def percentiles(self, name, q=(50, 95, 99)):
+        """
+        Percentiles of the phase over the window in milliseconds, zeros if nothing was recorded yet.
+        """
+        samples = self.samples.get(name)
+        if not samples:
+            return tuple(0.0 for _ in q)
+        return tuple(float(value) * 1000 for value in np.percentile(samples, q))
+
+    def mean(self, name):
+        samples = self.samples.get(name)
+        if not samples:
+            return 0.0
+        return sum(samples) / len(samples) * 1000
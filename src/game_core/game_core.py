@@ -1,11 +1,15 @@
 import os
 
+import numpy as np
 import pygame
 
 from src.entities.game.level_objects import City
+from src.game_core.animation import AnimationScheduler
 from src.game_core.states.states import SelectingUnitState, UnitSelectedState, BuildingSelectedState, \
     BuildingNewCityState
+from src.utils.event_log import log
 from src.utils.serialization import save_game
+from src.utils.journal import JOURNAL_EXTENSION
 from src.utils.factories import GameEntityFactory
 from src.entities.game.registry import CITY_BLUEPRINTS
 import random
@@ -83,7 +87,7 @@ class Player:
 
 
 class GameManager:
-    def __init__(self, players, board, camera, hud_manager, save_name='savegame.json'):
+    def __init__(self, players, board, camera, hud_manager, save_name='savegame.json', place_starting_cities=True):
         self.selected_building = None
         self.players = list(players)
         self.current_player_index = 0
@@ -103,6 +107,9 @@ class GameManager:
 
         self.players_to_remove = []
 
+        self.animations = AnimationScheduler()
+        self._unit_animations_dirty = True
+
         self.selecting_unit_state = SelectingUnitState(self, board, camera, self.hud_manager)
         self.unit_selected_state = UnitSelectedState(self, board, camera, self.hud_manager)
         self.building_selected_state = BuildingSelectedState(self, board, camera, self.hud_manager)
@@ -112,30 +119,27 @@ class GameManager:
         self.game_over = False
         self.game_over_message = ""
 
+        self.journal = None
+
         self.update_player_resources()
-        self.initialize_players()
+        if place_starting_cities:
+            self.initialize_players()
 
         self.camera.x = self.get_current_player().camera_x
         self.camera.y = self.get_current_player().camera_y
 
         self.save_name = save_name
+        self.autosaver = None
 
         self.new_city_origin = None
 
     def initialize_players(self):
         """Initializes each player with a city and a warrior unit at a random location."""
-        available_hexes = list(self.board.grid.values())
-        random.shuffle(available_hexes)
-
         for player in self.players:
-            while True:
-                if not available_hexes:
-                    print("Error: Not enough available hexes for all players.")
-                    return
-
-                start_hex = available_hexes.pop()
-                if self.can_build_new_city_on_tile(start_hex):
-                    break
+            start_hex = self._random_new_city_tile()
+            if start_hex is None:
+                log.error('not_enough_start_hexes', "Error: Not enough available hexes for all players.")
+                return
 
             GameEntityFactory.create_city('city', start_hex, player, self)
             warrior = GameEntityFactory.create_unit('warrior', start_hex, player, self)
@@ -149,6 +153,7 @@ class GameManager:
         """Advances the game to the next player's turn and ends round if necessary."""
         if self.game_over:
             return
+        self.record_action('end_turn')
 
         current_player = self.get_current_player()
         if current_player:
@@ -161,8 +166,10 @@ class GameManager:
         self.board.highlighted_hexes = []
         self.selected_unit = None
         self.current_state = self.selecting_unit_state
+        self.invalidate_unit_animations()
 
-        if (self.current_player_index + 1) % len(self.players) == 0:
+        round_ended = (self.current_player_index + 1) % len(self.players) == 0
+        if round_ended:
             self.end_round()
             if self.game_over:
                 return
@@ -178,12 +185,19 @@ class GameManager:
         else:
             return
 
-        print('=' * 50)
+        log.info('separator', '=' * 50)
         if self.players:
             self.hud_manager.show_player_turn_splash_screen(self.get_current_player())
-            print(f"It's {self.get_current_player()}'s turn.")
+            log.info('turn_started', "It's {player}'s turn.", player=self.get_current_player())
             self.update_player_resources()
 
+        if round_ended:
+            # snapshots are taken once the next player's turn has started, so they load into it
+            if self.journal is not None:
+                self.journal.on_round_end(self)
+            if self.autosaver is not None:
+                self.autosaver.autosave(self)
+
     def get_current_player(self):
         if self.players:
             return self.players[self.current_player_index]
@@ -195,13 +209,13 @@ class GameManager:
 
     def end_round(self):
         """Ends the current round and initiates the next round."""
-        print(f"--- End of Round {self.current_round} ---")
+        log.info('round_ended', "--- End of Round {round} ---", round=self.current_round)
 
         self.players_to_remove = []
         for player in self.players:
             if not player.military:
                 self.players_to_remove.append(player)
-                print(f"{player} has lost the game!")
+                log.info('player_lost', "{player} has lost the game!", player=player)
 
         for player in self.players_to_remove:
             if self.current_player_index >= len(self.players):
@@ -215,20 +229,20 @@ class GameManager:
             if self.players:
                 winner = self.players[0]
                 self.game_over_message = f"Игра окончена! {winner} - победитель!"
-                print(f"Игра окончена! {winner} - победитель!")
+                log.info('game_over', "Игра окончена! {winner} - победитель!", winner=winner)
 
                 player_scores = {}
                 for p in self.players:
                     player_score = p.calculate_score()
                     player_scores[p.player_id] = player_score
-                    print(f"Очки игрока {p.player_id}: {player_score}")
+                    log.info('player_score', "Очки игрока {player_id}: {score}", player_id=p.player_id, score=player_score)
 
                 self.player_scores = player_scores
                 self.hud_manager.show_game_over_menu(self.game_over_message, player_scores)
 
             else:
                 self.game_over_message = "Игра окончена! Ничья (не осталось игроков)."
-                print("Игра окончена! Ничья (не осталось игроков).")
+                log.info('game_over', "{text}", text=self.game_over_message)
                 self.player_scores = {}
                 self.hud_manager.show_game_over_menu(self.game_over_message, {})
             return
@@ -240,7 +254,7 @@ class GameManager:
                 building.on_round_end()
 
         self.current_round += 1
-        print(f"--- Starting Round {self.current_round} ---")
+        log.info('round_started', "--- Starting Round {round} ---", round=self.current_round)
 
     def update_player_resources(self):
         current_player = self.get_current_player()
@@ -280,54 +294,77 @@ class GameManager:
             current_player.resources[res_type] = max(0, current_player.resources[
                 res_type])
 
-        print(f"{current_player} resources at the start of turn (Round {self.current_round}):")
-        print(
-            f"  Food: {current_player.resources['food']} (+{current_player.income['food']} - {current_player.expense['food']})")
-        print(
-            f"  Gold: {current_player.resources['gold']} (+{current_player.income['gold']} - {current_player.expense['gold']})")
-        print(
-            f"  Stone: {current_player.resources['stone']} (+{current_player.income['stone']} - {current_player.expense['stone']})")
-        print(f"  Wood: {current_player.resources['wood']}")
-        print(f"  Metal: {current_player.resources['metal']}")
+        log.debug('player_resources', player=current_player, round=self.current_round,
+                  resources=current_player.resources, income=current_player.income, expense=current_player.expense)
 
         self.hud_manager.update_resource_values(current_player.resources, current_player.income, current_player.expense)
 
+    def record_action(self, action, actor=None, target=None, **fields):
+        """
+        Appends a player action to the journal, if the game has one. Entities and tiles are stored
+        by their [q, r] so the action can be replayed on a restored game.
+        """
+        if self.journal is None or self.journal.replaying:
+            return
+        for name, value in (('actor', actor), ('target', target)):
+            if value is not None:
+                tile = getattr(value, 'hex_tile', value)
+                fields[name] = [tile.q, tile.r]
+                if value is not tile:
+                    fields[name + '_kind'] = 'unit' if tile.unit is value else 'building'
+        for name, value in fields.items():
+            if hasattr(value, 'q') and hasattr(value, 'r'):
+                fields[name] = [value.q, value.r]
+        self.journal.record(action, **fields)
+
+    def invalidate_unit_animations(self):
+        self._unit_animations_dirty = True
+
+    def refresh_unit_animations(self):
+        """
+        Idle bob for the selected unit and the current player's units that can still act.
+        """
+        for unit in self.all_units:
+            can_act = self.is_current_player(unit.player) and (unit.current_movement_range > 0 or unit.can_attack)
+            self.animations.set_bobbing(unit, unit.selected or can_act)
+        self._unit_animations_dirty = False
+
+    def update_animations(self, time_delta):
+        """
+        Advances sprite animations. Returns True if anything on screen moved or changed.
+        """
+        if self._unit_animations_dirty:
+            self.refresh_unit_animations()
+        return self.animations.update(time_delta)
+
     def process_mouse_click(self, pos):
         if not self.game_over:
             self.current_state.handle_mouse_click(pos)
+            self.invalidate_unit_animations()
+
+    def process_mouse_motion(self, pos):
+        if not self.game_over:
+            self.current_state.handle_mouse_motion(pos)
+
+    def _is_enemy_target(self, tile):
+        if tile.unit and self.is_current_player(tile.unit.player):
+            return False
+        if tile.building and self.is_current_player(tile.building.player):
+            return False
+        return bool(tile.unit or tile.building)
+
+    def _enemy_targets_in_range(self, attacker):
+        entities = self.board.get_entities_in_radius(attacker.hex_tile, attacker.attack_range)
+        return list(dict.fromkeys(entity.hex_tile for entity in entities if self._is_enemy_target(entity.hex_tile)))
 
     def update_ui_for_selected_unit(self):
         if self.selected_unit:
             self.hud_manager.elements['unit_info_text'].html_text = self.selected_unit.get_unit_info_text()
             self.hud_manager.elements['unit_info_text'].rebuild()
-            self.board.reachable_enemy_hexes = self.board.get_reachable_tiles(
-                self.selected_unit,
-                self.selected_unit.current_movement_range,
-                True, True)
-            for hex in self.board.reachable_enemy_hexes.copy():
-                if hex.unit and self.is_current_player(hex.unit.player):
-                    self.board.reachable_enemy_hexes.remove(hex)
-                    continue
-                elif hex.building and self.is_current_player(hex.building.player):
-                    self.board.reachable_enemy_hexes.remove(hex)
-                    continue
-                elif not hex.unit and not hex.building:
-                    self.board.reachable_enemy_hexes.remove(hex)
-                    continue
-
-            self.board.attackable_enemy_hexes = self.board.get_hexes_in_radius(self.selected_unit.hex_tile,
-                                                                               self.selected_unit.attack_range)
-
-            for hex in self.board.attackable_enemy_hexes.copy():
-                if hex.unit and self.is_current_player(hex.unit.player):
-                    self.board.attackable_enemy_hexes.remove(hex)
-                    continue
-                elif hex.building and self.is_current_player(hex.building.player):
-                    self.board.attackable_enemy_hexes.remove(hex)
-                    continue
-                elif not hex.unit and not hex.building:
-                    self.board.attackable_enemy_hexes.remove(hex)
-                    continue
+            movement_field = self.board.get_movement_field(self.selected_unit, extra_steps=1)
+            self.board.highlighted_hexes = movement_field.reachable
+            self.board.reachable_enemy_hexes = {hex for hex in movement_field.reached() if self._is_enemy_target(hex)}
+            self.board.attackable_enemy_hexes = self._enemy_targets_in_range(self.selected_unit)
 
         else:
             self.hud_manager.elements['unit_info_text'].html_text = "Select a unit to see information."
@@ -340,18 +377,7 @@ class GameManager:
             self.hud_manager.elements['unit_info_text'].html_text = self.selected_building.get_unit_info_text()
             self.hud_manager.elements['unit_info_text'].rebuild()
 
-            self.board.attackable_enemy_hexes = self.board.get_hexes_in_radius(
-                self.selected_building.hex_tile,
-                self.selected_building.attack_range
-            )
-
-            for hex in self.board.attackable_enemy_hexes.copy():
-                if hex.unit and self.is_current_player(hex.unit.player):
-                    self.board.attackable_enemy_hexes.remove(hex)
-                elif hex.building and self.is_current_player(hex.building.player):
-                    self.board.attackable_enemy_hexes.remove(hex)
-                elif not hex.unit and not hex.building:
-                    self.board.attackable_enemy_hexes.remove(hex)
+            self.board.attackable_enemy_hexes = self._enemy_targets_in_range(self.selected_building)
 
         else:
             self.hud_manager.elements['unit_info_text'].html_text = "Select a unit or building to see information."
@@ -363,6 +389,7 @@ class GameManager:
         if self.selected_unit:
             self.selected_unit.selected = False
             self.selected_unit = None
+            self.invalidate_unit_animations()
             self.board.clear_selected_tiles()
             self.update_ui_for_selected_unit()
             self.current_state = self.selecting_unit_state
@@ -392,35 +419,46 @@ class GameManager:
             if event.key == pygame.K_g:
                 if self.selected_unit and self.is_current_player(self.selected_unit.player):
                     if self.selected_unit.can_attack and not self.selected_unit.is_dug_in:
-                        self.selected_unit.is_dug_in = True
-                        self.selected_unit.can_attack = False
-                        self.selected_unit.current_movement_range = 0
+                        self.record_action('dig_in', actor=self.selected_unit)
+                        self.selected_unit.dig_in()
                         text = f"{self.selected_unit.blueprint.name} окопался!"
                         self.hud_manager.dynamic_message_manager.create_message(text)
                         self.deselect_unit()
-                        print(text)
+                        log.info('unit_dug_in', text)
                         self.update_ui_for_selected_unit()
                     elif self.selected_unit.is_dug_in:
                         text = f"{self.selected_unit.blueprint.name} уже окопался!"
                         self.hud_manager.dynamic_message_manager.create_message(text)
-                        print(text)
+                        log.debug('dig_in_rejected', text)
                     elif not self.selected_unit.can_attack:
                         text = f"{self.selected_unit.blueprint.name} не может окопаться т/к атаковал!"
                         self.hud_manager.dynamic_message_manager.create_message(text)
-                        print(text)
+                        log.debug('dig_in_rejected', text)
             if event.key == pygame.K_s:
                 self.save_game()
+            self.invalidate_unit_animations()
 
     def save_game(self):
-        """Saves the current game state to a JSON file."""
+        """
+        Saves the current game state, in the background if there is an autosaver. A journaled game
+        also syncs its journal; a game loaded from a journal is saved as JSON under the same name.
+        """
+        if self.journal is not None:
+            self.journal.sync()
         save_path = os.path.join('data', 'saves', self.save_name)
-        save_game(self, filename=save_path)
+        if save_path.endswith(JOURNAL_EXTENSION):
+            save_path = os.path.splitext(save_path)[0] + '.json'
+        if self.autosaver is not None:
+            self.autosaver.save(self, save_path)
+        else:
+            save_game(self, filename=save_path)
 
     def start_new_city_construction(self, city):
         self.current_state = self.building_new_city_state
         self.new_city_origin = city
-        print(
-            f"Начато строительство нового города игроком {city.player.player_id} из города {city.hex_tile.q, city.hex_tile.r}")
+        self.board.show_city_sites = True
+        log.info('new_city_started', "Начато строительство нового города игроком {player_id} из города ({q}, {r})",
+                 player_id=city.player.player_id, q=city.hex_tile.q, r=city.hex_tile.r)
 
     def can_build_new_city_on_tile(self, tile):
         """
@@ -428,14 +466,27 @@ class GameManager:
         """
         if tile.building or tile.unit:
             return False
+        return not self.board.city_zones.is_forbidden(tile)
 
-        radius = 5
-        nearby_tiles = self.board.get_hexes_in_radius(tile, radius)
-        for nearby_tile in nearby_tiles:
-            if nearby_tile.building and isinstance(nearby_tile.building, City):
-                return False
+    def get_new_city_tiles(self, rect=None):
+        """
+        Возвращает тайлы, на которых сейчас можно построить новый город: все или только видимые в rect.
+        """
+        return self.board.get_city_sites(None if rect is None else self.board.get_visible_rows(rect))
 
-        return True
+    def _random_new_city_tile(self):
+        """
+        Picks a random tile a new city can be built on, or None if there is none.
+        Only the free-tile indices are listed, so no tile objects are built for the whole board.
+        """
+        free = self.board.city_zones.free_indices()
+        while len(free):
+            i = random.randrange(len(free))
+            tile = self.board.tile_at(int(free[i]))
+            if not tile.building and not tile.unit:
+                return tile
+            free = np.delete(free, i)
+        return None
 
     def build_new_city_on_tile(self, tile, player):
         """
@@ -446,6 +497,7 @@ class GameManager:
                 player.resources["wood"] >= city_blueprint.cost_wood and
                 player.resources["stone"] >= city_blueprint.cost_stone):
 
+            self.record_action('build_city', tile=tile, player_id=player.player_id)
             player.resources["gold"] -= city_blueprint.cost_gold
             player.resources["wood"] -= city_blueprint.cost_wood
             player.resources["stone"] -= city_blueprint.cost_stone
@@ -454,11 +506,13 @@ class GameManager:
             GameEntityFactory.create_city('city', tile, player, self)
             self.current_state = self.selecting_unit_state
             self.new_city_origin = None
-            self.board.highlighted_hexes = []
-            print(f"Построен новый город на тайле {tile.q, tile.r} игроком {player.player_id}")
+            self.board.show_city_sites = False
+            log.info('new_city_built', "Построен новый город на тайле ({q}, {r}) игроком {player_id}",
+                     q=tile.q, r=tile.r, player_id=player.player_id)
         else:
-            print(f"Недостаточно ресурсов для строительства города игроком {player.player_id}")
+            log.info('new_city_rejected', "Недостаточно ресурсов для строительства города игроком {player_id}",
+                     player_id=player.player_id)
             self.hud_manager.dynamic_message_manager.create_message("Недостаточно ресурсов для строительства города!")
             self.current_state = self.selecting_unit_state
             self.new_city_origin = None
-            self.board.highlighted_hexes = []
+            self.board.show_city_sites = False
@@ -0,0 +1,42 @@
+class RenderScheduler:
+    """
+    Render-on-demand bookkeeping for the main loop.
+
+    Input, camera movement, sprite animation and HUD changes mark the frame dirty through
+    mark_dirty(source). A frame is drawn only when something is dirty; once nothing has changed
+    for idle_after seconds, the loop ticks at idle_fps instead of fps until the next change.
+    """
+
+    def __init__(self, fps=60, idle_fps=15, idle_after=0.5):
+        self.fps = fps
+        self.idle_fps = idle_fps
+        self.idle_after = idle_after
+        self.dirty = {'start'}
+        self.idle_time = 0.0
+        self.frames_drawn = 0
+        self.frames_skipped = 0
+
+    @property
+    def is_idle(self):
+        return self.idle_time >= self.idle_after
+
+    def tick(self, clock):
+        """
+        Waits for the next frame at the current rate and returns the elapsed time in seconds.
+        """
+        return clock.tick(self.idle_fps if self.is_idle else self.fps) / 1000.0
+
+    def mark_dirty(self, source):
+        self.dirty.add(source)
+
+    def should_render(self):
+        return bool(self.dirty)
+
+    def rendered(self):
+        self.dirty.clear()
+        self.idle_time = 0.0
+        self.frames_drawn += 1
+
+    def skipped(self, time_delta):
+        self.idle_time += time_delta
+        self.frames_skipped += 1
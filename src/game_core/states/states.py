@@ -1,3 +1,6 @@
+from src.utils.event_log import log
+
+
 class GameState:
     def __init__(self, game_manager, board, camera, hud_manager):
         self.game_manager = game_manager
@@ -15,24 +18,27 @@ class GameState:
         self.board.reachable_enemy_hexes = []
         self.board.attackable_enemy_hexes = []
         self.board.highlighted_hexes = []
+        self.board.show_city_sites = False
+
+    def handle_mouse_motion(self, pos):
+        pass
 
 
 class SelectingUnitState(GameState):
     def handle_mouse_click(self, pos):
         clicked_tile = self.board.get_click(pos, self.camera)
         if not clicked_tile:
-            print("Clicked outside the grid.")
+            log.debug('click_outside_grid', "Clicked outside the grid.", x=pos[0], y=pos[1])
             return
 
         self.board.selected_tile = clicked_tile
 
         if clicked_tile.unit:
             if self.game_manager.is_current_player(clicked_tile.unit.player):
-                print(f"Clicked unit: {clicked_tile.unit}")
+                log.debug('unit_clicked', "Clicked unit: {unit}", unit=clicked_tile.unit)
                 self.game_manager.selected_unit = clicked_tile.unit
                 self.game_manager.current_state = self.game_manager.unit_selected_state
                 self.game_manager.update_ui_for_selected_unit()
-                self.board.highlighted_hexes = self.board.get_reachable_tiles(clicked_tile.unit)
             else:
                 self.game_manager.selected_unit = None
                 self.game_manager.selected_building = None
@@ -44,7 +50,7 @@ class SelectingUnitState(GameState):
                 self.board.highlighted_hexes = []
         elif clicked_tile.building:
             if self.game_manager.is_current_player(clicked_tile.building.player):
-                print(f"Clicked building: {clicked_tile.building}")
+                log.debug('building_clicked', "Clicked building: {building}", building=clicked_tile.building)
                 self.game_manager.selected_building = clicked_tile.building
                 self.game_manager.current_state = self.game_manager.building_selected_state
                 self.game_manager.update_ui_for_selected_building()
@@ -62,10 +68,33 @@ class SelectingUnitState(GameState):
 
 
 class UnitSelectedState(GameState):
+    # A click on a tile out of reach previews the way there if the unit can walk it in this many turns
+    PREVIEW_TURNS = 3
+
+    def __init__(self, game_manager, board, camera, hud_manager):
+        super().__init__(game_manager, board, camera, hud_manager)
+        self.previewed = None
+
+    def handle_mouse_motion(self, pos):
+        hovered_tile = self.board.get_click(pos, self.camera)
+        selected_unit = self.game_manager.selected_unit
+        if not selected_unit or not hovered_tile:
+            self.previewed = None
+            self.board.path_to_target = []
+            return
+
+        movement_field = self.board.get_movement_field(selected_unit)
+        if self.previewed == (hovered_tile, movement_field):
+            return
+        self.previewed = (hovered_tile, movement_field)
+
+        path, _ = movement_field.path_to(hovered_tile)
+        self.board.path_to_target = path if path and len(path) > 1 else []
+
     def handle_mouse_click(self, pos):
         clicked_tile = self.board.get_click(pos, self.camera)
         if not clicked_tile:
-            print("Clicked outside the grid.")
+            log.debug('click_outside_grid', "Clicked outside the grid.", x=pos[0], y=pos[1])
             return
 
         selected_unit = self.game_manager.selected_unit
@@ -79,11 +108,10 @@ class UnitSelectedState(GameState):
                     self._reset_selection()
                     self.game_manager.current_state = self.game_manager.selecting_unit_state
             else:
-                print(f"Clicked unit: {clicked_tile.unit}")
+                log.debug('unit_clicked', "Clicked unit: {unit}", unit=clicked_tile.unit)
                 self.game_manager.selected_unit = clicked_tile.unit
                 self.game_manager.update_ui_for_selected_unit()
                 self.board.selected_tile = clicked_tile
-                self.board.highlighted_hexes = self.board.get_reachable_tiles(clicked_tile.unit)
         elif clicked_tile.building and not self.game_manager.is_current_player(clicked_tile.building.player):
             if selected_unit.attack(clicked_tile.building, pos):
                 self._reset_selection()
@@ -93,15 +121,16 @@ class UnitSelectedState(GameState):
                 self._reset_selection()
                 self.game_manager.current_state = self.game_manager.selecting_unit_state
             else:
-                self.board.path_to_target = self.board.find_path(selected_unit.hex_tile,
-                                                                 clicked_tile)[0] if clicked_tile else []
+                budget = selected_unit.max_movement_range * self.PREVIEW_TURNS
+                path = self.board.find_path(selected_unit.hex_tile, clicked_tile, max_cost=budget)[0]
+                self.board.path_to_target = path or []
 
 
 class BuildingSelectedState(GameState):
     def handle_mouse_click(self, pos):
         clicked_tile = self.board.get_click(pos, self.camera)
         if not clicked_tile:
-            print("Clicked outside the grid.")
+            log.debug('click_outside_grid', "Clicked outside the grid.", x=pos[0], y=pos[1])
             return
 
         selected_building = self.game_manager.selected_building
@@ -126,14 +155,14 @@ class BuildingNewCityState(GameState):
     def handle_mouse_click(self, pos):
         clicked_tile = self.board.get_click(pos, self.camera)
         if not clicked_tile:
-            print("Clicked outside the grid.")
+            log.debug('click_outside_grid', "Clicked outside the grid.", x=pos[0], y=pos[1])
             return
 
         if self.game_manager.can_build_new_city_on_tile(clicked_tile):
             self.game_manager.build_new_city_on_tile(clicked_tile, self.game_manager.get_current_player())
         else:
-            print("Cannot build a new city on this tile.")
+            log.debug('city_site_rejected', "Cannot build a new city on this tile.", q=clicked_tile.q, r=clicked_tile.r)
             self.game_manager.hud_manager.dynamic_message_manager.create_message("Нельзя построить город здесь.")
             self.game_manager.current_state = self.game_manager.selecting_unit_state
             self.game_manager.new_city_origin = None
-            self.board.highlighted_hexes = []
+            self.board.show_city_sites = False
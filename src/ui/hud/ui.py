@@ -4,11 +4,13 @@ import sys
 import pygame
 import pygame_gui
 
+from src.game_core.frame_stats import FrameStats
 from src.ui.windows.city_window import UICityWindow
 from src.ui.windows.game_over_menu import GameOverMenu
 from src.ui.windows.game_pause import PauseMenu
 from src.ui.windows.player_splash_screen import PlayerTurnSplashScreen
-from src.utils.utils import load_image
+from src.utils.event_log import log
+from src.utils.utils import load_image, image_cache_stats
 
 
 class ResourceDisplay:
@@ -21,8 +23,7 @@ class ResourceDisplay:
 
         image_path = os.path.join('icons', f'{resource_type}.png')
         try:
-            self.image_surface = load_image(image_path)
-            self.image_surface = pygame.transform.scale(self.image_surface, (30, 30))
+            self.image_surface = load_image(image_path, size=(30, 30))
         except ValueError:
             self.image_surface = pygame.Surface((20, 20))
             self.image_surface.fill('gray')
@@ -100,6 +101,64 @@ class FloatingMessage(pygame.sprite.Sprite):
             self.kill()
 
 
+class DebugOverlay:
+    """
+    Frame-time overlay toggled with F3: rolling p50/p95/p99 frame and phase times, sprite counts
+    and cache hit rates. Timings are collected in frame_stats by the main loop even while hidden.
+    """
+    TOGGLE_KEY = pygame.K_F3
+    PHASES = ('input', 'update', 'board_render', 'sprite_render', 'hud_draw', 'draw_ui')
+
+    def __init__(self, font, position=(10, 50)):
+        self.font = font
+        self.position = position
+        self.visible = False
+        self.frame_stats = FrameStats()
+        self.color = pygame.Color('white')
+        self.background = (0, 0, 0, 160)
+
+    def toggle(self):
+        self.visible = not self.visible
+
+    def get_lines(self, game_manager):
+        stats = self.frame_stats
+        p50, p95, p99 = stats.percentiles('frame')
+        lines = [f"frame  p50 {p50:5.1f}  p95 {p95:5.1f}  p99 {p99:5.1f} ms"]
+        for phase in self.PHASES:
+            p50, p95, p99 = stats.percentiles(phase)
+            lines.append(f"{phase:<13} {p50:5.2f} / {p95:5.2f} / {p99:5.2f} ms")
+
+        if game_manager is not None:
+            board = game_manager.board
+            chunks = board.map_chunks
+            lines.append(f"sprites {stats.counts.get('visible_sprites', 0)} visible / {len(game_manager.all_sprites)},"
+                         f" units {len(game_manager.all_units)}")
+            lines.append(f"map chunks {self._hit_rate(chunks.hits, chunks.misses)},"
+                         f" {len(chunks.chunks)} cached, {chunks.used_bytes / 2 ** 20:.1f} MB")
+        lines.append(f"images {self._hit_rate(image_cache_stats['hits'], image_cache_stats['misses'])},"
+                     f" {image_cache_stats['atlas']} from atlas")
+        return lines
+
+    @staticmethod
+    def _hit_rate(hits, misses):
+        total = hits + misses
+        return f"{100 * hits / total:.1f}% hits" if total else "no lookups"
+
+    def draw(self, surface, game_manager):
+        if not self.visible:
+            return
+        rendered = [self.font.render(line, True, self.color) for line in self.get_lines(game_manager)]
+        width = max(text.get_width() for text in rendered) + 10
+        height = sum(text.get_height() for text in rendered) + 10
+        panel = pygame.Surface((width, height), pygame.SRCALPHA)
+        panel.fill(self.background)
+        y = 5
+        for text in rendered:
+            panel.blit(text, (5, y))
+            y += text.get_height()
+        surface.blit(panel, self.position)
+
+
 class MenuButton:
     def __init__(self, screen_width, screen_height, ui_manager, menu_open_method):
         self.ui_manager = ui_manager
@@ -130,6 +189,7 @@ class HUDManager:
         self.ui_manager = pygame_gui.UIManager((screen_width, screen_height),
                                                os.path.join('data', 'theme', 'game_theme.json'))
         self.dynamic_message_manager = DynamicMessageManager(self.font)
+        self.debug_overlay = DebugOverlay(self.font)
         self.elements = {}
         self.city_window = None
         self.is_paused = False
@@ -214,12 +274,12 @@ class HUDManager:
             self.pause_menu.hide()
 
     def unpause_game(self):
-        print("Unpausing the game")
+        log.debug('game_unpaused', "Unpausing the game")
         self.is_paused = False
         self.pause_menu.hide()
 
     def save_game(self):
-        print("Saving the game")
+        log.info('save_requested', "Saving the game")
         self.game_manager.save_game()
 
     def exit_game(self):
@@ -232,6 +292,8 @@ class HUDManager:
         self.restart_game_method()
 
     def process_event(self, event):
+        if event.type == pygame.KEYDOWN and event.key == self.debug_overlay.TOGGLE_KEY:
+            self.debug_overlay.toggle()
         self.ui_manager.process_events(event)
         if 'menu_button' in self.elements:
             self.elements['menu_button'].process_event(event)
@@ -253,14 +315,22 @@ class HUDManager:
             self.city_window.update(time_delta)
         self.splash_screen.update(time_delta)
 
+    def has_animations(self):
+        """
+        Whether the HUD changes on its own and has to be redrawn even without input.
+        """
+        return bool(self.dynamic_message_manager.messages) or self.debug_overlay.visible
+
     def draw(self, surface):
         if self.is_paused or self._game_over_menu.is_visible or self.splash_screen.is_visible:
             surface.blit(self.dim_surface, (0, 0))
-        self.ui_manager.draw_ui(surface)
+        with self.debug_overlay.frame_stats.phase('draw_ui'):
+            self.ui_manager.draw_ui(surface)
         self.dynamic_message_manager.draw(surface)
         for res_display in self.resource_displays.values():
             res_display.draw(surface)
         self.splash_screen.draw(surface)
+        self.debug_overlay.draw(surface, self.game_manager)
 
     def set_unit_info_text(self, text):
         if 'unit_info_text' in self.elements:
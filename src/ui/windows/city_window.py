@@ -2,6 +2,7 @@ import pygame
 import pygame_gui
 
 from src.entities.game.registry import CITY_IMPROVEMENT_BLUEPRINTS, UNIT_BLUEPRINTS, CITY_BLUEPRINTS
+from src.utils.event_log import log
 
 
 class UICityWindow(pygame_gui.elements.UIWindow):
@@ -118,7 +119,7 @@ class UICityWindow(pygame_gui.elements.UIWindow):
             if self.current_category == "city_build":
                 if not self._check_requirements(option_id, CITY_IMPROVEMENT_BLUEPRINTS):
                     msg = f"Не выполнены требования для {CITY_IMPROVEMENT_BLUEPRINTS[option_id].name}"
-                    print(msg)
+                    log.debug('city_order_rejected', msg, option=option_id)
                     self.city.game_manager.hud_manager.dynamic_message_manager.create_message(msg)
                     return
                 self.city.start_city_improvement_construction(option_id)
@@ -127,12 +128,12 @@ class UICityWindow(pygame_gui.elements.UIWindow):
             elif self.current_category == "unit_build":
                 if self.city.hex_tile.unit is not None:
                     msg = "Тайл города занят другим юнитом."
-                    print(msg)
+                    log.debug('city_order_rejected', msg, option=option_id)
                     self.city.game_manager.hud_manager.dynamic_message_manager.create_message(msg)
                     return
                 if not self._check_requirements(option_id, UNIT_BLUEPRINTS):
                     msg = f"Не выполнены требования для {UNIT_BLUEPRINTS[option_id].name}"
-                    print(msg)
+                    log.debug('city_order_rejected', msg, option=option_id)
                     self.city.game_manager.hud_manager.dynamic_message_manager.create_message(msg)
                     return
                 self.city.start_unit_recruitment(option_id)
@@ -1,9 +1,17 @@
+import time
+
+import numpy as np
 import pygame
 import pygame_gui
 
+from src.board.storage import NO_TILE
+from src.entities.game.registry import TERRAIN_NAME_REVERSE_MAPPING
+from src.utils.save_index import SaveIndex, thumbnail_pixels
 from src.utils.utils import load_image
 import os
 
+THUMBNAIL_PIXELS = 144
+
 
 class MainMenu:
     def __init__(self, screen, manager):
@@ -281,13 +289,27 @@ class MainMenu:
             manager=self.load_game_manager,
             object_id='@main_menu_label'
         )
-        save_files = [f for f in os.listdir(os.path.join('data', 'saves')) if f.endswith('.json')]
+        # Only the index is read here, the saves themselves are opened when one is loaded
+        self.save_headers = SaveIndex().entries()
+        save_files = list(self.save_headers)
         self.save_file_dropdown = pygame_gui.elements.UIDropDownMenu(
             options_list=save_files if save_files else ['Нет сохранений'],
             starting_option=save_files[0] if save_files else 'Нет сохранений',
             relative_rect=pygame.Rect((550, 200), (300, 50)),
             manager=self.load_game_manager
         )
+        self.save_info_label = pygame_gui.elements.UILabel(
+            relative_rect=pygame.Rect((550, 250), (300, 30)),
+            text='',
+            manager=self.load_game_manager
+        )
+        self.save_thumbnail = pygame_gui.elements.UIImage(
+            relative_rect=pygame.Rect((870, 200), (THUMBNAIL_PIXELS, THUMBNAIL_PIXELS)),
+            image_surface=pygame.Surface((THUMBNAIL_PIXELS, THUMBNAIL_PIXELS)),
+            manager=self.load_game_manager
+        )
+        self.thumbnail_cache = {}
+        self.show_save_details(save_files[0] if save_files else None)
 
         self.load_button_lg = pygame_gui.elements.UIButton(
             relative_rect=pygame.Rect((550, 300), (140, 50)),
@@ -323,6 +345,9 @@ class MainMenu:
                             self.load_game_screen_active = False
                             self.load_game_requested = False
                             break
+                    elif event.user_type == pygame_gui.UI_DROP_DOWN_MENU_CHANGED:
+                        if event.ui_element == self.save_file_dropdown:
+                            self.show_save_details(event.text)
                 self.themed_manager.process_events(event)
 
             self.screen.fill((29, 128, 10))
@@ -332,6 +357,34 @@ class MainMenu:
             pygame.display.flip()
         self.load_game_manager.clear_and_reset()
 
+    def show_save_details(self, save_file):
+        """Shows the round, players, map size, save time and thumbnail of a save from its index header."""
+        header = self.save_headers.get(save_file)
+        if header is None:
+            self.save_info_label.set_text('')
+            self.save_thumbnail.hide()
+            return
+        rows, cols = header["map_size"]
+        self.save_info_label.set_text(
+            f"Раунд {header['round']}, игроков: {len(header['players'])}, карта {rows}x{cols}, "
+            f"{time.strftime('%d.%m.%Y %H:%M', time.localtime(header['saved_at']))}")
+        if save_file not in self.thumbnail_cache:
+            self.thumbnail_cache[save_file] = self.thumbnail_surface(header)
+        self.save_thumbnail.set_image(self.thumbnail_cache[save_file])
+        self.save_thumbnail.show()
+
+    @staticmethod
+    def thumbnail_surface(header):
+        palette = np.zeros((256, 3), dtype=np.uint8)
+        palette[NO_TILE] = (29, 128, 10)
+        for terrain_id, name in enumerate(header["thumbnail"]["terrains"]):
+            terrain_class = TERRAIN_NAME_REVERSE_MAPPING.get(name)
+            if terrain_class is not None:
+                palette[terrain_id] = terrain_class().color[:3]
+        rgb = palette[thumbnail_pixels(header)]
+        surface = pygame.surfarray.make_surface(rgb.transpose(1, 0, 2))
+        return pygame.transform.scale(surface, (THUMBNAIL_PIXELS, THUMBNAIL_PIXELS))
+
     def hide_menu_buttons(self):
         """Hides the main menu buttons."""
         for button in self.menu_buttons:
@@ -0,0 +1,87 @@
+"""
+Asset build step: pre-scales the sprite variants used in game and packs them into one atlas.
+
+Run from the project root after adding or changing images:
+
+    python -m src.utils.atlas
+
+It writes data/images/atlas.png and data/images/atlas.json, which load_image slices at runtime.
+"""
+import json
+import os
+
+import pygame
+
+from src.entities.base.game_objects import UNIT_IMAGE_SIZE, BUILDING_IMAGE_SIZE
+from src.utils.utils import IMAGES_PATH, ATLAS_IMAGE_PATH, ATLAS_INDEX_PATH
+
+ICON_IMAGE_SIZE = (30, 30)
+
+# (subdir, size) of every sprite variant the game draws
+SPRITE_VARIANTS = [
+    ('units', UNIT_IMAGE_SIZE),
+    ('level_objects', BUILDING_IMAGE_SIZE),
+    ('icons', ICON_IMAGE_SIZE),
+]
+
+ATLAS_WIDTH = 512
+PADDING = 1
+
+
+def collect_sprites(variants=SPRITE_VARIANTS):
+    """
+    Loads and scales every variant. Returns a list of (file relative to data/images, size, surface).
+    """
+    sprites = []
+    for subdir, size in variants:
+        directory = os.path.join(IMAGES_PATH, subdir)
+        for name in sorted(os.listdir(directory)):
+            if not name.lower().endswith('.png'):
+                continue
+            image = pygame.image.load(os.path.join(directory, name))
+            sprites.append((f"{subdir}/{name}", tuple(size), pygame.transform.scale(image, size)))
+    return sprites
+
+
+def pack(sizes, width=ATLAS_WIDTH, padding=PADDING):
+    """
+    Shelf-packs rectangles of the given sizes, tallest first.
+    Returns their (x, y) positions in input order and the total height.
+    """
+    order = sorted(range(len(sizes)), key=lambda i: (-sizes[i][1], -sizes[i][0]))
+    positions = [None] * len(sizes)
+    x = y = shelf_height = 0
+    for i in order:
+        w, h = sizes[i]
+        if x and x + w > width:
+            x, y = 0, y + shelf_height + padding
+            shelf_height = 0
+        positions[i] = (x, y)
+        x += w + padding
+        shelf_height = max(shelf_height, h)
+    return positions, y + shelf_height
+
+
+def build_atlas(variants=SPRITE_VARIANTS, image_path=ATLAS_IMAGE_PATH, index_path=ATLAS_INDEX_PATH):
+    sprites = collect_sprites(variants)
+    sizes = [surface.get_size() for _, _, surface in sprites]
+    width = max([ATLAS_WIDTH] + [w for w, _ in sizes])
+    positions, height = pack(sizes, width)
+
+    sheet = pygame.Surface((width, max(height, 1)), pygame.SRCALPHA)
+    index = {"version": 1, "image": os.path.basename(image_path), "sprites": []}
+    for (file, size, surface), (x, y) in zip(sprites, positions):
+        # Adding onto the transparent sheet copies the pixels and alpha as they are
+        sheet.blit(surface, (x, y), special_flags=pygame.BLEND_RGBA_ADD)
+        index["sprites"].append({"file": file, "size": list(size), "rect": [x, y, *surface.get_size()]})
+
+    pygame.image.save(sheet, image_path)
+    with open(index_path, 'w', encoding='utf-8') as f:
+        json.dump(index, f, indent=4)
+    return index
+
+
+if __name__ == "__main__":
+    pygame.init()
+    atlas_index = build_atlas()
+    print(f"Packed {len(atlas_index['sprites'])} sprites into {ATLAS_IMAGE_PATH}")
@@ -0,0 +1,95 @@
+import glob
+import json
+import os
+import queue
+import threading
+import time
+
+from src.utils.binary_save import BinarySave, BINARY_SAVE_EXTENSION
+from src.utils.event_log import log
+from src.utils.save_index import SAVES_PATH, SaveIndex, record_save
+
+
+def write_atomically(path, data):
+    """
+    Writes data next to path and renames it into place, so a crash never leaves a half-written save.
+    """
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary_path, path)
+
+
+class Autosaver:
+    """
+    Background saving for the game loop.
+
+    The main thread only takes a snapshot of the game (BinarySave.from_game copies everything
+    into arrays and plain values); encoding and the atomic file write happen on a worker thread.
+    Autosaves are written as autosave-<time>-round<N>.hexsave and only the newest `keep` are kept.
+    """
+
+    def __init__(self, directory=SAVES_PATH, keep=5, prefix='autosave'):
+        self.directory = directory
+        self.keep = keep
+        self.prefix = prefix
+        self.saved = 0
+        self.failed = 0
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._work, name='autosave-writer', daemon=True)
+        self._thread.start()
+
+    def autosave(self, game_manager):
+        """
+        Snapshots the game and queues it as the newest autosave. Returns the path it will be written to.
+        """
+        name = f"{self.prefix}-{time.strftime('%Y%m%d-%H%M%S')}-round{game_manager.current_round}"
+        path = os.path.join(self.directory, name + BINARY_SAVE_EXTENSION)
+        self._queue.put((BinarySave.from_game(game_manager), path, True))
+        return path
+
+    def save(self, game_manager, path):
+        """
+        Snapshots the game and queues it to be written to path, as JSON unless path is a binary save.
+        """
+        self._queue.put((BinarySave.from_game(game_manager), path, False))
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                break
+            snapshot, path, rotate = job
+            try:
+                if path.endswith(BINARY_SAVE_EXTENSION):
+                    data = snapshot.to_bytes()
+                else:
+                    data = json.dumps(snapshot.to_state(), indent=4).encode('utf-8')
+                os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+                write_atomically(path, data)
+                record_save(path, snapshot.meta["header"])
+                if rotate:
+                    self._rotate()
+                self.saved += 1
+                log.info('game_saved', "Game saved to {path}", path=path, bytes=len(data))
+            except Exception as e:
+                self.failed += 1
+                log.error('save_failed', "Could not save the game to {path}: {error}", path=path, error=e)
+
+    def _rotate(self):
+        pattern = os.path.join(self.directory, f"{self.prefix}-*{BINARY_SAVE_EXTENSION}")
+        autosaves = sorted(glob.glob(pattern), key=os.path.getmtime)
+        removed = autosaves[:-self.keep] if self.keep > 0 else autosaves
+        for path in removed:
+            os.remove(path)
+        if removed:
+            SaveIndex(self.directory).forget(*(os.path.basename(path) for path in removed))
+
+    def close(self):
+        """
+        Finishes the queued saves and stops the worker.
+        """
+        self._queue.put(None)
+        self._thread.join()
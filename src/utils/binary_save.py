@@ -0,0 +1,422 @@
+"""
+Versioned binary save format.
+
+A save is a header followed by tagged sections:
+
+    header  magic b'HXSV', format version, section count, board rows and cols
+    META    JSON with the save header (see src/utils/save_index.py), the round, current player,
+            game over state and the name tables
+    TERR    the board's terrain layer, run-length encoded or bit-packed, whichever is smaller
+    PLYR    player columns
+    UNIT    unit columns
+    BLDG    building columns
+
+Columns are NumPy arrays written and read with a single tobytes()/frombuffer() call each.
+Entities are keyed by the flat index of their tile (see src/board/storage.py) and their type
+names live in the META name tables. BinarySave converts from and to the dict produced by
+serialize_game_state, so a save round-trips with the JSON format.
+
+Convert an existing save with:
+
+    python -m src.utils.binary_save data/saves/level1.json data/saves/level1.hexsave
+"""
+import json
+import struct
+
+import numpy as np
+
+from src.board.storage import TERRAIN_TYPES, NO_TILE, offset_index, offset_coords
+from src.entities.game.registry import TERRAIN_NAME_MAPPING
+from src.utils.save_index import header_from_state, save_header
+from src.utils.serialization import serialize_unit, serialize_building, serialize_player
+
+MAGIC = b'HXSV'
+VERSION = 1
+BINARY_SAVE_EXTENSION = '.hexsave'
+
+HEADER = struct.Struct('<4sHHII')  # magic, version, section count, rows, cols
+SECTION = struct.Struct('<4sI')  # tag, payload length
+TERRAIN_HEADER = struct.Struct('<BBI')  # encoding, bits per tile, tile count
+COUNT = struct.Struct('<I')
+
+RLE, BIT_PACKED = 0, 1
+RESOURCES = ('gold', 'wood', 'stone', 'metal', 'food')
+
+# (name, dtype, columns per row) in the order the columns are stored
+PLAYER_COLUMNS = (
+    ('player_id', '<i4', 1),
+    ('camera', '<f8', 2),
+    ('score', '<i8', 1),
+    ('has_first_city_bonus', '<u1', 1),
+    ('resources', '<i8', len(RESOURCES)),
+    ('income', '<i8', len(RESOURCES)),
+    ('expense', '<i8', len(RESOURCES)),
+)
+UNIT_COLUMNS = (
+    ('tile', '<i4', 1),
+    ('type', '<u1', 1),
+    ('hp', '<i4', 1),
+    ('movement', '<i4', 1),
+    ('can_attack', '<u1', 1),
+    ('is_dug_in', '<u1', 1),
+    ('player_id', '<i4', 1),
+)
+BUILDING_COLUMNS = (
+    ('tile', '<i4', 1),
+    ('type', '<u1', 1),
+    ('hp', '<i4', 1),
+    ('player_id', '<i4', 1),
+)
+
+
+def is_binary_save(path):
+    with open(path, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def _as_columns(spec, columns):
+    return {name: np.asarray(columns[name], dtype=dtype).reshape((-1, width) if width > 1 else -1)
+            for name, dtype, width in spec}
+
+
+def _write_columns(spec, columns):
+    parts = [COUNT.pack(len(columns[spec[0][0]]))]
+    for name, dtype, _ in spec:
+        parts.append(np.ascontiguousarray(columns[name], dtype=dtype).tobytes())
+    return b''.join(parts)
+
+
+def _read_columns(spec, payload):
+    count, = COUNT.unpack_from(payload)
+    offset = COUNT.size
+    columns = {}
+    for name, dtype, width in spec:
+        array = np.frombuffer(payload, dtype=dtype, count=count * width, offset=offset)
+        columns[name] = array.reshape(count, width) if width > 1 else array
+        offset += array.nbytes
+    return columns
+
+
+def encode_terrain(layer):
+    """
+    Packs a flat terrain layer, choosing between run-length encoding and bit-packing by size.
+    """
+    layer = np.asarray(layer, dtype=np.uint8)
+    count = len(layer)
+
+    starts = np.flatnonzero(np.diff(layer)) + 1 if count else np.empty(0, dtype=np.int64)
+    starts = np.concatenate(([0], starts)) if count else starts
+    lengths = np.diff(np.append(starts, count)).astype('<u4')
+    rle = COUNT.pack(len(starts)) + layer[starts].tobytes() + lengths.tobytes()
+
+    # NO_TILE becomes the code after the last terrain type so every tile fits in as few bits as possible
+    codes = np.where(layer == NO_TILE, len(TERRAIN_TYPES), layer).astype(np.uint8)
+    bits = max(1, int(codes.max(initial=0)).bit_length())
+    packed = np.packbits((codes[:, None] >> np.arange(bits, dtype=np.uint8)) & 1, bitorder='little').tobytes()
+
+    if len(rle) <= len(packed):
+        return TERRAIN_HEADER.pack(RLE, 8, count) + rle
+    return TERRAIN_HEADER.pack(BIT_PACKED, bits, count) + packed
+
+
+def decode_terrain(payload):
+    encoding, bits, count = TERRAIN_HEADER.unpack_from(payload)
+    data = memoryview(payload)[TERRAIN_HEADER.size:]
+    if encoding == RLE:
+        runs, = COUNT.unpack_from(data)
+        values = np.frombuffer(data, dtype=np.uint8, count=runs, offset=COUNT.size)
+        lengths = np.frombuffer(data, dtype='<u4', count=runs, offset=COUNT.size + runs)
+        return np.repeat(values, lengths)
+
+    unpacked = np.unpackbits(np.frombuffer(data, dtype=np.uint8), count=count * bits, bitorder='little')
+    codes = unpacked.reshape(count, bits).astype(np.uint8) @ (1 << np.arange(bits, dtype=np.uint8))
+    return np.where(codes == len(TERRAIN_TYPES), NO_TILE, codes).astype(np.uint8)
+
+
+class BinarySave:
+    """
+    A game state held as columns: the terrain layer plus player, unit and building arrays.
+
+    Terrain ids in `terrain` index TERRAIN_TYPES, and unit and building `type` columns index the
+    unit_types and building_types name tables in `meta`.
+    """
+
+    def __init__(self, rows, cols, meta, terrain, players, units, buildings):
+        self.rows = rows
+        self.cols = cols
+        self.meta = meta
+        self.terrain = terrain
+        self.players = players
+        self.units = units
+        self.buildings = buildings
+
+    @property
+    def width(self):
+        return self.cols + 1
+
+    @classmethod
+    def from_state(cls, state):
+        """
+        Builds the columns from a serialize_game_state dict, e.g. a loaded JSON save.
+        """
+        board = state["board"]
+        rows, cols = board["rows"], board["cols"]
+        width = cols + 1
+        terrain_ids = {name: terrain_id for terrain_id, name in
+                       enumerate(TERRAIN_NAME_MAPPING[terrain_class] for terrain_class in TERRAIN_TYPES)}
+
+        terrain = np.full(rows * width, NO_TILE, dtype=np.uint8)
+        units, buildings = [], []
+        for tile_data in board["tiles"]:
+            index = offset_index(tile_data["q"], tile_data["r"], rows, width)
+            if index < 0:
+                raise ValueError(f"Tile {tile_data['q']}, {tile_data['r']} is outside of a {rows}x{cols} board")
+            terrain[index] = terrain_ids.get(tile_data["terrain"], 0)
+            if "unit" in tile_data:
+                units.append((index, tile_data["unit"]))
+            if "building" in tile_data:
+                buildings.append((index, tile_data["building"]))
+
+        state = dict(state, header=state.get("header") or header_from_state(state))
+        return cls._from_parts(rows, cols, state, terrain, state["players"], units, buildings)
+
+    @classmethod
+    def from_game(cls, game_manager):
+        """
+        Builds the columns straight from a running game without serializing every tile.
+        """
+        board = game_manager.board
+        terrain = board.terrain_layer()
+        units = [(unit.hex_tile.index, serialize_unit(unit)) for unit in game_manager.all_units if unit.hex_tile]
+        buildings = [(building.hex_tile.index, serialize_building(building))
+                     for player in game_manager.players for building in player.buildings if building.hex_tile]
+        state = {
+            "header": save_header(game_manager, terrain),
+            "current_player_id": game_manager.get_current_player().player_id
+            if game_manager.get_current_player()
+            else None,
+            "current_round": game_manager.current_round,
+            "game_over": game_manager.game_over,
+            "game_over_message": game_manager.game_over_message,
+            "player_scores": game_manager.player_scores if hasattr(game_manager, 'player_scores') else {},
+        }
+        players = [serialize_player(player) for player in game_manager.players]
+        return cls._from_parts(board.rows, board.cols, state, terrain, players,
+                               sorted(units, key=lambda item: item[0]), sorted(buildings, key=lambda item: item[0]))
+
+    @classmethod
+    def _from_parts(cls, rows, cols, state, terrain, players_data, units_data, buildings_data):
+        unit_types = sorted({unit["type"] for _, unit in units_data})
+        building_types = sorted({building["type"] for _, building in buildings_data})
+        meta = {
+            "header": state["header"],
+            "current_player_id": state["current_player_id"],
+            "current_round": state["current_round"],
+            "game_over": state["game_over"],
+            "game_over_message": state["game_over_message"],
+            "player_scores": dict(state.get("player_scores", {})),
+            "terrains": [TERRAIN_NAME_MAPPING[terrain_class] for terrain_class in TERRAIN_TYPES],
+            "unit_types": unit_types,
+            "building_types": building_types,
+            "resources": list(RESOURCES),
+            # City only fields, None for other buildings
+            "cities": [
+                [building["city_improvements"], building["city_improvements_in_progress_id"],
+                 building["unit_recruitment_in_progress_id"]] if "city_improvements" in building else None
+                for _, building in buildings_data
+            ],
+        }
+
+        players = {
+            "player_id": [player["player_id"] for player in players_data],
+            "camera": [(player["camera_x"], player["camera_y"]) for player in players_data],
+            "score": [player["score"] for player in players_data],
+            "has_first_city_bonus": [player["has_first_city_bonus"] for player in players_data],
+        }
+        for column in ("resources", "income", "expense"):
+            players[column] = [[player[column].get(name, 0) for name in RESOURCES] for player in players_data]
+
+        units = {
+            "tile": [index for index, _ in units_data],
+            "type": [unit_types.index(unit["type"]) for _, unit in units_data],
+            "hp": [unit["hp"] for _, unit in units_data],
+            "movement": [unit["current_movement_range"] for _, unit in units_data],
+            "can_attack": [unit["can_attack"] for _, unit in units_data],
+            "is_dug_in": [unit["is_dug_in"] for _, unit in units_data],
+            "player_id": [unit["player_id"] for _, unit in units_data],
+        }
+        buildings = {
+            "tile": [index for index, _ in buildings_data],
+            "type": [building_types.index(building["type"]) for _, building in buildings_data],
+            "hp": [building["hp"] for _, building in buildings_data],
+            "player_id": [building["player_id"] for _, building in buildings_data],
+        }
+        return cls(rows, cols, meta, np.asarray(terrain, dtype=np.uint8), _as_columns(PLAYER_COLUMNS, players),
+                   _as_columns(UNIT_COLUMNS, units), _as_columns(BUILDING_COLUMNS, buildings))
+
+    def to_bytes(self):
+        sections = [
+            (b'META', json.dumps(self.meta, ensure_ascii=False).encode('utf-8')),
+            (b'TERR', encode_terrain(self.terrain)),
+            (b'PLYR', _write_columns(PLAYER_COLUMNS, self.players)),
+            (b'UNIT', _write_columns(UNIT_COLUMNS, self.units)),
+            (b'BLDG', _write_columns(BUILDING_COLUMNS, self.buildings)),
+        ]
+        parts = [HEADER.pack(MAGIC, VERSION, len(sections), self.rows, self.cols)]
+        for tag, payload in sections:
+            parts.append(SECTION.pack(tag, len(payload)))
+            parts.append(payload)
+        return b''.join(parts)
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, version, section_count, rows, cols = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("Not a binary save file")
+        if version > VERSION:
+            raise ValueError(f"Binary save version {version} is newer than the supported version {VERSION}")
+
+        sections = {}
+        offset = HEADER.size
+        view = memoryview(data)
+        for _ in range(section_count):
+            tag, length = SECTION.unpack_from(data, offset)
+            offset += SECTION.size
+            sections[tag] = view[offset:offset + length]
+            offset += length
+
+        meta = json.loads(bytes(sections[b'META']).decode('utf-8'))
+        terrain = decode_terrain(sections[b'TERR'])
+        # Map the terrain ids of the file onto the current TERRAIN_TYPES order, unknown ones become the first type
+        current_ids = {TERRAIN_NAME_MAPPING[terrain_class]: terrain_id for terrain_id, terrain_class in
+                       enumerate(TERRAIN_TYPES)}
+        remap = np.zeros(256, dtype=np.uint8)
+        remap[NO_TILE] = NO_TILE
+        for saved_id, name in enumerate(meta["terrains"]):
+            remap[saved_id] = current_ids.get(name, 0)
+        terrain = remap[terrain]
+
+        players = _read_columns(PLAYER_COLUMNS, sections[b'PLYR'])
+        units = _read_columns(UNIT_COLUMNS, sections[b'UNIT'])
+        buildings = _read_columns(BUILDING_COLUMNS, sections[b'BLDG'])
+        return cls(rows, cols, meta, terrain, players, units, buildings)
+
+    def to_state(self):
+        """
+        The same dict serialize_game_state produces, ready for json.dump or deserialize_game_state.
+        """
+        meta = self.meta
+        tiles = {}
+        for index in np.flatnonzero(self.terrain != NO_TILE).tolist():
+            q, r, s = offset_coords(index, self.width)
+            tiles[index] = {"q": q, "r": r, "s": s,
+                            "terrain": TERRAIN_NAME_MAPPING[TERRAIN_TYPES[self.terrain[index]]]}
+
+        buildings = self.buildings
+        for i, index in enumerate(buildings["tile"].tolist()):
+            tile = tiles[index]
+            building = {
+                "type": meta["building_types"][buildings["type"][i]],
+                "position": {"q": tile["q"], "r": tile["r"], "s": tile["s"]},
+                "hp": int(buildings["hp"][i]),
+                "player_id": int(buildings["player_id"][i]),
+            }
+            city = meta["cities"][i]
+            if city is not None:
+                building["city_improvements"] = city[0]
+                building["city_improvements_in_progress_id"] = city[1]
+                building["unit_recruitment_in_progress_id"] = city[2]
+            tile["building"] = building
+
+        units = self.units
+        for i, index in enumerate(units["tile"].tolist()):
+            tile = tiles[index]
+            tile["unit"] = {
+                "type": meta["unit_types"][units["type"][i]],
+                "position": {"q": tile["q"], "r": tile["r"], "s": tile["s"]},
+                "hp": int(units["hp"][i]),
+                "current_movement_range": int(units["movement"][i]),
+                "can_attack": bool(units["can_attack"][i]),
+                "is_dug_in": bool(units["is_dug_in"][i]),
+                "player_id": int(units["player_id"][i]),
+            }
+
+        state = {"header": meta["header"]} if "header" in meta else {}
+        state.update({
+            "board": {"rows": self.rows, "cols": self.cols, "tiles": list(tiles.values())},
+            "players": self.player_states(),
+            "current_player_id": meta["current_player_id"],
+            "current_round": meta["current_round"],
+            "game_over": meta["game_over"],
+            "game_over_message": meta["game_over_message"],
+            "player_scores": meta["player_scores"],
+        })
+        return state
+
+    def player_states(self):
+        """
+        Players as serialize_player dicts.
+        """
+        players = self.players
+        resource_names = self.meta["resources"]
+        states = []
+        for i, player_id in enumerate(players["player_id"].tolist()):
+            camera_x, camera_y = players["camera"][i].tolist()
+            states.append({
+                "player_id": player_id,
+                "resources": dict(zip(resource_names, players["resources"][i].tolist())),
+                "income": dict(zip(resource_names, players["income"][i].tolist())),
+                "expense": dict(zip(resource_names, players["expense"][i].tolist())),
+                "camera_x": int(camera_x) if camera_x.is_integer() else camera_x,
+                "camera_y": int(camera_y) if camera_y.is_integer() else camera_y,
+                "score": int(players["score"][i]),
+                "has_first_city_bonus": bool(players["has_first_city_bonus"][i]),
+            })
+        return states
+
+
+def save_binary_game(game_manager, filename):
+    """
+    Writes the game to filename atomically and returns the save's header.
+    """
+    from src.utils.autosave import write_atomically
+
+    binary_save = BinarySave.from_game(game_manager)
+    write_atomically(filename, binary_save.to_bytes())
+    return binary_save.meta["header"]
+
+
+def read_binary_save(filename):
+    with open(filename, 'rb') as f:
+        return BinarySave.from_bytes(f.read())
+
+
+def read_binary_meta(filename):
+    """
+    Only the META section of a binary save, without reading the rest of the file.
+    """
+    with open(filename, 'rb') as f:
+        magic, version, section_count, rows, cols = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC:
+            raise ValueError("Not a binary save file")
+        for _ in range(section_count):
+            tag, length = SECTION.unpack(f.read(SECTION.size))
+            if tag == b'META':
+                return json.loads(f.read(length).decode('utf-8'))
+            f.seek(length, 1)
+    raise ValueError("Binary save has no META section")
+
+
+if __name__ == "__main__":
+    import sys
+
+    source, target = sys.argv[1], sys.argv[2]
+    if is_binary_save(source):
+        with open(target, 'w') as out:
+            json.dump(read_binary_save(source).to_state(), out, indent=4)
+    else:
+        with open(source) as f:
+            binary_save = BinarySave.from_state(json.load(f))
+        with open(target, 'wb') as out:
+            out.write(binary_save.to_bytes())
+    print(f"Converted {source} to {target}")
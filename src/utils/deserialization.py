@@ -1,19 +1,21 @@
-import json
 import os.path
+import time
+import tracemalloc
+
+import numpy as np
 
 from src.board.board import HexBoard
-from src.utils import hex_utils
-from src.utils.hex_utils import Hex
-from src.entities.game.registry import UNIT_BLUEPRINTS, CITY_BLUEPRINTS, TERRAIN_NAME_REVERSE_MAPPING, \
+from src.board.storage import TERRAIN_TYPES, NO_TILE, offset_index
+from src.utils.binary_save import is_binary_save, read_binary_save
+from src.utils.event_log import log
+from src.utils.journal import JOURNAL_EXTENSION, load_journaled_game
+from src.utils.json_stream import JsonStream
+from src.utils.profiling import peak_memory_mb
+from src.entities.game.registry import UNIT_BLUEPRINTS, CITY_BLUEPRINTS, TERRAIN_NAME_MAPPING, \
     CITY_IMPROVEMENT_BLUEPRINTS
 from src.utils.factories import GameEntityFactory
 
 
-def deserialize_terrain(terrain_data):
-    terrain_class = TERRAIN_NAME_REVERSE_MAPPING[terrain_data]
-    return terrain_class()
-
-
 def deserialize_unit(unit_data, tile, player, game_manager):
     unit_type_name = unit_data["type"].lower()
     unit_blueprint = UNIT_BLUEPRINTS.get(unit_type_name)
@@ -52,34 +54,68 @@ def deserialize_building(building_data, tile, player, game_manager):
     return building
 
 
-def deserialize_tile(tile_data):
-    q = tile_data["q"]
-    r = tile_data["r"]
-    s = tile_data["s"]
-    terrain = deserialize_terrain(tile_data["terrain"])
-    tile = Hex(q, r, s, terrain)
-    return tile
-
-
-def deserialize_board(board_data, game_manager, players):
-    rows = board_data["rows"]
-    cols = board_data["cols"]
-    tiles_data = board_data["tiles"]
-    deserialized_tiles = []
-    units_to_create = []
-    buildings_to_create = []
-
-    for tile_data in tiles_data:
-        tile = deserialize_tile(tile_data)
-        deserialized_tiles.append(tile_data)
+class BoardCollector:
+    """
+    Gathers saved tiles into a flat terrain layer and the entity data on them, keyed by tile index.
+    No tile objects are made until build(), which creates each of them exactly once.
+    """
+
+    def __init__(self, rows, cols):
+        self.rows = rows
+        self.cols = cols
+        self.width = cols + 1
+        self.terrain = np.full(rows * self.width, NO_TILE, dtype=np.uint8)
+        self.units = []
+        self.buildings = []
+        self._terrain_ids = {TERRAIN_NAME_MAPPING[terrain_class]: terrain_id for terrain_id, terrain_class in
+                             enumerate(TERRAIN_TYPES)}
+
+    def add(self, tile_data):
+        index = offset_index(tile_data["q"], tile_data["r"], self.rows, self.width)
+        if index < 0:
+            raise ValueError(f"Tile {tile_data['q']}, {tile_data['r']} is outside of a {self.rows}x{self.cols} board")
+        self.terrain[index] = self._terrain_ids.get(tile_data["terrain"], 0)
         if "unit" in tile_data:
-            units_to_create.append(tile_data)
+            self.units.append((index, tile_data["unit"]))
         if "building" in tile_data:
-            buildings_to_create.append(tile_data)
-
-    board_instance = HexBoard(rows, cols, 50, initial_grid_data=deserialized_tiles)
-
-    return board_instance, units_to_create, buildings_to_create
+            self.buildings.append((index, tile_data["building"]))
+
+    def build(self):
+        return HexBoard(self.rows, self.cols, 50, terrain_layer=self.terrain)
+
+
+def deserialize_board(board_data):
+    collector = BoardCollector(board_data["rows"], board_data["cols"])
+    for tile_data in board_data["tiles"]:
+        collector.add(tile_data)
+    return collector
+
+
+def stream_board(stream):
+    """
+    Reads a serialized board from a JsonStream one tile at a time.
+    """
+    rows = cols = collector = None
+    early_tiles = []  # only if "tiles" comes before "rows" and "cols"
+    for key in stream.iter_object():
+        if key == "rows":
+            rows = stream.value()
+        elif key == "cols":
+            cols = stream.value()
+        elif key == "tiles":
+            if rows is not None and cols is not None:
+                collector = BoardCollector(rows, cols)
+                for tile_data in stream.items():
+                    collector.add(tile_data)
+            else:
+                early_tiles = stream.value()
+        else:
+            stream.skip()
+    if collector is None:
+        collector = BoardCollector(rows, cols)
+    for tile_data in early_tiles:
+        collector.add(tile_data)
+    return collector
 
 
 def deserialize_player(player_data):
@@ -95,49 +131,70 @@ def deserialize_player(player_data):
     return player
 
 
-def deserialize_game_state(game_state_data, hud_manager, camera):
-    players_data = game_state_data["players"]
+def deserialize_game_state(game_state_data, hud_manager, camera, place_starting_cities=True):
+    return _build_game(game_state_data["players"], deserialize_board(game_state_data["board"]), game_state_data,
+                       hud_manager, camera, place_starting_cities)
+
+
+def stream_game_state(stream, hud_manager, camera, place_starting_cities=True):
+    """
+    Reads a serialize_game_state object from a JsonStream. The tiles are consumed one at a time,
+    so the JSON tree of the board is never held in memory.
+    """
+    players_data, collector, progress = [], None, {}
+    for key in stream.iter_object():
+        if key == "board":
+            collector = stream_board(stream)
+        elif key == "players":
+            players_data = stream.value()
+        else:
+            progress[key] = stream.value()
+    return _build_game(players_data, collector, progress, hud_manager, camera, place_starting_cities)
+
+
+def _build_game(players_data, collector, progress, hud_manager, camera, place_starting_cities=True):
     players = [deserialize_player(player_data) for player_data in players_data]
+    game_manager_instance = _create_game_manager(players, collector.build(), hud_manager, camera,
+                                                 place_starting_cities)
+    _create_entities(game_manager_instance, collector.buildings, collector.units)
+    _restore_progress(game_manager_instance, progress)
+    return game_manager_instance
+
 
-    board_instance, units_to_create_data, buildings_to_create_data = deserialize_board(
-        game_state_data["board"], None, players)
+def _create_game_manager(players, board_instance, hud_manager, camera, place_starting_cities=True):
     from src.game_core.game_core import GameManager
     game_manager_instance = GameManager(players, board_instance, camera,
-                                        hud_manager)
+                                        hud_manager, place_starting_cities=place_starting_cities)
 
     board_instance.game_manager = game_manager_instance
     board_instance.camera = camera
     game_manager_instance.camera = camera
+    return game_manager_instance
 
-    for building_data in buildings_to_create_data:
-        q = building_data["q"]
-        r = building_data["r"]
-        s = building_data["s"]
-        tile = board_instance.get_tile_by_hex(hex_utils.Hex(q, r, s))
-        if tile:
-            player_id = building_data["building"]["player_id"]
-            player = next((p for p in players if p.player_id == player_id), None)
-            if player:
-                building = deserialize_building(building_data["building"], tile, player,
-                                                game_manager_instance)
-                tile.building = building
-                player.buildings.add(building)
-
-    for unit_data in units_to_create_data:
-        q = unit_data["q"]
-        r = unit_data["r"]
-        s = unit_data["s"]
-        tile = board_instance.get_tile_by_hex(hex_utils.Hex(q, r, s))
-        if tile:
-            player_id = unit_data["unit"]["player_id"]
-            player = next((p for p in players if p.player_id == player_id), None)
-            if player:
-                unit = deserialize_unit(unit_data["unit"], tile, player, game_manager_instance)
-                tile.unit = unit
-                player.units.add(unit)
-                player.military.add(unit)
-                game_manager_instance.all_units.add(unit)
 
+def _create_entities(game_manager, buildings, units):
+    """
+    Creates the saved buildings, then the units, from (tile index, data) pairs in one pass each.
+    Tiles are looked up by index, and the entity constructors register themselves with their
+    player and the sprite groups; the board's spatial index and city zones are filled in one
+    bulk update once all entities exist.
+    """
+    players_by_id = {player.player_id: player for player in game_manager.players}
+    board = game_manager.board
+    with board.batch_entities():
+        for index, building_data in buildings:
+            tile = board.tile_at(index)
+            player = players_by_id.get(building_data["player_id"])
+            if tile is not None and player is not None:
+                deserialize_building(building_data, tile, player, game_manager)
+        for index, unit_data in units:
+            tile = board.tile_at(index)
+            player = players_by_id.get(unit_data["player_id"])
+            if tile is not None and player is not None:
+                deserialize_unit(unit_data, tile, player, game_manager)
+
+
+def _restore_progress(game_manager_instance, game_state_data):
     game_manager_instance.current_player_index = next(
         (i for i, p in enumerate(game_manager_instance.players) if p.player_id == game_state_data["current_player_id"]),
         0)
@@ -147,19 +204,71 @@ def deserialize_game_state(game_state_data, hud_manager, camera):
     game_manager_instance.player_scores = game_state_data[
         "player_scores"] if "player_scores" in game_state_data else {}
 
+
+def deserialize_binary_game_state(binary_save, hud_manager, camera, place_starting_cities=True):
+    """
+    Builds the game from a BinarySave: the board straight from its terrain layer and the
+    entities from its columns, without going through per-tile dicts.
+    """
+    players = [deserialize_player(player_data) for player_data in binary_save.player_states()]
+    board_instance = HexBoard(binary_save.rows, binary_save.cols, 50, terrain_layer=binary_save.terrain)
+    game_manager_instance = _create_game_manager(players, board_instance, hud_manager, camera,
+                                                 place_starting_cities)
+    meta = binary_save.meta
+
+    buildings, cities = binary_save.buildings, meta["cities"]
+    building_data = []
+    for i, index in enumerate(buildings["tile"].tolist()):
+        data = {"type": meta["building_types"][buildings["type"][i]], "hp": int(buildings["hp"][i]),
+                "player_id": int(buildings["player_id"][i])}
+        if cities[i] is not None:
+            data["city_improvements"], data["city_improvements_in_progress_id"], \
+                data["unit_recruitment_in_progress_id"] = cities[i]
+        building_data.append((index, data))
+
+    units = binary_save.units
+    unit_data = [
+        (index, {
+            "type": meta["unit_types"][units["type"][i]],
+            "hp": int(units["hp"][i]),
+            "current_movement_range": int(units["movement"][i]),
+            "can_attack": bool(units["can_attack"][i]),
+            "is_dug_in": bool(units["is_dug_in"][i]),
+            "player_id": int(units["player_id"][i]),
+        })
+        for i, index in enumerate(units["tile"].tolist())
+    ]
+
+    _create_entities(game_manager_instance, building_data, unit_data)
+    _restore_progress(game_manager_instance, meta)
     return game_manager_instance
 
 
 def load_game_from_file(filepath=os.path.join("data", "saves", "savegame.json"), hud_manager=None, camera=None):
+    """
+    Loads a journaled, binary or JSON save. JSON saves are streamed tile by tile. Logs the load time
+    and the peak memory (see peak_memory_mb).
+    """
     try:
-        with open(filepath, "r") as f:
-            game_state_data = json.load(f)
-            game_manager = deserialize_game_state(game_state_data, hud_manager,
-                                                  camera)
-            return game_manager
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+        started = time.perf_counter()
+        # A save is restored as it is: no starting cities are placed on top of it
+        if filepath.endswith(JOURNAL_EXTENSION):
+            game_manager = load_journaled_game(filepath, hud_manager, camera)
+        elif is_binary_save(filepath):
+            game_manager = deserialize_binary_game_state(read_binary_save(filepath), hud_manager, camera,
+                                                         place_starting_cities=False)
+        else:
+            with open(filepath, "r", encoding="utf-8") as f:
+                game_manager = stream_game_state(JsonStream(f), hud_manager, camera, place_starting_cities=False)
+        log.info('game_load_stats', "Loaded {path} in {seconds:.2f} s, {tiles} tiles, peak memory {peak_mb} MB",
+                 path=filepath, seconds=time.perf_counter() - started, tiles=len(game_manager.board.grid),
+                 peak_mb=peak_memory_mb())
+        return game_manager
     except FileNotFoundError:
-        print(f"Save file not found: {filepath}")
+        log.error('save_not_found', "Save file not found: {path}", path=filepath)
         raise
     except Exception as e:
-        print(f"Error during game loading: {e}")
+        log.error('load_failed', "Error during game loading: {error}", path=filepath, error=e)
         raise
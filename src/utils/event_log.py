@@ -0,0 +1,197 @@
+"""
+Structured game event log.
+
+Records are dicts with a timestamp, level, event name, an optional message template and any extra
+fields. The template is a str.format string over the fields and only the sinks fill it in. Every
+record that passes the level check goes into an in-memory ring buffer and to the attached sinks:
+the console prints the messages, JsonLinesSink writes JSON lines from a background thread.
+
+    from src.utils.event_log import log
+    log.info('unit_moved', "Unit moved to q={q}, r={r}", q=tile.q, r=tile.r)
+
+Below the configured level a call is a single comparison and nothing gets formatted, so hot paths
+stay cheap as long as their fields are plain values. Guard anything costlier with log.debug_enabled.
+Configured with --log-level/--log-file or HEXGAME_LOG_LEVEL/HEXGAME_LOG_FILE, see configure().
+"""
+import argparse
+import collections
+import json
+import os
+import queue
+import sys
+import threading
+import time
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+LEVEL_NAMES = {DEBUG: 'debug', INFO: 'info', WARNING: 'warning', ERROR: 'error'}
+LEVELS = {name: level for level, name in LEVEL_NAMES.items()}
+
+LOG_LEVEL_ENV = 'HEXGAME_LOG_LEVEL'
+LOG_FILE_ENV = 'HEXGAME_LOG_FILE'
+
+_RECORD_KEYS = ('time', 'level', 'level_no', 'event', 'message')
+
+
+def format_record(record):
+    """
+    The record's message with its fields filled in, or its event name and fields if it has none.
+    """
+    message = record.get('message')
+    if message is None:
+        fields = ' '.join(f"{key}={value}" for key, value in record.items() if key not in _RECORD_KEYS)
+        return f"{record['event']} {fields}".rstrip()
+    return message.format(**record)
+
+
+class ConsoleSink:
+    """
+    Prints the formatted message of each record at or above its level.
+    """
+
+    def __init__(self, level=INFO, stream=None):
+        self.level = level
+        self.stream = stream
+
+    def emit(self, record):
+        if record['level_no'] < self.level:
+            return
+        print(format_record(record), file=self.stream or sys.stdout)
+
+    def close(self):
+        pass
+
+
+class JsonLinesSink:
+    """
+    Appends records to a file as JSON lines. Serialization and I/O happen on a daemon thread;
+    emit() only puts the record on a queue.
+    """
+
+    def __init__(self, path, level=DEBUG):
+        self.path = path
+        self.level = level
+        self._queue = queue.SimpleQueue()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._thread = threading.Thread(target=self._write, name='event-log-writer', daemon=True)
+        self._thread.start()
+
+    def emit(self, record):
+        if record['level_no'] >= self.level:
+            self._queue.put(record)
+
+    def _write(self):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            while True:
+                record = self._queue.get()
+                if record is None:
+                    break
+                if 'message' in record:
+                    record = dict(record, message=format_record(record))
+                f.write(json.dumps(record, ensure_ascii=False, default=str) + '\n')
+                if self._queue.empty():
+                    f.flush()
+
+    def close(self):
+        """
+        Writes out everything queued so far and stops the writer thread.
+        """
+        self._queue.put(None)
+        self._thread.join()
+
+
+class EventLog:
+    """
+    Level-filtered event log with a fixed-size ring buffer of the most recent records.
+
+    The buffer is a bounded deque, whose appends are atomic, so any thread can log without a lock.
+    """
+
+    def __init__(self, level=INFO, capacity=2048):
+        self.buffer = collections.deque(maxlen=capacity)
+        self.sinks = []
+        self.level = level
+
+    @property
+    def level(self):
+        return self._level
+
+    @level.setter
+    def level(self, level):
+        self._level = level
+        self.debug_enabled = level <= DEBUG
+
+    def add_sink(self, sink):
+        self.sinks.append(sink)
+        return sink
+
+    def remove_sink(self, sink):
+        self.sinks.remove(sink)
+        sink.close()
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
+        self.sinks = []
+
+    def log(self, level, event, message=None, **fields):
+        if level < self._level:
+            return
+        record = {'time': time.time(), 'level': LEVEL_NAMES.get(level, str(level)), 'level_no': level,
+                  'event': event}
+        if message is not None:
+            record['message'] = message
+        record.update(fields)
+        self.buffer.append(record)
+        for sink in self.sinks:
+            sink.emit(record)
+
+    def debug(self, event, message=None, **fields):
+        if self._level <= DEBUG:
+            self.log(DEBUG, event, message, **fields)
+
+    def info(self, event, message=None, **fields):
+        if self._level <= INFO:
+            self.log(INFO, event, message, **fields)
+
+    def warning(self, event, message=None, **fields):
+        if self._level <= WARNING:
+            self.log(WARNING, event, message, **fields)
+
+    def error(self, event, message=None, **fields):
+        self.log(ERROR, event, message, **fields)
+
+    def recent(self, count=None, level=DEBUG):
+        """
+        The latest records at or above level from the ring buffer, oldest first.
+        """
+        records = [record for record in list(self.buffer) if record['level_no'] >= level]
+        return records if count is None else records[-count:]
+
+
+log = EventLog()
+console = log.add_sink(ConsoleSink())
+
+
+def configure(argv=None, environ=None):
+    """
+    Applies --log-level/--log-file or the HEXGAME_LOG_LEVEL/HEXGAME_LOG_FILE variables to the
+    shared log. Console output stays at info and above; the file gets everything the log lets through.
+    """
+    parser = argparse.ArgumentParser(description="Hex Game")
+    parser.add_argument('--log-level', choices=list(LEVELS), default=None)
+    parser.add_argument('--log-file', default=None, help="append events to this file as JSON lines")
+    args, _ = parser.parse_known_args(argv)
+
+    environ = os.environ if environ is None else environ
+    level_name = (args.log_level or environ.get(LOG_LEVEL_ENV) or 'info').lower()
+    log.level = LEVELS.get(level_name, INFO)
+
+    log_file = args.log_file or environ.get(LOG_FILE_ENV)
+    if log_file:
+        log.add_sink(JsonLinesSink(log_file))
+    return log
@@ -1,9 +1,10 @@
 import collections
 import math
-from src.terrains.game.terrains import GrassTerrain
 
 
 class Point:
+    __slots__ = ('x', 'y')
+
     def __init__(self, x, y):
         self.x = x
         self.y = y
@@ -12,37 +13,47 @@ class Point:
         return self.x, self.y
 
 
+# (dq, dr, ds) of the six neighbors, in the order of hex_directions
+DIRECTION_OFFSETS = ((1, 0, -1), (1, -1, 0), (0, -1, 1), (-1, 0, 1), (-1, 1, 0), (0, 1, -1))
+
+
 class Hex:
-    def __init__(self, q, r, s, terrain=GrassTerrain, resource=None, unit=None):
+    """
+    Immutable cube coordinate. Game state of a tile lives in src.board.tile.Tile.
+    """
+    __slots__ = ('q', 'r', 's', '_hash')
+
+    def __init__(self, q, r, s):
         if round(q + r + s) != 0:  # сумма векторов должна быть равна 0
             raise ValueError("q + r + s must be 0")
 
-        self.q = q
-        self.r = r
-        self.s = s
-        self.terrain = terrain
-        self.resource = resource
-        self.unit = unit
-        self.owner = None
-        self.building = None
+        object.__setattr__(self, 'q', q)
+        object.__setattr__(self, 'r', r)
+        object.__setattr__(self, 's', s)
+        object.__setattr__(self, '_hash', hash((q, r, s)))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Hex is immutable")
+
+    def __repr__(self):
+        return f"Hex({self.q}, {self.r}, {self.s})"
 
     def __add__(self, other):
-        return Hex(self.q + other.q, self.r + other.r, self.s + other.s,
-                   self.terrain, self.resource, self.unit)
+        return Hex(self.q + other.q, self.r + other.r, self.s + other.s)
 
     def __sub__(self, other):
-        return Hex(self.q - other.q, self.r - other.r, self.s - other.s,
-                   self.terrain, self.resource, self.unit)
+        return Hex(self.q - other.q, self.r - other.r, self.s - other.s)
 
     def __mul__(self, k):
-        return Hex(self.q * k, self.r * k, self.s * k,
-                   self.terrain, self.resource, self.unit)
+        return Hex(self.q * k, self.r * k, self.s * k)
 
     def __eq__(self, other):
+        if not isinstance(other, Hex):
+            return NotImplemented
         return self.q == other.q and self.r == other.r and self.s == other.s
 
     def __hash__(self):
-        return hash((self.q, self.r, self.s))
+        return self._hash
 
     def length(self):
         return (abs(self.q) + abs(self.r) + abs(self.s)) // 2
@@ -67,7 +78,7 @@ class Hex:
         else:
             si = -qi - ri
 
-        return Hex(qi, ri, si, self.terrain, self.resource, self.unit)
+        return Hex(qi, ri, si)
 
     def lerp(self, other, t):
         return Hex(self.q * (1.0 - t) + other.q * t,
@@ -93,14 +104,8 @@ class Hex:
         return Point(x + origin.x, y + origin.y)
 
     def get_neighbors(self):
-        return [
-            Hex(self.q + 1, self.r, self.s - 1),
-            Hex(self.q + 1, self.r - 1, self.s),
-            Hex(self.q, self.r - 1, self.s + 1),
-            Hex(self.q - 1, self.r, self.s + 1),
-            Hex(self.q - 1, self.r + 1, self.s),
-            Hex(self.q, self.r + 1, self.s - 1),
-        ]
+        q, r, s = self.q, self.r, self.s
+        return [Hex(q + dq, r + dr, s + ds) for dq, dr, ds in DIRECTION_OFFSETS]
 
 
 def cube_distance(hex1, hex2):
@@ -124,11 +129,7 @@ layout_pointy = Orientation(
     2.0 / 3.0, 0.5
 )
 
-hex_directions = [
-    Hex(1, 0, -1), Hex(1, -1, 0),
-    Hex(0, -1, 1), Hex(-1, 0, 1),
-    Hex(-1, 1, 0), Hex(0, 1, -1)
-]
+hex_directions = tuple(Hex(dq, dr, ds) for dq, dr, ds in DIRECTION_OFFSETS)
 
 
 def hex_direction(direction):
@@ -139,8 +140,10 @@ def hex_neighbor(hex, direction):
     return hex + hex_direction(direction)
 
 
+hex_diagonals = (Hex(2, -1, -1), Hex(1, -2, 1), Hex(-1, -1, 2), Hex(-2, 1, 1), Hex(-1, 2, -1), Hex(1, 1, -2))
+
+
 def hex_diagonal_neighbor(hex, direction):
-    hex_diagonals = [Hex(2, -1, -1), Hex(1, -2, 1), Hex(-1, -1, 2), Hex(-2, 1, 1), Hex(-1, 2, -1), Hex(1, 1, -2)]
     return hex + hex_diagonals[direction]
 
 
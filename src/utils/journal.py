@@ -0,0 +1,295 @@
+"""
+Append-only action journal with periodic checkpoints.
+
+Every session journals under a name of its own, <save name>-<date>-<time>, so a new game or a
+loaded save never touches the journal of an earlier session. A journaled save is a few files
+next to each other:
+
+    <name>.journal          one JSON line per player action, each with a growing "seq" number
+    <name>.journal.old      the actions before a checkpoint that is still being written
+    <name>.checkpoint.json  a serialize_game_state snapshot and the seq of the last action in it
+
+Recording an action is a single line append. Every `checkpoint_every` rounds the game is
+snapshotted on the main thread (BinarySave.from_game, which only copies arrays and plain values)
+and the current journal is moved aside to .journal.old; a writer thread turns the snapshot into
+JSON, writes the checkpoint atomically and then deletes .journal.old. Loading restores the
+checkpoint and replays the lines of both journals after its seq, so a crash at any point only
+costs skipped duplicates, and merges a .journal.old left by a crash back into the journal.
+"""
+import json
+import os
+import queue
+import threading
+import time
+
+from src.utils.autosave import write_atomically
+from src.utils.binary_save import BinarySave
+from src.utils.event_log import log
+from src.utils.json_stream import JsonStream
+from src.utils.save_index import record_save
+
+JOURNAL_EXTENSION = '.journal'
+OLD_JOURNAL_SUFFIX = '.old'
+CHECKPOINT_SUFFIX = '.checkpoint.json'
+
+
+def journal_paths(path):
+    """
+    (journal, checkpoint) paths for a save path with or without an extension.
+    """
+    base = os.path.splitext(path)[0]
+    return base + JOURNAL_EXTENSION, base + CHECKPOINT_SUFFIX
+
+
+def session_journal_path(save_path):
+    """
+    A journal path for a new session of the save at save_path that no existing journal uses.
+    """
+    base = f"{os.path.splitext(save_path)[0]}-{time.strftime('%Y%m%d-%H%M%S')}"
+    path, attempt = base + JOURNAL_EXTENSION, 1
+    while any(os.path.exists(existing) for existing in (*journal_paths(path), path + OLD_JOURNAL_SUFFIX)):
+        attempt += 1
+        path = f"{base}-{attempt}{JOURNAL_EXTENSION}"
+    return path
+
+
+class ActionJournal:
+    """
+    Records player actions of a running game. See apply_action for the action types.
+    """
+
+    def __init__(self, path, checkpoint_every=10):
+        self.path, self.checkpoint_path = journal_paths(path)
+        self.old_path = self.path + OLD_JOURNAL_SUFFIX
+        self.checkpoint_every = checkpoint_every
+        self.seq = 0
+        self.replaying = False
+        self._file = None
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._write_checkpoints, name='checkpoint-writer', daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def start(cls, path, game_manager, checkpoint_every=10):
+        """
+        Begins a new journal for game_manager with a checkpoint of its current state.
+        Raises FileExistsError instead of overwriting the journal of another game at path,
+        see session_journal_path for a free one.
+        """
+        journal_path, checkpoint_path = journal_paths(path)
+        for existing in (journal_path, journal_path + OLD_JOURNAL_SUFFIX, checkpoint_path):
+            if os.path.exists(existing):
+                raise FileExistsError(f"A journaled game already exists at {existing}")
+        journal = cls(path, checkpoint_every)
+        journal.checkpoint(game_manager)
+        return journal
+
+    def record(self, action, **fields):
+        if self.replaying:
+            return
+        if self._file is None:
+            self._file = self._open()
+        self.seq += 1
+        self._file.write(json.dumps({"seq": self.seq, "action": action, **fields}, ensure_ascii=False) + '\n')
+        self._file.flush()
+
+    def _open(self):
+        f = open(self.path, 'a+', encoding='utf-8')
+        if f.tell() > 0:
+            f.seek(f.tell() - 1)
+            if f.read(1) != '\n':
+                f.write('\n')  # don't glue new actions onto a torn line
+        return f
+
+    def on_round_end(self, game_manager):
+        if self.replaying:
+            return
+        if self.checkpoint_every and game_manager.current_round % self.checkpoint_every == 0:
+            self.checkpoint(game_manager)
+
+    def checkpoint(self, game_manager):
+        """
+        Snapshots the whole game and queues the snapshot to be written as the new checkpoint.
+        The actions so far are moved aside to .journal.old until it is written.
+        """
+        snapshot = BinarySave.from_game(game_manager)
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        # .journal.old must be covered by a written checkpoint before it is replaced; a checkpoint
+        # is normally written long before the next one is due, so this rarely waits
+        self._queue.join()
+        if os.path.exists(self.old_path):
+            # The last checkpoint could not be written: keep every action since the one before it
+            self._append_to_old()
+        elif os.path.exists(self.path):
+            os.replace(self.path, self.old_path)
+        self._queue.put((snapshot, self.seq))
+
+    def _append_to_old(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb') as journal, open(self.old_path, 'ab') as old:
+            old.write(journal.read())
+            old.flush()
+            os.fsync(old.fileno())
+        os.remove(self.path)
+
+    def _write_checkpoints(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                self._queue.task_done()
+                break
+            snapshot, seq = job
+            try:
+                state = snapshot.to_state()
+                directory = os.path.dirname(self.checkpoint_path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                write_atomically(self.checkpoint_path,
+                                 json.dumps({"journal_seq": seq, "state": state}).encode('utf-8'))
+                if os.path.exists(self.old_path):
+                    os.remove(self.old_path)
+                record_save(self.path, state["header"])
+                log.info('checkpoint_written', "Checkpoint at round {round} written to {path}",
+                         round=state["current_round"], path=self.checkpoint_path)
+            except Exception as e:
+                log.error('checkpoint_failed', "Could not write the checkpoint {path}: {error}",
+                          path=self.checkpoint_path, error=e)
+            finally:
+                self._queue.task_done()
+
+    def sync(self):
+        """
+        Forces the recorded actions to disk.
+        """
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        """
+        Closes the journal after the queued checkpoints are written.
+        """
+        self._queue.put(None)
+        self._thread.join()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def read_actions(path, after_seq=0):
+    if not os.path.exists(path):
+        return []
+    actions = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                action = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # a torn line from a crash
+            if action["seq"] > after_seq:
+                actions.append(action)
+    return actions
+
+
+def _tile(game_manager, coords):
+    q, r = coords[:2]
+    return game_manager.board.grid.get((q, r, -q - r))
+
+
+def apply_action(game_manager, action):
+    """
+    Replays one journal record through the same methods the game used to perform it.
+    Returns False if the action no longer fits the game state.
+    """
+    kind = action["action"]
+    if kind == "end_turn":
+        game_manager.next_player()
+        return True
+
+    if kind == "build_city":
+        tile = _tile(game_manager, action["tile"])
+        player = next((p for p in game_manager.players if p.player_id == action["player_id"]), None)
+        if tile is None or player is None:
+            return False
+        game_manager.build_new_city_on_tile(tile, player)
+        return True
+
+    tile = _tile(game_manager, action["actor"])
+    if tile is None:
+        return False
+    actor = tile.building if action.get("actor_kind") == "building" else tile.unit
+    if actor is None:
+        return False
+
+    if kind == "move":
+        target = _tile(game_manager, action["to"])
+        return target is not None and actor.move_to(target, game_manager.board, None)
+    if kind == "attack":
+        target_tile = _tile(game_manager, action["target"])
+        target = None
+        if target_tile is not None:
+            target = target_tile.building if action.get("target_kind") == "building" else target_tile.unit
+        if target is None:
+            return False
+        actor.apply_attack(target, action["damage"])
+        return True
+    if kind == "dig_in":
+        actor.dig_in()
+        return True
+    if kind == "recruit":
+        actor.start_unit_recruitment(action["unit_type"])
+        return True
+    if kind == "construct":
+        actor.start_city_improvement_construction(action["improvement"])
+        return True
+    raise ValueError(f"Unknown journal action: {kind}")
+
+
+def load_journaled_game(path, hud_manager=None, camera=None, checkpoint_every=10):
+    """
+    Restores the checkpoint of a journaled save and replays the actions recorded after it.
+    The returned game keeps appending to the same journal.
+    """
+    from src.utils.deserialization import stream_game_state
+
+    journal_path, checkpoint_path = journal_paths(path)
+    checkpoint_seq, game_manager = 0, None
+    with open(checkpoint_path, encoding='utf-8') as f:
+        stream = JsonStream(f)
+        for key in stream.iter_object():
+            if key == "journal_seq":
+                checkpoint_seq = stream.value()
+            elif key == "state":
+                game_manager = stream_game_state(stream, hud_manager, camera, place_starting_cities=False)
+            else:
+                stream.skip()
+
+    journal = ActionJournal(path, checkpoint_every)
+    journal.seq = checkpoint_seq
+    game_manager.journal = journal
+
+    actions = (read_actions(journal.old_path, after_seq=journal.seq)
+               + read_actions(journal_path, after_seq=journal.seq))
+    if os.path.exists(journal.old_path):
+        # A crash left a checkpoint unwritten: carry its actions over into the journal
+        lines = ''.join(json.dumps(action, ensure_ascii=False) + '\n' for action in actions)
+        write_atomically(journal_path, lines.encode('utf-8'))
+        os.remove(journal.old_path)
+        log.info('journal_recovered', "Merged {path} back into the journal", path=journal.old_path)
+    journal.replaying = True
+    try:
+        for action in actions:
+            if not apply_action(game_manager, action):
+                log.warning('replay_skipped', "Journal action {seq} ({kind}) could not be replayed",
+                            seq=action["seq"], kind=action["action"])
+            journal.seq = action["seq"]
+    finally:
+        journal.replaying = False
+    log.info('journal_replayed', "Replayed {count} actions from {path}", count=len(actions), path=journal_path)
+    return game_manager
@@ -0,0 +1,165 @@
+"""
+Incremental reader for large JSON documents.
+
+The standard json module only parses whole documents. JsonStream walks a text file through a
+buffer of a few chunks instead: objects and arrays can be entered key by key and item by item,
+and every value the caller asks for is decoded on its own with the C decoder. Only the value being
+decoded has to fit in memory, so a save with a quarter of a million tiles streams one tile at a time.
+
+    stream = JsonStream(f)
+    for key in stream.iter_object():
+        if key == "tiles":
+            for tile in stream.items():
+                handle(tile)
+        else:
+            stream.value()
+"""
+import json
+import re
+
+CHUNK_SIZE = 1 << 16
+_NOT_WHITESPACE = re.compile(r'[^ \t\n\r]')
+_AFTER_VALUE = frozenset(',:]} \t\n\r')
+
+
+class JsonStream:
+    """
+    Pull parser over a text file. Every key yielded by iter_object and every step of iter_array
+    must be followed by consuming exactly one value: value(), skip(), or a nested iter_*().
+    """
+
+    def __init__(self, f, chunk_size=CHUNK_SIZE):
+        self._file = f
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self):
+        if self._eof:
+            return False
+        chunk = self._file.read(self._chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        if self._pos > self._chunk_size:
+            self._buffer = self._buffer[self._pos:]
+            self._pos = 0
+        self._buffer += chunk
+        return True
+
+    def _peek(self):
+        """
+        The next non-whitespace character, or '' at the end of the file.
+        """
+        while True:
+            match = _NOT_WHITESPACE.search(self._buffer, self._pos)
+            if match is not None:
+                self._pos = match.start()
+                return self._buffer[self._pos]
+            self._pos = len(self._buffer)
+            if not self._fill():
+                return ''
+
+    def _expect(self, char):
+        found = self._peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} at offset {self._pos} of the JSON stream, found {found!r}")
+        self._pos += 1
+
+    def value(self):
+        """
+        Decodes the next value.
+        """
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # A number cut by the end of the buffer, like "-1." of "-1.5", may go on in the next chunk
+            if (end == len(self._buffer) or self._buffer[end] not in _AFTER_VALUE) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def skip(self):
+        self.value()
+
+    def iter_object(self):
+        """
+        Enters the next value, which must be an object, and yields its keys.
+        """
+        self._expect('{')
+        if self._peek() == '}':
+            self._pos += 1
+            return
+        while True:
+            key = self.value()
+            self._expect(':')
+            yield key
+            if self._peek() == ',':
+                self._pos += 1
+                continue
+            self._expect('}')
+            return
+
+    def iter_array(self):
+        """
+        Enters the next value, which must be an array, and yields once per item.
+        """
+        self._expect('[')
+        if self._peek() == ']':
+            self._pos += 1
+            return
+        while True:
+            yield
+            if self._peek() == ',':
+                self._pos += 1
+                continue
+            self._expect(']')
+            return
+
+    def items(self):
+        """
+        Enters the next value, which must be an array, and yields its decoded items.
+        """
+        self._expect('[')
+        if self._peek() == ']':
+            self._pos += 1
+            return
+        search, scan = _NOT_WHITESPACE.search, self._decoder.scan_once
+        while True:
+            # Fast path: the item and the separator after it are both in the buffer
+            buffer = self._buffer
+            try:
+                item, end = scan(buffer, self._pos)
+                separator = search(buffer, end)
+            except (StopIteration, json.JSONDecodeError):
+                separator = None
+            if separator is not None and buffer[separator.start()] in ',]':
+                self._pos = separator.start() + 1
+                if buffer[separator.start()] == ']':
+                    yield item
+                    return
+                following = search(buffer, self._pos)
+                if following is None:
+                    self._peek()
+                else:
+                    self._pos = following.start()
+                yield item
+                continue
+
+            item = self.value()
+            separator_char = self._peek()
+            self._pos += 1
+            if separator_char == ']':
+                yield item
+                return
+            if separator_char != ',':
+                raise ValueError(f"Expected ',' or ']' at offset {self._pos - 1} of the JSON stream")
+            self._peek()
+            yield item
@@ -0,0 +1,167 @@
+"""
+Opt-in profiling of the main loop.
+
+Enabled from the command line or the environment:
+
+    python game.py --profile          # the whole session
+    python game.py --profile 300      # the first 300 frames
+    HEXGAME_PROFILE=300 python game.py
+
+While the game runs, F9 profiles the next PROFILE_WINDOW_FRAMES frames. Every window writes one
+pstats file per named section plus a combined one to data/profiles; open them with
+`python -m pstats <file>` or snakeviz. When no window is active, section() hands out a shared
+no-op context manager, so profiling costs nothing.
+"""
+import argparse
+import contextlib
+import cProfile
+import os
+import pstats
+import sys
+import time
+import tracemalloc
+
+from src.utils.event_log import log
+
+PROFILES_PATH = os.path.join('data', 'profiles')
+PROFILE_ENV = 'HEXGAME_PROFILE'
+PROFILE_WINDOW_FRAMES = 300
+
+_NO_SECTION = contextlib.nullcontext()
+
+
+class _Section:
+    def __init__(self, profile):
+        self.profile = profile
+
+    def __enter__(self):
+        self.profile.enable()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.profile.disable()
+
+
+class Profiler:
+    """
+    Collects one cProfile per named section of the frame (input, update, board_render, ...).
+
+    start(frames) opens a window of that many frames, or an open-ended one if frames is None;
+    end_frame() closes it when the frames run out and stop() closes it at any time. Sections
+    must not be nested, cProfile can only have one profile enabled at a time.
+    """
+
+    def __init__(self, output_dir=PROFILES_PATH, window_frames=PROFILE_WINDOW_FRAMES):
+        self.output_dir = output_dir
+        self.window_frames = window_frames
+        self.active = False
+        self.frames_left = None
+        self.frames = 0
+        self.windows = 0
+        self._profiles = {}
+
+    @classmethod
+    def from_settings(cls, argv=None, environ=None):
+        """
+        Builds a profiler from --profile [FRAMES] / --profile-dir and the HEXGAME_PROFILE variable
+        ("1" or "all" for the whole session, a number for that many frames). Starts it if requested.
+        """
+        parser = argparse.ArgumentParser(description="Hex Game")
+        parser.add_argument('--profile', nargs='?', const='all', default=None, metavar='FRAMES',
+                            help="profile the whole session or only the first FRAMES frames")
+        parser.add_argument('--profile-dir', default=PROFILES_PATH, help="where to write pstats files")
+        args, _ = parser.parse_known_args(argv)
+
+        environ = os.environ if environ is None else environ
+        setting = args.profile if args.profile is not None else environ.get(PROFILE_ENV, '')
+
+        profiler = cls(output_dir=args.profile_dir)
+        if setting.strip().lower() in ('', '0', 'off', 'false'):
+            return profiler
+        if setting.strip().lower() in ('1', 'all', 'on', 'true'):
+            profiler.start()
+            return profiler
+        try:
+            frames = int(setting)
+        except ValueError:
+            frames = 0
+        if frames > 0:
+            profiler.start(frames)
+        else:
+            log.warning('profile_setting_invalid', "Ignoring profile setting {setting!r}: expected a frame count "
+                        "or all/on/off, profiling is disabled", setting=setting)
+        return profiler
+
+    def start(self, frames=None):
+        if self.active:
+            self.stop()
+        self.active = True
+        self.frames_left = frames
+        self.frames = 0
+        self.windows += 1
+        self._profiles = {}
+        log.info('profiling_started', "Profiling {window}.",
+                 window='until exit' if frames is None else f'the next {frames} frames')
+
+    def section(self, name):
+        if not self.active:
+            return _NO_SECTION
+        profile = self._profiles.get(name)
+        if profile is None:
+            profile = self._profiles[name] = cProfile.Profile()
+        return _Section(profile)
+
+    def end_frame(self):
+        if not self.active:
+            return
+        self.frames += 1
+        if self.frames_left is not None:
+            self.frames_left -= 1
+            if self.frames_left <= 0:
+                self.stop()
+
+    def stop(self):
+        """
+        Closes the current window and writes its pstats files. Returns the written paths.
+        """
+        if not self.active:
+            return []
+        self.active = False
+        return self.dump()
+
+    def dump(self):
+        profiles = {name: profile for name, profile in self._profiles.items() if profile.getstats()}
+        if not profiles:
+            return []
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        prefix = os.path.join(self.output_dir, f"{time.strftime('%Y%m%d-%H%M%S')}-w{self.windows}")
+        paths = []
+        for name, profile in profiles.items():
+            path = f"{prefix}-{name}.pstats"
+            profile.dump_stats(path)
+            paths.append(path)
+
+        combined = pstats.Stats(*profiles.values())
+        path = f"{prefix}-all.pstats"
+        combined.dump_stats(path)
+        paths.append(path)
+
+        log.info('profiling_finished', "Profiled {frames} frames, pstats written to {prefix}-*.pstats",
+                 frames=self.frames, prefix=prefix)
+        return paths
+
+
+def peak_memory_mb():
+    """
+    Peak memory in MB: of Python allocations while tracemalloc is tracing (python -X tracemalloc),
+    otherwise the peak resident size of the process. None where neither can be measured.
+    """
+    if tracemalloc.is_tracing():
+        return round(tracemalloc.get_traced_memory()[1] / 2 ** 20, 1)
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(peak / (2 ** 20 if sys.platform == 'darwin' else 2 ** 10), 1)
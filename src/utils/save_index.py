@@ -0,0 +1,236 @@
+"""
+Save headers and the index of the saves directory.
+
+Every save carries a small header next to its game state:
+
+    {"round": 12, "players": [1, 2], "map_size": [20, 20], "saved_at": 1760000000.0,
+     "thumbnail": {"size": [20, 21], "terrains": ["grass", ...], "pixels": "<base64 terrain ids>"}}
+
+JSON saves keep it under the first key, "header", binary saves in their META section and journaled
+games in their checkpoint. Whatever writes a save also records its header in data/saves/index.json,
+so the load screen reads that one file instead of opening every save. A missing index is rebuilt from
+the headers of the saves on disk, or by hand with:
+
+    python -m src.utils.save_index data/saves
+"""
+import base64
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+from src.board.storage import TERRAIN_TYPES, NO_TILE, offset_index
+from src.entities.game.registry import TERRAIN_NAME_MAPPING
+from src.utils.event_log import log
+
+SAVES_PATH = os.path.join('data', 'saves')
+INDEX_FILENAME = 'index.json'
+INDEX_VERSION = 1
+THUMBNAIL_SIZE = 48
+HEADER_PROBE_BYTES = 64 * 1024
+
+_index_lock = threading.Lock()
+
+
+def _thumbnail(terrain, rows, cols):
+    """
+    Every n-th cell of the flat terrain layer, at most THUMBNAIL_SIZE cells per side.
+    """
+    width = cols + 1
+    layer = np.asarray(terrain, dtype=np.uint8).reshape(rows, width)
+    step = max(1, -(-max(rows, width) // THUMBNAIL_SIZE))
+    pixels = np.ascontiguousarray(layer[::step, ::step])
+    return {
+        "size": [int(pixels.shape[1]), int(pixels.shape[0])],
+        "terrains": [TERRAIN_NAME_MAPPING[terrain_class] for terrain_class in TERRAIN_TYPES],
+        "pixels": base64.b64encode(pixels.tobytes()).decode('ascii'),
+    }
+
+
+def make_header(current_round, player_ids, rows, cols, terrain, saved_at=None):
+    return {
+        "round": current_round,
+        "players": list(player_ids),
+        "map_size": [rows, cols],
+        "saved_at": time.time() if saved_at is None else saved_at,
+        "thumbnail": _thumbnail(terrain, rows, cols),
+    }
+
+
+def save_header(game_manager, terrain=None):
+    """
+    The header of the running game. Pass terrain if the caller already has a board.terrain_layer() snapshot.
+    """
+    board = game_manager.board
+    if terrain is None:
+        terrain = board.terrain_layer()
+    return make_header(game_manager.current_round, [player.player_id for player in game_manager.players],
+                       board.rows, board.cols, terrain)
+
+
+def header_from_state(state):
+    """
+    A header for a serialize_game_state dict that has none, e.g. a save written before headers existed.
+    """
+    if "header" in state:
+        return state["header"]
+    board = state["board"]
+    rows, cols = board["rows"], board["cols"]
+    terrain_ids = {TERRAIN_NAME_MAPPING[terrain_class]: terrain_id for terrain_id, terrain_class in
+                   enumerate(TERRAIN_TYPES)}
+    terrain = np.full(rows * (cols + 1), NO_TILE, dtype=np.uint8)
+    for tile_data in board["tiles"]:
+        index = offset_index(tile_data["q"], tile_data["r"], rows, cols + 1)
+        if index >= 0:
+            terrain[index] = terrain_ids.get(tile_data["terrain"], 0)
+    return make_header(state["current_round"], [player["player_id"] for player in state["players"]],
+                       rows, cols, terrain, saved_at=0)
+
+
+def thumbnail_pixels(header):
+    """
+    The thumbnail as a 2D array of terrain names' indices into header["thumbnail"]["terrains"].
+    """
+    thumbnail = header["thumbnail"]
+    width, height = thumbnail["size"]
+    pixels = np.frombuffer(base64.b64decode(thumbnail["pixels"]), dtype=np.uint8)
+    return pixels.reshape(height, width)
+
+
+def _read_json_header(path):
+    with open(path, encoding='utf-8') as f:
+        probe = f.read(HEADER_PROBE_BYTES)
+        key = probe.find('"header"', 0, 32)
+        if key >= 0:
+            start = probe.index(':', key) + 1
+            try:
+                return json.JSONDecoder().raw_decode(probe[start:].lstrip())[0]
+            except json.JSONDecodeError:
+                pass
+        f.seek(0)
+        return header_from_state(json.load(f))
+
+
+def read_save_header(path):
+    """
+    The header of the save at path, read without loading the game state where the format allows it.
+    """
+    from src.utils.binary_save import is_binary_save, read_binary_meta
+    from src.utils.journal import JOURNAL_EXTENSION, journal_paths
+
+    if path.endswith(JOURNAL_EXTENSION):
+        with open(journal_paths(path)[1], encoding='utf-8') as f:
+            return header_from_state(json.load(f)["state"])
+    if is_binary_save(path):
+        meta = read_binary_meta(path)
+        if "header" in meta:
+            return meta["header"]
+        from src.utils.binary_save import read_binary_save
+        return header_from_state(read_binary_save(path).to_state())
+    return _read_json_header(path)
+
+
+def is_save_file(filename):
+    from src.utils.binary_save import BINARY_SAVE_EXTENSION
+    from src.utils.journal import JOURNAL_EXTENSION, CHECKPOINT_SUFFIX
+
+    if filename == INDEX_FILENAME or filename.endswith(CHECKPOINT_SUFFIX):
+        return False
+    return filename.endswith(('.json', BINARY_SAVE_EXTENSION, JOURNAL_EXTENSION))
+
+
+class SaveIndex:
+    """
+    data/saves/index.json: the header of every save in the directory, keyed by file name.
+    """
+
+    def __init__(self, directory=SAVES_PATH):
+        self.directory = directory
+        self.path = os.path.join(directory, INDEX_FILENAME)
+
+    def _read(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get("version") != INDEX_VERSION:
+            return None
+        return data["saves"]
+
+    def _write(self, saves):
+        from src.utils.autosave import write_atomically
+
+        os.makedirs(self.directory, exist_ok=True)
+        data = {"version": INDEX_VERSION, "saves": saves}
+        write_atomically(self.path, json.dumps(data, ensure_ascii=False).encode('utf-8'))
+
+    def entries(self):
+        """
+        {file name: header} of all saves, newest first. Rebuilds the index if it is missing or unreadable.
+        """
+        with _index_lock:
+            saves = self._read()
+            if saves is None:
+                saves = self._rebuild()
+        return dict(sorted(saves.items(), key=lambda item: item[1].get("saved_at", 0), reverse=True))
+
+    def record(self, filename, header):
+        with _index_lock:
+            saves = self._read()
+            if saves is None:
+                saves = self._rebuild()
+            saves[filename] = header
+            self._write(saves)
+
+    def forget(self, *filenames):
+        with _index_lock:
+            saves = self._read()
+            if saves is None:
+                return
+            for filename in filenames:
+                saves.pop(filename, None)
+            self._write(saves)
+
+    def rebuild(self):
+        with _index_lock:
+            return self._rebuild()
+
+    def _rebuild(self):
+        saves = {}
+        if os.path.isdir(self.directory):
+            for filename in os.listdir(self.directory):
+                if not is_save_file(filename):
+                    continue
+                path = os.path.join(self.directory, filename)
+                try:
+                    header = read_save_header(path)
+                except Exception as e:
+                    log.warning('save_header_unreadable', "Skipping {path} in the save index: {error}",
+                                path=path, error=e)
+                    continue
+                if not header.get("saved_at"):
+                    header["saved_at"] = os.path.getmtime(path)
+                saves[filename] = header
+        self._write(saves)
+        log.info('save_index_rebuilt', "Save index rebuilt with {count} saves", count=len(saves))
+        return saves
+
+
+def record_save(path, header):
+    """
+    Records the save written to path in the index of its directory.
+    """
+    try:
+        SaveIndex(os.path.dirname(path) or '.').record(os.path.basename(path), header)
+    except OSError as e:
+        log.error('save_index_failed', "Could not update the save index for {path}: {error}", path=path, error=e)
+
+
+if __name__ == "__main__":
+    import sys
+
+    index = SaveIndex(sys.argv[1] if len(sys.argv) > 1 else SAVES_PATH)
+    print(f"Indexed {len(index.rebuild())} saves in {index.path}")
@@ -2,6 +2,7 @@ import json
 
 from src.entities.game.level_objects import City
 from src.entities.game.registry import TERRAIN_NAME_MAPPING
+from src.utils.save_index import save_header, record_save
 
 
 def serialize_unit(unit):
@@ -81,6 +82,7 @@ def serialize_board(board):
 
 def serialize_game_state(game_manager):
     return {
+        "header": save_header(game_manager),
         "board": serialize_board(game_manager.board),
         "players": [serialize_player(player) for player in game_manager.players],
         "current_player_id": game_manager.get_current_player().player_id
@@ -94,6 +96,15 @@ def serialize_game_state(game_manager):
 
 
 def save_game(game_manager, filename="data/saves/savegame.json"):
-    game_state = serialize_game_state(game_manager)
-    with open(filename, "w") as f:
-        json.dump(game_state, f, indent=4)
+    """
+    Saves as JSON, or in the binary format when filename has the binary save extension.
+    """
+    from src.utils.binary_save import BINARY_SAVE_EXTENSION, save_binary_game
+    if filename.endswith(BINARY_SAVE_EXTENSION):
+        header = save_binary_game(game_manager, filename)
+    else:
+        game_state = serialize_game_state(game_manager)
+        with open(filename, "w") as f:
+            json.dump(game_state, f, indent=4)
+        header = game_state["header"]
+    record_save(filename, header)
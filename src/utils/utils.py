@@ -1,15 +1,45 @@
+import json
 import os
 import sys
 import pygame
 
+IMAGES_PATH = os.path.join('data', 'images')
+# Built by `python -m src.utils.atlas`, see src/utils/atlas.py
+ATLAS_IMAGE_PATH = os.path.join(IMAGES_PATH, 'atlas.png')
+ATLAS_INDEX_PATH = os.path.join(IMAGES_PATH, 'atlas.json')
 
-def load_image(name, colorkey=None, subdir=None):
-    base_path = os.path.join('data', 'images')
+# Converted surfaces shared by everyone who loads the same file at the same size and colorkey.
+# Callers must copy an image before drawing on it or changing its alpha.
+_image_cache = {}
+image_cache_stats = {'hits': 0, 'misses': 0, 'atlas': 0}
+_atlas = None
+
+
+def load_image(name, colorkey=None, subdir=None, size=None):
     if subdir:
-        filename = os.path.join(base_path, subdir, name)
+        filename = os.path.join(IMAGES_PATH, subdir, name)
     else:
-        filename = os.path.join(base_path, name)
+        filename = os.path.join(IMAGES_PATH, name)
+
+    key = (filename, tuple(size) if size else None, colorkey)
+    image = _image_cache.get(key)
+    if image is not None:
+        image_cache_stats['hits'] += 1
+        return image
+    image_cache_stats['misses'] += 1
 
+    image = _atlas_image(filename, size) if colorkey is None else None
+    if image is not None:
+        image_cache_stats['atlas'] += 1
+    elif size:
+        image = pygame.transform.scale(load_image(name, colorkey, subdir), size)
+    else:
+        image = _load_image_file(filename, colorkey)
+    _image_cache[key] = image
+    return image
+
+
+def _load_image_file(filename, colorkey):
     if not os.path.isfile(filename):
         raise ValueError(f"Файл с изображением '{filename}' не найден")
 
@@ -26,3 +56,62 @@ def load_image(name, colorkey=None, subdir=None):
         image = image.convert_alpha()
 
     return image
+
+
+def _load_atlas():
+    """
+    Reads the sprite atlas and its index once. Returns {(filename, size): sub-surface}, empty without an atlas.
+    """
+    global _atlas
+    if _atlas is not None:
+        return _atlas
+
+    _atlas = {}
+    if not (os.path.isfile(ATLAS_IMAGE_PATH) and os.path.isfile(ATLAS_INDEX_PATH)):
+        return _atlas
+
+    with open(ATLAS_INDEX_PATH, 'r', encoding='utf-8') as f:
+        index = json.load(f)
+    sheet = pygame.image.load(ATLAS_IMAGE_PATH).convert_alpha()
+    for sprite in index["sprites"]:
+        filename = os.path.join(IMAGES_PATH, *sprite["file"].split('/'))
+        _atlas[(filename, tuple(sprite["size"]))] = sheet.subsurface(pygame.Rect(sprite["rect"]))
+    return _atlas
+
+
+def _atlas_image(filename, size):
+    if not size:
+        return None
+    return _load_atlas().get((filename, tuple(size)))
+
+
+def preload_images(variants=()):
+    """
+    Loads every image under data/images into the cache, so later load_image calls do no disk I/O.
+    variants lists (subdir, size) pairs whose images are also scaled ahead of time; variants found
+    in the sprite atlas are sliced from it, and their source files aren't decoded at all.
+    Needs a display mode to be set, as images are converted to its pixel format.
+    """
+    sizes = {}
+    for subdir, size in variants:
+        sizes.setdefault(subdir, []).append(size)
+
+    atlas = _load_atlas()
+    for directory, _, files in os.walk(IMAGES_PATH):
+        subdir = os.path.relpath(directory, IMAGES_PATH)
+        subdir = None if subdir == os.curdir else subdir
+        for name in sorted(files):
+            filename = os.path.join(directory, name)
+            if not name.lower().endswith('.png') or filename == ATLAS_IMAGE_PATH:
+                continue
+            variant_sizes = sizes.get(subdir, ())
+            if not variant_sizes or not all((filename, tuple(size)) in atlas for size in variant_sizes):
+                load_image(name, subdir=subdir)  # the atlas doesn't cover this file, decode it
+            for size in variant_sizes:
+                load_image(name, subdir=subdir, size=size)
+
+
+def clear_image_cache():
+    global _atlas
+    _image_cache.clear()
+    _atlas = None
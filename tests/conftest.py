@@ -0,0 +1,103 @@
+"""
+Shared fixtures: a headless pygame display and small games built without the game loop.
+
+Images and saves are looked up relative to the repository root, so the tests run from there.
+"""
+import os
+import random
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import pygame
+
+from src.utils.event_log import log, WARNING
+
+
+@pytest.fixture(scope='session', autouse=True)
+def display():
+    pygame.init()
+    log.level = WARNING
+    yield pygame.display.set_mode((1000, 800))
+    pygame.quit()
+
+
+@pytest.fixture(scope='session')
+def camera(display):
+    from src.camera.camera import Camera
+
+    return Camera(1000, 800, 20)
+
+
+@pytest.fixture(scope='session')
+def hud_manager(display):
+    from src.ui.hud.ui import HUDManager
+
+    return HUDManager(1000, 800, pygame.font.Font(None, 20), lambda: None)
+
+
+@pytest.fixture
+def new_game(hud_manager, camera):
+    """
+    Builds a seeded game on a fresh board: new_game(rows=12, cols=12, players=2, seed=0, **board_options).
+    """
+    from src.board.board import HexBoard
+    from src.game_core.game_core import GameManager, Player
+
+    def build(rows=12, cols=12, players=2, seed=0, place_starting_cities=True, **board_options):
+        random.seed(seed)
+        board = HexBoard(rows, cols, 50, **board_options)
+        game_manager = GameManager([Player(i + 1) for i in range(players)], board, camera, hud_manager,
+                                   place_starting_cities=place_starting_cities)
+        board.game_manager = game_manager
+        return game_manager
+
+    return build
+
+
+def comparable_state(state):
+    """
+    A serialize_game_state dict without the parts that legitimately differ between a game and its copy:
+    the header (save time), tile order and the per-turn income/expense reports.
+    """
+    state = dict(state)
+    state.pop("header", None)
+    state["board"] = dict(state["board"], tiles=sorted(state["board"]["tiles"], key=lambda t: (t["r"], t["q"])))
+    state["players"] = [{key: value for key, value in player.items() if key not in ("income", "expense")}
+                        for player in state["players"]]
+    return state
+
+
+@pytest.fixture
+def game_state():
+    """
+    serialize_game_state of a game in the comparable form, see comparable_state.
+    """
+    from src.utils.serialization import serialize_game_state
+
+    return lambda game_manager: comparable_state(serialize_game_state(game_manager))
+
+
+@pytest.fixture
+def populated_game(new_game):
+    """
+    new_game with units of both players scattered over free tiles, some of them damaged.
+    """
+    from src.utils.factories import GameEntityFactory
+
+    def build(units=8, **options):
+        game_manager = new_game(**options)
+        free = [tile for tile in game_manager.board.grid.values() if tile.unit is None and tile.building is None]
+        for i, tile in enumerate(random.sample(free, units)):
+            player = game_manager.players[i % len(game_manager.players)]
+            unit = GameEntityFactory.create_unit(('warrior', 'archer', 'cavalry')[i % 3], tile, player, game_manager)
+            unit.hp -= i
+        return game_manager
+
+    return build
@@ -0,0 +1,105 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from src.board.board import HexBoard
+from src.board.storage import NO_TILE, TERRAIN_TYPES
+from src.utils.binary_save import (BinarySave, decode_terrain, encode_terrain, is_binary_save, read_binary_meta,
+                                   read_binary_save)
+from src.utils.deserialization import deserialize_binary_game_state, load_game_from_file
+from src.utils.serialization import save_game, serialize_game_state
+from src.utils.save_index import SaveIndex
+
+from conftest import comparable_state
+
+
+@pytest.mark.parametrize('name', ['level1', 'level2', 'level3'])
+def test_level_saves_round_trip(name):
+    with open(os.path.join('data', 'saves', name + '.json'), encoding='utf-8') as f:
+        state = json.load(f)
+
+    restored = BinarySave.from_bytes(BinarySave.from_state(state).to_bytes()).to_state()
+
+    header = restored.pop("header")
+    assert restored == state
+    assert header["map_size"] == [state["board"]["rows"], state["board"]["cols"]]
+
+
+def test_from_game_matches_json_state(populated_game):
+    game_manager = populated_game()
+    city = next(iter(game_manager.players[0].buildings))
+    city.city_improvements['farm'] = city.city_improvement_blueprints['farm']
+    city.city_improvements_in_progress_id = 'mine'
+    game_manager.players[0].camera_x = 12.5
+
+    from_game = BinarySave.from_bytes(BinarySave.from_game(game_manager).to_bytes()).to_state()
+
+    assert comparable_state(from_game) == comparable_state(serialize_game_state(game_manager))
+
+
+def test_saved_game_loads_back_the_same(populated_game, game_state, hud_manager, camera, tmp_path):
+    game_manager = populated_game(seed=3)
+    game_manager.next_player()
+    path = str(tmp_path / 'game.hexsave')
+
+    save_game(game_manager, path)
+    loaded = deserialize_binary_game_state(read_binary_save(path), hud_manager, camera, place_starting_cities=False)
+
+    assert is_binary_save(path)
+    assert game_state(loaded) == game_state(game_manager)
+    assert SaveIndex(str(tmp_path)).entries()['game.hexsave']["round"] == game_manager.current_round
+
+
+@pytest.mark.parametrize('extension', ['.json', '.hexsave'])
+def test_loading_a_save_restores_it_as_it_is(populated_game, game_state, hud_manager, camera, tmp_path, extension):
+    game_manager = populated_game(seed=4)
+    path = str(tmp_path / ('game' + extension))
+    save_game(game_manager, path)
+
+    loaded = load_game_from_file(path, hud_manager, camera)
+
+    assert game_state(loaded) == game_state(game_manager)
+    assert sum(len(player.buildings) for player in loaded.players) == len(game_manager.players)
+    assert not os.path.exists(path + '.tmp')
+
+
+def test_meta_carries_the_header(new_game, tmp_path):
+    game_manager = new_game(rows=8, cols=10)
+    path = str(tmp_path / 'game.hexsave')
+
+    save_game(game_manager, path)
+
+    header = read_binary_meta(path)["header"]
+    assert header["map_size"] == [8, 10]
+    assert header["players"] == [1, 2]
+
+
+@pytest.mark.parametrize('layer', [
+    np.zeros(0, dtype=np.uint8),
+    np.full(1000, 2, dtype=np.uint8),
+    np.random.default_rng(0).integers(0, len(TERRAIN_TYPES), 5000).astype(np.uint8),
+    np.where(np.arange(3000) % 21 == 20, NO_TILE, np.arange(3000) // 700 % len(TERRAIN_TYPES)).astype(np.uint8),
+], ids=['empty', 'uniform', 'noise', 'runs with gaps'])
+def test_terrain_encoding_round_trip(layer):
+    decoded = decode_terrain(encode_terrain(layer))
+
+    assert decoded.dtype == np.uint8
+    assert np.array_equal(decoded, layer)
+
+
+def test_array_and_dict_boards_save_the_same_terrain(new_game):
+    layer = HexBoard(30, 20, 50, storage='dict').terrain_layer()
+
+    saves = [BinarySave.from_game(new_game(rows=30, cols=20, storage=storage, terrain_layer=layer,
+                                           place_starting_cities=False))
+             for storage in ('dict', 'array')]
+
+    for binary_save in saves:
+        assert np.array_equal(binary_save.terrain, layer)
+
+
+def test_rejects_other_files():
+    with pytest.raises(ValueError):
+        BinarySave.from_bytes(b'PK\x03\x04' + bytes(32))
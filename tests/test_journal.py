@@ -0,0 +1,210 @@
+import json
+import os
+import random
+
+import pytest
+
+from src.utils.deserialization import load_game_from_file
+from src.utils.hex_utils import cube_distance
+from src.utils.journal import ActionJournal, journal_paths, read_actions, session_journal_path, OLD_JOURNAL_SUFFIX
+
+
+def play(game_manager, turns, rng):
+    """
+    Plays turns with every kind of journaled action: recruiting, moving and attacking.
+    """
+    board = game_manager.board
+    for _ in range(turns):
+        player = game_manager.get_current_player()
+        # A unit recruited onto an occupied city tile replaces the one standing there, so units
+        # only recruit on free cities and never move onto buildings
+        for city in [building for building in player.buildings if hasattr(building, 'start_unit_recruitment')]:
+            if not city.unit_recruitment_in_progress_id and city.hex_tile.unit is None:
+                city.start_unit_recruitment('warrior')
+        for unit in list(player.units):
+            if not unit.alive():
+                continue
+            enemies = [tile for tile in board.grid.values() if tile.unit and tile.unit.player is not player
+                       and cube_distance(tile, unit.hex_tile) <= unit.attack_range]
+            if enemies and unit.can_attack:
+                unit.attack(enemies[0].unit, (0, 0))
+                continue
+            neighbors = [tile for tile in board.grid.values()
+                         if cube_distance(tile, unit.hex_tile) == 1 and tile.unit is None and tile.building is None]
+            if neighbors:
+                unit.move_to(rng.choice(neighbors), board, (0, 0))
+        game_manager.next_player()
+
+
+@pytest.fixture
+def journaled_game(populated_game, tmp_path):
+    """
+    A game journaling to tmp_path/game.journal with a checkpoint every 3 rounds.
+    """
+    games = []
+
+    def build(**options):
+        game_manager = populated_game(units=6, **options)
+        game_manager.journal = ActionJournal.start(str(tmp_path / 'game.json'), game_manager, checkpoint_every=3)
+        games.append(game_manager)
+        return game_manager
+
+    yield build
+    for game_manager in games:
+        game_manager.journal.close()
+
+
+@pytest.fixture
+def load(hud_manager, camera, tmp_path):
+    """
+    Loads tmp_path/game.journal; the loaded games' journals are closed after the test.
+    """
+    games = []
+
+    def load_journal():
+        game_manager = load_game_from_file(journal_paths(str(tmp_path / 'game.json'))[0], hud_manager, camera)
+        games.append(game_manager)
+        return game_manager
+
+    yield load_journal
+    for game_manager in games:
+        game_manager.journal.close()
+
+
+@pytest.mark.parametrize('turns', [1, 6, 43])
+def test_replay_restores_the_game(journaled_game, load, game_state, turns):
+    game_manager = journaled_game(seed=turns)
+    play(game_manager, turns, random.Random(turns))
+    game_manager.journal.close()
+
+    assert game_state(load()) == game_state(game_manager)
+
+
+def test_checkpoint_resets_the_journal(journaled_game, tmp_path):
+    game_manager = journaled_game()
+    play(game_manager, 14, random.Random(1))
+    game_manager.journal.close()
+    journal_path, checkpoint_path = journal_paths(str(tmp_path / 'game.json'))
+
+    with open(checkpoint_path, encoding='utf-8') as f:
+        checkpoint = json.load(f)
+    actions = read_actions(journal_path)
+
+    assert checkpoint["state"]["current_round"] == 6
+    assert all(action["seq"] > checkpoint["journal_seq"] for action in actions)
+    assert actions[-1]["seq"] == game_manager.journal.seq
+    assert not os.path.exists(journal_path + OLD_JOURNAL_SUFFIX)
+
+
+def test_torn_last_line_is_skipped_and_the_journal_goes_on(journaled_game, load, game_state, tmp_path):
+    game_manager = journaled_game(seed=2)
+    play(game_manager, 5, random.Random(2))
+    game_manager.journal.close()
+    with open(journal_paths(str(tmp_path / 'game.json'))[0], 'a', encoding='utf-8') as f:
+        f.write('{"seq": 999, "act')
+
+    resumed = load()
+    assert game_state(resumed) == game_state(game_manager)
+
+    play(resumed, 4, random.Random(3))
+    resumed.journal.close()
+    assert game_state(load()) == game_state(resumed)
+
+
+def test_actions_of_a_pending_checkpoint_are_replayed(journaled_game, load, game_state, tmp_path):
+    game_manager = journaled_game(seed=4)
+    play(game_manager, 5, random.Random(4))
+    game_manager.journal.close()
+    # A crash after the journal was moved aside, before the new checkpoint was written
+    journal_path = journal_paths(str(tmp_path / 'game.json'))[0]
+    os.replace(journal_path, journal_path + OLD_JOURNAL_SUFFIX)
+
+    assert game_state(load()) == game_state(game_manager)
+
+
+def test_leftover_old_journal_is_merged_and_rotation_goes_on(journaled_game, load, game_state, tmp_path):
+    game_manager = journaled_game(seed=7)
+    play(game_manager, 5, random.Random(7))
+    game_manager.journal.close()
+    journal_path, checkpoint_path = journal_paths(str(tmp_path / 'game.json'))
+    os.replace(journal_path, journal_path + OLD_JOURNAL_SUFFIX)
+
+    resumed = load()
+    assert not os.path.exists(journal_path + OLD_JOURNAL_SUFFIX)
+    assert game_state(resumed) == game_state(game_manager)
+
+    play(resumed, 8, random.Random(8))
+    resumed.journal.close()
+    with open(checkpoint_path, encoding='utf-8') as f:
+        checkpoint_seq = json.load(f)["journal_seq"]
+
+    assert not os.path.exists(journal_path + OLD_JOURNAL_SUFFIX)
+    assert all(action["seq"] > checkpoint_seq for action in read_actions(journal_path))
+    assert game_state(load()) == game_state(resumed)
+
+
+def test_failed_checkpoint_keeps_its_actions(journaled_game, load, game_state, tmp_path, monkeypatch):
+    import src.utils.journal as journal_module
+
+    write_atomically = journal_module.write_atomically
+    failures = []
+
+    def fail_once(path, data):
+        if not failures:
+            failures.append(path)
+            raise OSError("disk full")
+        write_atomically(path, data)
+
+    game_manager = journaled_game(seed=9)
+    game_manager.journal._queue.join()
+    monkeypatch.setattr(journal_module, 'write_atomically', fail_once)
+    play(game_manager, 4, random.Random(9))  # the checkpoint of round 3 fails
+    play(game_manager, 2, random.Random(10))
+    game_manager.journal._queue.join()
+    journal_path = journal_paths(str(tmp_path / 'game.json'))[0]
+    assert failures and os.path.exists(journal_path + OLD_JOURNAL_SUFFIX)
+
+    play(game_manager, 6, random.Random(11))  # the checkpoint of round 6 succeeds
+    game_manager.journal.close()
+
+    assert not os.path.exists(journal_path + OLD_JOURNAL_SUFFIX)
+    assert game_state(load()) == game_state(game_manager)
+
+
+def test_start_never_overwrites_an_earlier_game(journaled_game, populated_game, tmp_path):
+    play(journaled_game(seed=5), 2, random.Random(5))
+    journal_path, checkpoint_path = journal_paths(str(tmp_path / 'game.json'))
+    with open(journal_path, 'rb') as f:
+        journal = f.read()
+
+    with pytest.raises(FileExistsError):
+        ActionJournal.start(str(tmp_path / 'game.json'), populated_game(seed=6))
+
+    with open(journal_path, 'rb') as f:
+        assert f.read() == journal
+    assert os.path.exists(checkpoint_path)
+
+
+def test_session_journal_paths_are_free(journaled_game, tmp_path):
+    journaled_game()
+    save_path = str(tmp_path / 'game.json')
+
+    first = session_journal_path(save_path)
+    open(first, 'w').close()
+    second = session_journal_path(save_path)
+
+    assert os.path.dirname(first) == str(tmp_path)
+    assert os.path.basename(first).startswith('game-') and first.endswith('.journal')
+    assert second != first and not os.path.exists(second)
+    assert session_journal_path(str(tmp_path / 'game.journal')) != journal_paths(save_path)[0]
+
+
+def test_read_actions_after_seq(tmp_path):
+    path = str(tmp_path / 'game.journal')
+    with open(path, 'w', encoding='utf-8') as f:
+        for seq in range(1, 6):
+            f.write(json.dumps({"seq": seq, "action": "end_turn"}) + '\n')
+        f.write('\n{"seq": 6, "acti')
+
+    assert [action["seq"] for action in read_actions(path, after_seq=2)] == [3, 4, 5]
+    assert read_actions(str(tmp_path / 'missing.journal')) == []
@@ -0,0 +1,100 @@
+import io
+import json
+import random
+
+import pytest
+
+from src.utils.deserialization import deserialize_game_state, stream_game_state
+from src.utils.json_stream import JsonStream
+from src.utils.serialization import serialize_game_state
+
+CHUNK_SIZES = [1, 2, 3, 7, 64, 1 << 16]
+
+
+def random_value(rng, depth=0):
+    roll = rng.random()
+    if depth > 3 or roll < 0.3:
+        return rng.choice([123456789, -1.5e10, 0.25, "a,]}\"x", "тайл", True, False, None, 0, [], {}])
+    if roll < 0.6:
+        return [random_value(rng, depth + 1) for _ in range(rng.randint(0, 6))]
+    return {f"k{i}": random_value(rng, depth + 1) for i in range(rng.randint(0, 5))}
+
+
+def walk(stream, rng):
+    """
+    Rebuilds the next value through the stream, mixing every way of consuming arrays.
+    """
+    char = stream._peek()
+    if char == '{':
+        return {key: walk(stream, rng) for key in stream.iter_object()}
+    if char == '[':
+        if rng.random() < 0.5:
+            return list(stream.items())
+        return [walk(stream, rng) for _ in stream.iter_array()]
+    return stream.value()
+
+
+@pytest.mark.parametrize('chunk_size', CHUNK_SIZES)
+def test_streamed_documents_match_json_loads(chunk_size):
+    rng = random.Random(chunk_size)
+    for _ in range(30):
+        document = {"a": random_value(rng), "tiles": [random_value(rng) for _ in range(rng.randint(0, 30))]}
+        text = json.dumps(document, indent=rng.choice([None, 0, 4]), ensure_ascii=rng.random() < 0.5)
+
+        assert walk(JsonStream(io.StringIO(text), chunk_size=chunk_size), rng) == document
+
+
+@pytest.mark.parametrize('chunk_size', CHUNK_SIZES)
+def test_numbers_split_between_chunks(chunk_size):
+    numbers = [-1.5, 12345678, -0.001, 1e-7, 250, 3.14159]
+    text = json.dumps(numbers, separators=(',', ':'))
+
+    assert list(JsonStream(io.StringIO(text), chunk_size=chunk_size).items()) == numbers
+
+
+def test_skipped_values_leave_the_stream_at_the_next_key():
+    text = json.dumps({"big": {"nested": [1, [2, {"x": "}]"}]]}, "tiles": [{"q": 0}, {"q": 1}], "round": 7})
+    stream = JsonStream(io.StringIO(text), chunk_size=4)
+
+    seen = {}
+    for key in stream.iter_object():
+        if key == "big":
+            stream.skip()
+        else:
+            seen[key] = stream.value()
+
+    assert seen == {"tiles": [{"q": 0}, {"q": 1}], "round": 7}
+
+
+@pytest.mark.parametrize('text', ['[1 2]', '{"a" 1}', '{"a": 1,}', '[1, 2'])
+def test_malformed_documents_raise(text):
+    stream = JsonStream(io.StringIO(text), chunk_size=2)
+
+    with pytest.raises(ValueError):
+        walk(stream, random.Random(0))
+
+
+@pytest.mark.parametrize('chunk_size', [5, 1 << 16])
+def test_streamed_game_matches_the_parsed_one(populated_game, game_state, hud_manager, camera, chunk_size):
+    game_manager = populated_game(rows=15, cols=18, seed=6)
+    text = json.dumps(serialize_game_state(game_manager), indent=4)
+
+    parsed = deserialize_game_state(json.loads(text), hud_manager, camera, place_starting_cities=False)
+    streamed = stream_game_state(JsonStream(io.StringIO(text), chunk_size=chunk_size), hud_manager, camera,
+                                 place_starting_cities=False)
+
+    assert game_state(streamed) == game_state(parsed) == game_state(game_manager)
+
+
+def test_streamed_game_fills_the_board_indices(populated_game, hud_manager, camera):
+    game_manager = populated_game(rows=15, cols=18, units=30, seed=7)
+    text = json.dumps(serialize_game_state(game_manager))
+
+    streamed = stream_game_state(JsonStream(io.StringIO(text)), hud_manager, camera, place_starting_cities=False)
+
+    def positions(board):
+        return sorted((board.entities.position_of(entity), type(entity).__name__) for entity in board.entities._positions)
+
+    assert positions(streamed.board) == positions(game_manager.board)
+    assert len(streamed.board.entities) == len(streamed.all_sprites)
+    assert (streamed.board.city_zones.city_count == game_manager.board.city_zones.city_count).all()
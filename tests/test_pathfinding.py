@@ -0,0 +1,147 @@
+import heapq
+import itertools
+import random
+
+import pytest
+
+from src.board.board import HexBoard
+
+STORAGES = ['dict', 'array']
+
+
+def neighbors(board, tile):
+    for coords in tile.get_neighbors():
+        neighbor = board.get_tile_by_hex(coords)
+        if neighbor is not None:
+            yield neighbor
+
+
+def reference_costs(board, start):
+    """
+    Plain Dijkstra over tiles and hex neighbours: the cheapest cost of entering every tile from start.
+    Tiles with units can be entered but not left.
+    """
+    costs = {start: 0}
+    counter = itertools.count()
+    heap = [(0, next(counter), start)]
+    while heap:
+        cost, _, tile = heapq.heappop(heap)
+        if cost > costs[tile] or (tile.unit is not None and tile != start):
+            continue
+        for neighbor in neighbors(board, tile):
+            new_cost = cost + neighbor.terrain.cost
+            if new_cost < costs.get(neighbor, float('inf')):
+                costs[neighbor] = new_cost
+                heapq.heappush(heap, (new_cost, next(counter), neighbor))
+    return costs
+
+
+def reference_reachable(board, unit, movement, include_occupied, extra_steps):
+    """
+    The breadth-first search the board used before the movement field, kept as the specification.
+    """
+    reachable = set()
+    queue = [(unit.hex_tile, movement, extra_steps)]
+    visited = set(queue)
+    while queue:
+        tile, remaining, remaining_extra = queue.pop(0)
+        reachable.add(tile)
+        for neighbor in neighbors(board, tile):
+            if not include_occupied and neighbor.unit is not None:
+                continue
+            left = remaining - neighbor.terrain.cost
+            if remaining > 0 and left >= 0 and (neighbor, left, remaining_extra) not in visited:
+                visited.add((neighbor, left, remaining_extra))
+                queue.append((neighbor, left, remaining_extra))
+            if remaining_extra > 0 and (neighbor, 0, remaining_extra - 1) not in visited:
+                visited.add((neighbor, 0, remaining_extra - 1))
+                queue.append((neighbor, 0, remaining_extra - 1))
+    return reachable
+
+
+def assert_valid_path(board, path, start, goal, cost):
+    assert path[0] == start and path[-1] == goal
+    for previous, tile in zip(path, path[1:]):
+        assert tile in set(neighbors(board, previous))
+        assert previous == start or previous.unit is None
+    assert sum(tile.terrain.cost for tile in path[1:]) == cost
+
+
+@pytest.mark.parametrize('storage', STORAGES)
+def test_find_path_matches_dijkstra(populated_game, storage):
+    game_manager = populated_game(rows=14, cols=16, units=25, seed=1, storage=storage)
+    board = game_manager.board
+    tiles = list(board.grid.values())
+    rng = random.Random(1)
+
+    for start in rng.sample(tiles, 8):
+        costs = reference_costs(board, start)
+        for goal in rng.sample(tiles, 20):
+            path, cost = board.find_path(start, goal)
+            if goal not in costs:
+                assert path is None and cost is None
+                continue
+            assert cost == costs[goal]
+            assert_valid_path(board, path, start, goal, cost)
+
+
+@pytest.mark.parametrize('storage', STORAGES)
+def test_find_path_respects_max_cost(populated_game, storage):
+    game_manager = populated_game(rows=12, cols=12, units=15, seed=2, storage=storage)
+    board = game_manager.board
+    tiles = list(board.grid.values())
+    rng = random.Random(2)
+
+    for start in rng.sample(tiles, 5):
+        costs = reference_costs(board, start)
+        for goal in rng.sample(tiles, 15):
+            max_cost = rng.randint(0, 12)
+            path, cost = board.find_path(start, goal, max_cost=max_cost)
+            if goal in costs and costs[goal] <= max_cost:
+                assert cost == costs[goal]
+            else:
+                assert path is None
+
+
+@pytest.mark.parametrize('storage', STORAGES)
+def test_movement_field_matches_dijkstra(populated_game, storage):
+    game_manager = populated_game(rows=12, cols=14, units=20, seed=3, storage=storage)
+    board = game_manager.board
+
+    for unit in list(game_manager.all_units)[:8]:
+        for budget in (1, 3, 6):
+            field = board.get_movement_field(unit, budget)
+            costs = reference_costs(board, unit.hex_tile)
+            expected = {tile for tile, cost in costs.items()
+                        if cost <= budget and (tile.unit is None or tile == unit.hex_tile)}
+
+            assert field.reachable == expected
+            for tile in expected:
+                path, cost = field.path_to(tile)
+                assert cost == costs[tile]
+                assert_valid_path(board, path, unit.hex_tile, tile, cost)
+
+
+@pytest.mark.parametrize('include_occupied', [False, True])
+def test_reachable_tiles_match_the_breadth_first_search(populated_game, include_occupied):
+    game_manager = populated_game(rows=10, cols=10, units=20, seed=4)
+    board = game_manager.board
+
+    for unit in list(game_manager.all_units)[:6]:
+        for movement in (1, 3, 5):
+            for extra_steps in (0, 1, 2):
+                assert (board.get_reachable_tiles(unit, movement, include_occupied, extra_steps)
+                        == reference_reachable(board, unit, movement, include_occupied, extra_steps))
+
+
+def test_path_cache_is_bounded(display):
+    board = HexBoard(30, 30, 50)
+    tiles = list(board.grid.values())
+
+    for goal in tiles[:HexBoard.PATH_CACHE_SIZE + 50]:
+        board.find_path(tiles[0], goal)
+    first = board.find_path(tiles[0], tiles[-1])
+
+    assert len(board._path_cache) == HexBoard.PATH_CACHE_SIZE
+    assert (tiles[0].index, tiles[0].index, None) not in board._path_cache
+    assert board.find_path(tiles[0], tiles[-1]) is first
@@ -0,0 +1,82 @@
+import random
+
+import numpy as np
+import pytest
+
+from src.board.board import HexBoard
+from src.utils.hex_utils import cube_distance
+
+STORAGES = ['dict', 'array']
+
+
+def brute_force(board, center, predicate):
+    """
+    Indices of the tiles whose distance from center satisfies predicate, found by scanning the whole board.
+    """
+    return sorted(tile.index for tile in board.grid.values() if predicate(cube_distance(tile, center)))
+
+
+@pytest.fixture(params=STORAGES)
+def board(request):
+    return HexBoard(13, 17, 50, storage=request.param)
+
+
+def centers(board, count, seed):
+    """
+    Random tiles plus the corners of the board, where most of every query falls outside of it.
+    """
+    tiles = list(board.grid.values())
+    corners = [board.tile_at(index) for index in (0, board.width - 2, len(board.queries.valid) - board.width)]
+    return random.Random(seed).sample(tiles, count) + [tile for tile in corners if tile is not None]
+
+
+def test_disk_matches_a_scan_of_the_board(board):
+    for center in centers(board, 12, seed=1):
+        for radius in (0, 1, 2, 5, 9, 30):
+            disk = board.queries.disk(center.q, center.r, radius)
+
+            assert disk.tolist() == brute_force(board, center, lambda distance: distance <= radius)
+            assert [tile.index for tile in board.get_hexes_in_radius(center, radius)] == disk.tolist()
+
+
+def test_ring_matches_a_scan_of_the_board(board):
+    for center in centers(board, 12, seed=2):
+        for radius in (0, 1, 3, 6, 30):
+            ring = board.queries.ring(center.q, center.r, radius).tolist()
+
+            assert len(set(ring)) == len(ring)
+            assert sorted(ring) == brute_force(board, center, lambda distance: distance == radius)
+
+
+def test_ring_walks_from_neighbour_to_neighbour(board):
+    center = board.grid[(3, 6, -9)]
+    for radius in range(1, 6):
+        ring = board.get_hexes_in_ring(center, radius)
+
+        assert len(ring) == 6 * radius
+        for previous, tile in zip(ring, ring[1:] + ring[:1]):
+            assert cube_distance(previous, tile) == 1
+
+
+def test_spiral_lists_the_disk_ring_by_ring(board):
+    for center in centers(board, 8, seed=3):
+        for radius in (0, 2, 4, 30):
+            spiral = board.get_hexes_in_spiral(center, radius)
+            distances = [cube_distance(tile, center) for tile in spiral]
+
+            assert spiral[0] == center
+            assert distances == sorted(distances)
+            assert sorted(tile.index for tile in spiral) == brute_force(board, center,
+                                                                        lambda distance: distance <= radius)
+
+
+def test_batched_queries_match_the_single_ones(board):
+    chosen = centers(board, 20, seed=4)
+    q = np.array([tile.q for tile in chosen])
+    r = np.array([tile.r for tile in chosen])
+
+    for radius in (1, 4):
+        for many, single in ((board.queries.disk_many, board.queries.disk),
+                             (board.queries.ring_many, board.queries.ring)):
+            for row, center in zip(many(q, r, radius), chosen):
+                assert sorted(row[row >= 0].tolist()) == sorted(single(center.q, center.r, radius).tolist())
@@ -0,0 +1,153 @@
+import random
+
+import numpy as np
+import pygame
+import pytest
+
+from src.utils.factories import GameEntityFactory
+from src.utils.hex_utils import cube_distance
+
+
+def brute_force_counts(board, cities):
+    """
+    The number of cities within the exclusion radius of every tile, found by scanning the whole board.
+    """
+    counts = np.zeros(len(board.queries.valid), dtype=np.int16)
+    for tile in board.grid.values():
+        counts[tile.index] = sum(cube_distance(tile, city.hex_tile) <= board.CITY_EXCLUSION_RADIUS
+                                 for city in cities)
+    return counts
+
+
+@pytest.mark.parametrize('storage', ['dict', 'array'])
+def test_city_zones_count_the_cities_around_every_tile(new_game, storage):
+    game_manager = new_game(rows=24, cols=24, place_starting_cities=False, storage=storage)
+    board = game_manager.board
+    player = game_manager.players[0]
+    rng = random.Random(1)
+    tiles = list(board.grid.values())
+
+    cities = [GameEntityFactory.create_city('city', tile, player, game_manager) for tile in rng.sample(tiles, 6)]
+    assert (board.city_zones.city_count == brute_force_counts(board, cities)).all()
+
+    for city in rng.sample(cities, 3):
+        city.destroy()
+        cities.remove(city)
+        assert (board.city_zones.city_count == brute_force_counts(board, cities)).all()
+
+    free = {tile for tile in tiles if tile.building is None}
+    with board.batch_entities():
+        cities += [GameEntityFactory.create_city('city', tile, player, game_manager)
+                   for tile in rng.sample(sorted(free, key=lambda tile: tile.index), 5)]
+    counts = brute_force_counts(board, cities)
+    assert (board.city_zones.city_count == counts).all()
+
+    for tile in tiles:
+        assert board.city_zones.is_forbidden(tile) == (counts[tile.index] > 0)
+        assert game_manager.can_build_new_city_on_tile(tile) == (counts[tile.index] == 0 and tile.unit is None
+                                                                 and tile.building is None)
+
+
+def test_free_indices_of_spans_match_the_whole_board(new_game):
+    game_manager = new_game(rows=30, cols=30, place_starting_cities=True, players=3, seed=2)
+    board = game_manager.board
+    free = set(board.city_zones.free_indices().tolist())
+    rng = random.Random(2)
+
+    for _ in range(20):
+        left, top = rng.randint(-200, 2500), rng.randint(-200, 2000)
+        spans = board.get_visible_rows(pygame.Rect(left, top, rng.randint(1, 1200), rng.randint(1, 900)))
+        inside = {index for index in free
+                  if any(r == index // board.width and first_q <= index % board.width - (r + 1) // 2 <= last_q
+                         for r, first_q, last_q in spans)}
+
+        assert sorted(board.city_zones.free_indices(spans).tolist()) == sorted(inside)
+    assert board.city_zones.free_indices([]).tolist() == []
+
+
+def entity_positions(game_manager):
+    """
+    Every unit and building with the index of its tile, read from the entities themselves.
+    """
+    return {entity: entity.hex_tile.index for entity in game_manager.all_sprites}
+
+
+def assert_index_matches(board, positions):
+    index = board.entities
+    assert {entity: index.position_of(entity) for entity in index._positions} == positions
+    assert sum(len(entities) for entities in index.chunks.values()) == len(positions)
+    for chunk, entities in index.chunks.items():
+        assert entities and all(index._chunk_of(positions[entity]) == chunk for entity in entities)
+    for tile_index, entities in index.tiles.items():
+        assert entities and all(positions[entity] == tile_index for entity in entities)
+
+
+@pytest.fixture
+def crowded_game(populated_game):
+    """
+    A board spanning several chunks of the entity index in both directions.
+    """
+    return populated_game(rows=50, cols=45, units=120, players=3, seed=3)
+
+
+def test_moves_keep_the_entity_index_in_sync(crowded_game):
+    board = crowded_game.board
+    rng = random.Random(3)
+    assert_index_matches(board, entity_positions(crowded_game))
+
+    for _ in range(300):
+        unit = rng.choice(list(crowded_game.all_units))
+        tile = rng.choice(list(board.grid.values()))
+        if tile.unit is None:
+            unit.update_position(tile)
+    assert_index_matches(board, entity_positions(crowded_game))
+
+    for unit in rng.sample(list(crowded_game.all_units), 30):
+        unit.die()
+    assert_index_matches(board, entity_positions(crowded_game))
+
+    placements = [(unit, rng.choice(list(board.grid.values())).index) for unit in crowded_game.all_units]
+    board.entities.add_many(placements)
+    assert_index_matches(board, {**entity_positions(crowded_game), **dict(placements)})
+
+
+def test_in_radius_matches_a_scan_of_all_entities(crowded_game):
+    board = crowded_game.board
+    positions = entity_positions(crowded_game)
+    rng = random.Random(4)
+
+    for center in rng.sample(list(board.grid.values()), 30):
+        for radius in (0, 1, 4, 15, 100):
+            found = board.entities.in_radius(center, radius)
+            expected = [entity for entity, index in positions.items()
+                        if cube_distance(board.tile_at(index), center) <= radius]
+
+            assert sorted(found, key=id) == sorted(expected, key=id)
+            assert [positions[entity] for entity in found] == sorted(positions[entity] for entity in found)
+
+
+def test_nearest_matches_a_scan_of_all_entities(crowded_game):
+    board = crowded_game.board
+    positions = entity_positions(crowded_game)
+    rng = random.Random(5)
+    predicates = [
+        lambda entity: True,
+        lambda entity: entity in crowded_game.all_units and entity.player is crowded_game.players[2],
+        lambda entity: entity not in crowded_game.all_units,
+        lambda entity: False,
+    ]
+
+    for center in rng.sample(list(board.grid.values()), 40):
+        for predicate in predicates:
+            for max_radius in (None, 3, 12):
+                candidates = sorted((cube_distance(board.tile_at(index), center), index)
+                                    for entity, index in positions.items() if predicate(entity))
+                if max_radius is not None:
+                    candidates = [candidate for candidate in candidates if candidate[0] <= max_radius]
+
+                found = board.entities.nearest(center, predicate, max_radius)
+
+                if not candidates:
+                    assert found is None
+                else:
+                    assert (cube_distance(found.hex_tile, center), positions[found]) == candidates[0]
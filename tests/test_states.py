@@ -0,0 +1,89 @@
+import pygame
+
+from src.utils.factories import GameEntityFactory
+from src.utils.hex_utils import cube_distance
+
+
+def click_position(board, camera, tile):
+    center = tile.to_pixel(board.layout)
+    return int(center.x - camera.x), int(center.y - camera.y)
+
+
+def test_click_on_an_unreachable_tile_keeps_the_board_drawable(new_game, display):
+    game_manager = new_game(rows=12, cols=12, place_starting_cities=False)
+    board, camera = game_manager.board, game_manager.camera
+    player, enemy = game_manager.players
+    camera.x, camera.y = 0, 0
+
+    unit = GameEntityFactory.create_unit('warrior', board.grid[(1, 1, -2)], player, game_manager)
+    target = board.grid[(5, 5, -10)]
+    for coords in target.get_neighbors():
+        GameEntityFactory.create_unit('warrior', board.get_tile_by_hex(coords), enemy, game_manager)
+
+    game_manager.selected_unit = unit
+    game_manager.current_state = game_manager.unit_selected_state
+    game_manager.current_state.handle_mouse_click(click_position(board, camera, target))
+
+    assert unit.hex_tile == board.grid[(1, 1, -2)]
+    assert board.path_to_target == []
+    board.render(display, camera)
+
+    board.path_to_target = None
+    board.render(display, camera)
+    pygame.display.flip()
+
+
+def test_searches_are_bounded_by_the_unit_movement(new_game, monkeypatch):
+    game_manager = new_game(rows=20, cols=20, place_starting_cities=False)
+    board, camera = game_manager.board, game_manager.camera
+    player = game_manager.players[0]
+    camera.x, camera.y = 0, 0
+    unit = GameEntityFactory.create_unit('warrior', board.grid[(1, 1, -2)], player, game_manager)
+    start = board.grid[(1, 1, -2)]
+    target = max(board.grid.values(), key=lambda tile: cube_distance(tile, start))
+
+    budgets = []
+    find_path = board.find_path
+
+    def recording_find_path(start, goal, max_cost=None):
+        budgets.append(max_cost)
+        return find_path(start, goal, max_cost=max_cost)
+
+    monkeypatch.setattr(board, 'find_path', recording_find_path)
+
+    assert not unit.move_to(target, board, (0, 0))
+    assert unit.hex_tile == board.grid[(1, 1, -2)]
+
+    game_manager.selected_unit = unit
+    game_manager.current_state = game_manager.unit_selected_state
+    game_manager.current_state.handle_mouse_click(click_position(board, camera, target))
+
+    preview_budget = unit.max_movement_range * game_manager.unit_selected_state.PREVIEW_TURNS
+    assert budgets[0] == unit.current_movement_range
+    assert budgets[-1] == preview_budget
+    assert board.path_to_target == []
+
+
+def test_city_sites_are_looked_up_for_the_visible_rows_only(populated_game, display):
+    game_manager = populated_game(rows=40, cols=40, seed=5)
+    board, camera = game_manager.board, game_manager.camera
+    camera.x, camera.y = 900, 700
+    rect = pygame.Rect(camera.x, camera.y, display.get_width(), display.get_height())
+    spans = {r: (first_q, last_q) for r, first_q, last_q in board.get_visible_rows(rect)}
+
+    visible = game_manager.get_new_city_tiles(rect)
+
+    expected = [tile for tile in game_manager.get_new_city_tiles()
+                if tile.r in spans and spans[tile.r][0] <= tile.q <= spans[tile.r][1]]
+    assert visible and sorted(tile.index for tile in visible) == sorted(tile.index for tile in expected)
+    assert all(game_manager.can_build_new_city_on_tile(tile) for tile in visible)
+
+    city = next(iter(game_manager.players[0].buildings))
+    game_manager.start_new_city_construction(city)
+    assert board.show_city_sites and board.highlighted_hexes == []
+    board.render(display, camera)
+    assert not board._overlay_empty
+
+    game_manager.current_state.handle_mouse_click(click_position(board, camera, city.hex_tile))
+    assert not board.show_city_sites
+    assert game_manager.current_state is game_manager.selecting_unit_state